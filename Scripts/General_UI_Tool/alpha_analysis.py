@@ -0,0 +1,90 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+from PIL import Image
+
+# Alpha classes a frame can fall into
+ALPHA_OPAQUE = 'opaque'
+ALPHA_BINARY = 'binary'
+ALPHA_FULL = 'full'
+
+# BC1 stores opaque colour and 1-bit alpha at half the size of BC7; anything with
+# partial transparency needs a format with a real alpha channel.
+FORMAT_FOR_ALPHA = {
+    ALPHA_OPAQUE: 'BC1_UNORM',
+    ALPHA_BINARY: 'BC1_UNORM',
+    ALPHA_FULL: 'BC7_UNORM',
+}
+
+# 'auto' picks per frame; the others force one format for every frame.
+FORMAT_CHOICES = ('auto', 'BC7_UNORM', 'BC3_UNORM', 'BC1_UNORM')
+# Tooltip for the format pickers offering FORMAT_CHOICES
+AUTO_FORMAT_HELP = "'auto' uses BC1 for frames without partial transparency and BC7 otherwise."
+
+# Alpha values this close to 0 or 255 are treated as fully transparent/opaque.
+# BC1 thresholds alpha at 128, so the error on such pixels is invisible.
+ALPHA_TOLERANCE = 8
+
+def classify_alpha_array(alpha, tolerance=ALPHA_TOLERANCE):
+    """Classify an 8-bit alpha channel (any shape) as opaque, binary or full, using a single histogram pass."""
+    histogram = np.bincount(np.asarray(alpha, dtype=np.uint8).ravel(), minlength=256)
+    total = histogram.sum()
+    opaque = histogram[255 - tolerance:].sum()
+    if opaque == total:
+        return ALPHA_OPAQUE
+    transparent = histogram[:tolerance + 1].sum()
+    if opaque + transparent == total:
+        return ALPHA_BINARY
+    return ALPHA_FULL
+
+def classify_image(image, tolerance=ALPHA_TOLERANCE):
+    """Classify a PIL image. Images without an alpha channel or transparency are opaque."""
+    if image.mode not in ('RGBA', 'LA', 'PA') and 'transparency' not in image.info:
+        return ALPHA_OPAQUE
+    if image.mode not in ('RGBA', 'LA'):
+        image = image.convert('RGBA')
+    return classify_alpha_array(image.getchannel('A'), tolerance)
+
+def classify_file(path, tolerance=ALPHA_TOLERANCE):
+    with Image.open(path) as img:
+        return classify_image(img, tolerance)
+
+def select_format(alpha_class, override='auto'):
+    """DDS format for a frame of the given alpha class, unless `override` forces one."""
+    if override and override != 'auto':
+        return override
+    return FORMAT_FOR_ALPHA[alpha_class]
+
+def select_format_for_file(path, override='auto'):
+    if override and override != 'auto':
+        return override
+    return FORMAT_FOR_ALPHA[classify_file(path)]
+
+def group_by_format(paths, override='auto', max_workers=None, fallback=None):
+    """
+    Return {dds_format: [paths]} for a set of frames, so each group can be sent to texconv in one call.
+
+    Frames are analysed in parallel; Pillow releases the GIL while decoding. A frame that can't
+    be read raises, unless `fallback` is given: it is then logged and grouped under `fallback`.
+    """
+    paths = list(paths)
+    if override and override != 'auto':
+        return {override: paths} if paths else {}
+
+    def frame_format(path):
+        if fallback is None:
+            return select_format_for_file(path)
+        try:
+            return select_format_for_file(path)
+        except Exception as e:
+            print(f"Could not analyse {path}, using {fallback}: {e}")
+            return fallback
+
+    max_workers = max_workers or min(8, os.cpu_count() or 1)
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        formats = list(executor.map(frame_format, paths))
+    groups = {}
+    for path, dds_format in zip(paths, formats):
+        groups.setdefault(dds_format, []).append(path)
+    return groups
@@ -0,0 +1,395 @@
+import os
+
+import numpy as np
+from PIL import Image
+
+try:
+    from General_UI_Tool.dds_header import read_dds_header, level_size
+except ImportError:
+    from dds_header import read_dds_header, level_size
+
+class DDSDecodeError(ValueError):
+    """Raised for DDS files whose pixel format has no decoder here."""
+
+# --- BC1-BC5 ---
+
+def _expand_565(colors):
+    """(N,) RGB565 values -> (N, 3) 8-bit RGB."""
+    r = (colors >> 11) & 0x1F
+    g = (colors >> 5) & 0x3F
+    b = colors & 0x1F
+    return np.stack([(r << 3) | (r >> 2), (g << 2) | (g >> 4), (b << 3) | (b >> 2)], axis=-1)
+
+def _decode_color_block(blocks, four_color_only):
+    """BC1 colour half of (N, 8) blocks -> (N, 16, 4) RGBA."""
+    words = blocks[:, :4].copy().view('<u2').astype(np.int32)
+    c0, c1 = words[:, 0], words[:, 1]
+    e0, e1 = _expand_565(c0), _expand_565(c1)
+    four_color = (c0 > c1) if not four_color_only else np.ones(len(blocks), dtype=bool)
+
+    palette = np.empty((len(blocks), 4, 4), dtype=np.int32)
+    palette[:, 0, :3], palette[:, 1, :3] = e0, e1
+    fc = four_color[:, None]
+    palette[:, 2, :3] = np.where(fc, (2 * e0 + e1) // 3, (e0 + e1) // 2)
+    palette[:, 3, :3] = np.where(fc, (e0 + 2 * e1) // 3, 0)
+    palette[:, :, 3] = 255
+    palette[:, 3, 3] = np.where(four_color, 255, 0)
+
+    codes = blocks[:, 4:8].copy().view('<u4').astype(np.int64)
+    indices = (codes >> (2 * np.arange(16))) & 0x3
+    return np.take_along_axis(palette, indices[:, :, None], axis=1)
+
+def _decode_bc4_channel(blocks):
+    """BC4 block (N, 8) -> (N, 16) 8-bit values; also the alpha half of BC3."""
+    a0 = blocks[:, 0].astype(np.int32)
+    a1 = blocks[:, 1].astype(np.int32)
+    steps = np.arange(1, 7)
+    eight = (((7 - steps) * a0[:, None] + steps * a1[:, None]) // 7)
+    six = (((5 - steps[:4]) * a0[:, None] + steps[:4] * a1[:, None]) // 5)
+    six = np.concatenate([six, np.zeros((len(blocks), 1), np.int32), np.full((len(blocks), 1), 255, np.int32)], axis=1)
+    palette = np.concatenate([a0[:, None], a1[:, None], np.where((a0 > a1)[:, None], eight, six)], axis=1)
+
+    codes = np.zeros(len(blocks), dtype=np.int64)
+    for i in range(6):
+        codes |= blocks[:, 2 + i].astype(np.int64) << (8 * i)
+    indices = (codes[:, None] >> (3 * np.arange(16))) & 0x7
+    return np.take_along_axis(palette, indices, axis=1)
+
+def decode_bc1(blocks):
+    return _decode_color_block(blocks, four_color_only=False)
+
+def decode_bc2(blocks):
+    pixels = _decode_color_block(blocks[:, 8:], four_color_only=True)
+    alpha = blocks[:, :8].copy().view('<u8')[:, 0]
+    nibbles = (alpha[:, None] >> (4 * np.arange(16, dtype=np.uint64))) & np.uint64(0xF)
+    pixels[:, :, 3] = nibbles.astype(np.int32) * 17
+    return pixels
+
+def decode_bc3(blocks):
+    pixels = _decode_color_block(blocks[:, 8:], four_color_only=True)
+    pixels[:, :, 3] = _decode_bc4_channel(blocks[:, :8])
+    return pixels
+
+def decode_bc4(blocks):
+    red = _decode_bc4_channel(blocks)
+    return np.stack([red, red, red, np.full_like(red, 255)], axis=-1)
+
+def decode_bc5(blocks):
+    red = _decode_bc4_channel(blocks[:, :8])
+    green = _decode_bc4_channel(blocks[:, 8:])
+    return np.stack([red, green, np.zeros_like(red), np.full_like(red, 255)], axis=-1)
+
+# --- BC7 ---
+
+# Per mode: subsets, partition bits, rotation bits, index-selection bit, colour bits,
+# alpha bits, per-endpoint P-bits, shared (per-subset) P-bits, index bits, secondary index bits
+BC7_MODES = [
+    (3, 4, 0, 0, 4, 0, 1, 0, 3, 0),
+    (2, 6, 0, 0, 6, 0, 0, 1, 3, 0),
+    (3, 6, 0, 0, 5, 0, 0, 0, 2, 0),
+    (2, 6, 0, 0, 7, 0, 1, 0, 2, 0),
+    (1, 0, 2, 1, 5, 6, 0, 0, 2, 3),
+    (1, 0, 2, 0, 7, 8, 0, 0, 2, 2),
+    (1, 0, 0, 0, 7, 7, 1, 0, 4, 0),
+    (2, 6, 0, 0, 5, 5, 1, 0, 2, 0),
+]
+
+BC7_WEIGHTS = {
+    2: np.array([0, 21, 43, 64]),
+    3: np.array([0, 9, 18, 27, 37, 46, 55, 64]),
+    4: np.array([0, 4, 9, 13, 17, 21, 26, 30, 34, 38, 43, 47, 51, 55, 60, 64]),
+}
+
+# Two-subset partitions as 16-bit masks of the pixels in subset 1
+_PARTITIONS_2 = [
+    0xCCCC, 0x8888, 0xEEEE, 0xECC8, 0xC880, 0xFEEC, 0xFEC8, 0xEC80,
+    0xC800, 0xFFEC, 0xFE80, 0xE800, 0xFFE8, 0xFF00, 0xFFF0, 0xF000,
+    0xF710, 0x008E, 0x7100, 0x08CE, 0x008C, 0x7310, 0x3100, 0x8CCE,
+    0x088C, 0x3110, 0x6666, 0x366C, 0x17E8, 0x0FF0, 0x718E, 0x399C,
+    0xAAAA, 0xF0F0, 0x5A5A, 0x33CC, 0x3C3C, 0x55AA, 0x9696, 0xA55A,
+    0x73CE, 0x13C8, 0x324C, 0x3BDC, 0x6996, 0xC33C, 0x9966, 0x0660,
+    0x0272, 0x04E4, 0x4E40, 0x2720, 0xC936, 0x936C, 0x39C6, 0x639C,
+    0x9336, 0x9CC6, 0x817E, 0xE718, 0xCCF0, 0x0FCC, 0x7744, 0xEE22,
+]
+
+# Three-subset partitions, one digit per pixel
+_PARTITIONS_3 = [
+    "0011001102212222", "0001001122112221", "0000200122112211", "0222002200110111",
+    "0000000011221122", "0011001100220022", "0022002211111111", "0011001122112211",
+    "0000000011112222", "0000111111112222", "0000111122222222", "0012001200120012",
+    "0112011201120112", "0122012201220122", "0011011211221222", "0011200122002220",
+    "0001001101121122", "0111001120012200", "0000112211221122", "0022002200221111",
+    "0111011102220222", "0001000122212221", "0000001101220122", "0000110022102210",
+    "0122012200110000", "0012001211222222", "0110122112210110", "0000011012211221",
+    "0022110211020022", "0110011020022222", "0011012201220011", "0000200022112221",
+    "0000000211221222", "0222002200120011", "0011001200220222", "0120012001200120",
+    "0000111122220000", "0120120120120120", "0120201212010120", "0011220011220011",
+    "0011112222000011", "0101010122222222", "0000000021212121", "0022112200221122",
+    "0022001100220011", "0220122102201221", "0101222222220101", "0000212121212121",
+    "0101010101012222", "0222011102220111", "0002111200021112", "0000211221122112",
+    "0222011101110222", "0002111211120002", "0110011001102222", "0000000021122112",
+    "0110011022222222", "0022001100110022", "0022112211220022", "0000000000002112",
+    "0002000100020001", "0222122202221222", "0101222222222222", "0111201122012220",
+]
+
+# Pixel holding the implicit-MSB index of each subset beyond the first
+_ANCHORS_2 = [
+    15, 15, 15, 15, 15, 15, 15, 15, 15, 15, 15, 15, 15, 15, 15, 15,
+    15, 2, 8, 2, 2, 8, 8, 15, 2, 8, 2, 2, 8, 8, 2, 2,
+    15, 15, 6, 8, 2, 8, 15, 15, 2, 8, 2, 2, 2, 15, 15, 6,
+    6, 2, 6, 8, 15, 15, 2, 2, 15, 15, 15, 15, 15, 2, 2, 15,
+]
+_ANCHORS_3_SECOND = [
+    3, 3, 15, 15, 8, 3, 15, 15, 8, 8, 6, 6, 6, 5, 3, 3,
+    3, 3, 8, 15, 3, 3, 6, 10, 5, 8, 8, 6, 8, 5, 15, 15,
+    8, 15, 3, 5, 6, 10, 8, 15, 15, 3, 15, 5, 15, 15, 15, 15,
+    3, 15, 5, 5, 5, 8, 5, 10, 5, 10, 8, 13, 15, 12, 3, 3,
+]
+_ANCHORS_3_THIRD = [
+    15, 8, 8, 3, 15, 15, 3, 8, 15, 15, 15, 15, 15, 15, 15, 8,
+    15, 8, 15, 3, 15, 8, 15, 8, 3, 15, 6, 10, 15, 15, 10, 8,
+    15, 3, 15, 10, 10, 8, 9, 10, 6, 15, 8, 15, 3, 6, 6, 8,
+    15, 3, 15, 15, 15, 15, 15, 15, 15, 15, 15, 15, 3, 15, 15, 8,
+]
+
+BC7_SUBSETS = {
+    1: np.zeros((1, 16), dtype=np.int64),
+    2: np.array([[(mask >> i) & 1 for i in range(16)] for mask in _PARTITIONS_2]),
+    3: np.array([[int(c) for c in row] for row in _PARTITIONS_3]),
+}
+BC7_ANCHORS = {
+    1: np.zeros((1, 0), dtype=np.int64),
+    2: np.array(_ANCHORS_2)[:, None],
+    3: np.stack([_ANCHORS_3_SECOND, _ANCHORS_3_THIRD], axis=1),
+}
+
+def _read_bits(bits, offset, count):
+    """Unsigned little-endian fields of `count` bits at `offset` in every row of a (N, 128) bit array."""
+    if count == 0:
+        return np.zeros(len(bits), dtype=np.int64)
+    return bits[:, offset:offset + count].astype(np.int64) @ (1 << np.arange(count))
+
+def _read_indices(bits, offset, index_bits, anchors):
+    """Per-pixel indices where the anchor pixels (N, k) have one bit less. Returns (indices, end offset)."""
+    n = len(bits)
+    widths = np.full((n, 16), index_bits, dtype=np.int64)
+    widths[:, 0] -= 1
+    if anchors.shape[1]:
+        np.put_along_axis(widths, anchors, index_bits - 1, axis=1)
+    starts = offset + np.cumsum(widths, axis=1) - widths
+    indices = np.zeros((n, 16), dtype=np.int32)
+    for b in range(index_bits):
+        positions = np.minimum(starts + b, 127)
+        bit = np.take_along_axis(bits, positions, axis=1).astype(np.int32)
+        indices |= np.where(b < widths, bit, 0) << b
+    return indices, offset + widths[0].sum() if n else offset
+
+def _unquantize(values, bits):
+    values = values << (8 - bits)
+    return values | (values >> bits)
+
+def _decode_bc7_mode(bits, mode):
+    subsets, partition_bits, rotation_bits, selection_bits, color_bits, alpha_bits, endpoint_pbits, shared_pbits, index_bits, index2_bits = BC7_MODES[mode]
+    n = len(bits)
+    offset = mode + 1
+    partition = _read_bits(bits, offset, partition_bits); offset += partition_bits
+    rotation = _read_bits(bits, offset, rotation_bits); offset += rotation_bits
+    selection = _read_bits(bits, offset, selection_bits); offset += selection_bits
+
+    endpoint_count = 2 * subsets
+    endpoints = np.zeros((n, endpoint_count, 4), dtype=np.int32)
+    for channel in range(3):
+        for e in range(endpoint_count):
+            endpoints[:, e, channel] = _read_bits(bits, offset, color_bits); offset += color_bits
+    if alpha_bits:
+        for e in range(endpoint_count):
+            endpoints[:, e, 3] = _read_bits(bits, offset, alpha_bits); offset += alpha_bits
+
+    if endpoint_pbits or shared_pbits:
+        if endpoint_pbits:
+            pbits = np.stack([_read_bits(bits, offset + e, 1) for e in range(endpoint_count)], axis=1)
+            offset += endpoint_count
+        else:
+            pbits = np.repeat(np.stack([_read_bits(bits, offset + s, 1) for s in range(subsets)], axis=1), 2, axis=1)
+            offset += subsets
+        endpoints = (endpoints << 1) | pbits[:, :, None]
+        color_bits += 1
+        if alpha_bits:
+            alpha_bits += 1
+    endpoints[:, :, :3] = _unquantize(endpoints[:, :, :3], color_bits)
+    endpoints[:, :, 3] = _unquantize(endpoints[:, :, 3], alpha_bits) if alpha_bits else 255
+
+    subset = BC7_SUBSETS[subsets][partition]
+    anchors = BC7_ANCHORS[subsets][partition]
+    indices, offset = _read_indices(bits, offset, index_bits, anchors)
+    color_weights = alpha_weights = BC7_WEIGHTS[index_bits][indices]
+    if index2_bits:
+        # Modes 4 and 5 carry separate alpha indices; the selection bit swaps the two sets
+        indices2, _ = _read_indices(bits, offset, index2_bits, BC7_ANCHORS[1][np.zeros(n, dtype=np.int64)])
+        primary, secondary = color_weights, BC7_WEIGHTS[index2_bits][indices2]
+        swap = (selection == 1)[:, None]
+        color_weights = np.where(swap, secondary, primary)
+        alpha_weights = np.where(swap, primary, secondary)
+
+    if subsets == 1:
+        e0, e1 = endpoints[:, 0:1], endpoints[:, 1:2]
+    else:
+        e0 = np.take_along_axis(endpoints, (2 * subset)[:, :, None], axis=1)
+        e1 = np.take_along_axis(endpoints, (2 * subset + 1)[:, :, None], axis=1)
+    weights = np.concatenate([np.repeat(color_weights[:, :, None], 3, axis=2), alpha_weights[:, :, None]], axis=2)
+    pixels = ((64 - weights) * e0 + weights * e1 + 32) >> 6
+
+    for channel in range(3):
+        rotated = rotation == channel + 1
+        if rotated.any():
+            pixels[rotated, :, channel], pixels[rotated, :, 3] = pixels[rotated, :, 3], pixels[rotated, :, channel].copy()
+    return pixels
+
+def decode_bc7(blocks):
+    bits = np.unpackbits(blocks, axis=1, bitorder='little')
+    pixels = np.zeros((len(blocks), 16, 4), dtype=np.int32)  # reserved mode 8 decodes to transparent black
+    has_mode = bits[:, :8].any(axis=1)
+    modes = np.where(has_mode, bits[:, :8].argmax(axis=1), 8)
+    for mode in range(8):
+        rows = np.nonzero(modes == mode)[0]
+        if len(rows):
+            pixels[rows] = _decode_bc7_mode(bits[rows], mode)
+    return pixels
+
+BLOCK_DECODERS = {
+    'BC1': (decode_bc1, 8),
+    'BC2': (decode_bc2, 16),
+    'BC3': (decode_bc3, 16),
+    'BC4': (decode_bc4, 8),
+    'BC5': (decode_bc5, 16),
+    'BC7': (decode_bc7, 16),
+}
+
+# Uncompressed layouts: channel order of the stored bytes as indices into RGBA
+PIXEL_LAYOUTS = {
+    'R8G8B8A8': (4, [0, 1, 2, 3]),
+    'B8G8R8A8': (4, [2, 1, 0, 3]),
+    'B8G8R8X8': (4, [2, 1, 0, None]),
+    'R8G8B8X8': (4, [0, 1, 2, None]),
+    'R8G8': (2, [0, 1, None, None]),
+    'R8': (1, [0, 0, 0, None]),
+    'A8': (1, [None, None, None, 0]),
+}
+
+def _block_family(dds_format):
+    family = dds_format.split('_')[0]
+    if family in BLOCK_DECODERS and not dds_format.endswith(('SNORM', 'SF16', 'UF16')):
+        return family
+    return None
+
+def _pixel_layout(dds_format):
+    for name, layout in PIXEL_LAYOUTS.items():
+        if dds_format == name or dds_format.startswith(name + '_'):
+            return layout
+    return None
+
+def decode_level(data, width, height, dds_format, block_step=1, block_average=False):
+    """
+    Decode one mip level's bytes to an (H, W, 4) uint8 RGBA array.
+
+    For block formats, `block_step` > 1 decodes only every n-th block row and column, and
+    `block_average` reduces each decoded block to its mean colour, which together give a
+    preview downsampled by 4 * block_step without touching the skipped blocks.
+    """
+    family = _block_family(dds_format)
+    if family:
+        decoder, block_bytes = BLOCK_DECODERS[family]
+        blocks_x, blocks_y = max(1, (width + 3) // 4), max(1, (height + 3) // 4)
+        blocks = np.frombuffer(data, dtype=np.uint8, count=blocks_x * blocks_y * block_bytes)
+        blocks = blocks.reshape(blocks_y, blocks_x, block_bytes)[::block_step, ::block_step]
+        rows, cols = blocks.shape[:2]
+        pixels = decoder(np.ascontiguousarray(blocks).reshape(-1, block_bytes))
+        if block_average:
+            return pixels.mean(axis=1).round().astype(np.uint8).reshape(rows, cols, 4)
+        image = pixels.reshape(rows, cols, 4, 4, 4).transpose(0, 2, 1, 3, 4).reshape(rows * 4, cols * 4, 4)
+        if block_step == 1:
+            image = image[:height, :width]
+        return image.astype(np.uint8)
+
+    layout = _pixel_layout(dds_format)
+    if layout is None:
+        raise DDSDecodeError(f"No decoder for {dds_format}")
+    unit_bytes, channels = layout
+    stored = np.frombuffer(data, dtype=np.uint8, count=width * height * unit_bytes).reshape(height, width, unit_bytes)
+    image = np.empty((height, width, 4), dtype=np.uint8)
+    for channel, source in enumerate(channels):
+        image[:, :, channel] = stored[:, :, source] if source is not None else (255 if channel == 3 else 0)
+    return image
+
+def _level_dims(info, mip):
+    return max(1, info['width'] >> mip), max(1, info['height'] >> mip)
+
+def read_level(path, mip=0, info=None, **options):
+    """Decode mip level `mip` of the first slice of a DDS file, reading only that level's bytes."""
+    info = info or read_dds_header(path)
+    mip = min(mip, info['mip_count'] - 1)
+    offset = info['data_offset']
+    for level in range(mip):
+        offset += level_size(*_level_dims(info, level), info['kind'], info['unit_bytes'])
+    width, height = _level_dims(info, mip)
+    size = level_size(width, height, info['kind'], info['unit_bytes'])
+    with open(path, 'rb') as f:
+        f.seek(offset)
+        data = f.read(size)
+    if len(data) < size:
+        raise DDSDecodeError(f"Truncated mip {mip}: {len(data)} of {size} bytes")
+    return decode_level(data, width, height, info['format'], **options)
+
+def read_dds(path, mip=0):
+    """Full-resolution RGBA array of a DDS mip level (the top level by default)."""
+    return read_level(path, mip)
+
+def read_dds_preview(path, max_size):
+    """
+    RGBA array of a DDS at roughly `max_size` (width, height) or larger, decoded cheaply.
+
+    The smallest mip level still covering `max_size` is used; if that level is at least
+    4x too large, block means of every n-th block are decoded instead of all pixels.
+    """
+    info = read_dds_header(path)
+    max_width, max_height = max_size
+    mip = 0
+    while mip + 1 < info['mip_count']:
+        width, height = _level_dims(info, mip + 1)
+        if width < max_width and height < max_height:
+            break
+        mip += 1
+    width, height = _level_dims(info, mip)
+    scale = min(width // max_width, height // max_height)
+    if info['kind'] == 'block' and _block_family(info['format']) and scale >= 4:
+        return read_level(path, mip, info, block_step=scale // 4, block_average=True)
+    return read_level(path, mip, info)
+
+def is_dds(path):
+    return os.fspath(path).lower().endswith('.dds')
+
+def load_image(path):
+    """Open any template or frame as an RGBA PIL image, decoding DDS files here."""
+    if is_dds(path):
+        return Image.fromarray(read_dds(path), 'RGBA')
+    with Image.open(path) as img:
+        return img.convert('RGBA')
+
+def load_preview(path, max_size):
+    """RGBA PIL image fitting within `max_size`, decoded at low resolution where possible."""
+    if is_dds(path):
+        image = Image.fromarray(read_dds_preview(path, max_size), 'RGBA')
+    else:
+        with Image.open(path) as img:
+            img.draft('RGB', max_size)
+            image = img.convert('RGBA')
+    image.thumbnail(max_size)
+    return image
+
+def image_size(path):
+    """(width, height) of an image without decoding it; DDS sizes come from the header."""
+    if is_dds(path):
+        info = read_dds_header(path)
+        return info['width'], info['height']
+    with Image.open(path) as img:
+        return img.size
@@ -0,0 +1,122 @@
+import os
+from PIL import Image
+
+try:
+    from General_UI_Tool.scale import calculate_new_dimensions
+except ImportError:
+    from scale import calculate_new_dimensions
+
+# Bytes per 4x4 block for the block-compressed formats texconv can write,
+# and bytes per pixel for the uncompressed fallback.
+BLOCK_BYTES = {
+    'BC1_UNORM': 8,
+    'BC3_UNORM': 16,
+    'BC7_UNORM': 16,
+}
+UNCOMPRESSED_BYTES_PER_PIXEL = {
+    'R8G8B8A8_UNORM': 4,
+}
+
+# 'DDS ' magic + DDS_HEADER, plus the DX10 extension header that BC7 files carry.
+DDS_HEADER_BYTES = 128
+DX10_HEADER_BYTES = 20
+DX10_FORMATS = ('BC7_UNORM',)
+
+# Rough per-resource load model for [ResourceFrameN] sections, which 3DMigoto loads at startup.
+# These are estimates for a mid-range SSD and driver; they are meant for comparing options, not as timings.
+LOAD_OVERHEAD_SECONDS_PER_RESOURCE = 0.0004
+LOAD_BYTES_PER_SECOND = 400 * 1024 * 1024
+
+# Formats in order of visual quality, used when the planner has to trade quality for size.
+FORMAT_QUALITY = {'R8G8B8A8_UNORM': 1.0, 'BC7_UNORM': 0.95, 'BC3_UNORM': 0.85, 'BC1_UNORM': 0.75}
+
+FRAME_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.bmp', '.tiff', '.dds')
+
+def texture_bytes(width, height, dds_format='BC7_UNORM'):
+    """Size of the pixel payload of one texture (top mip only, as generated by the tools)."""
+    if dds_format in BLOCK_BYTES:
+        blocks_wide = max(1, (width + 3) // 4)
+        blocks_high = max(1, (height + 3) // 4)
+        return blocks_wide * blocks_high * BLOCK_BYTES[dds_format]
+    if dds_format in UNCOMPRESSED_BYTES_PER_PIXEL:
+        return width * height * UNCOMPRESSED_BYTES_PER_PIXEL[dds_format]
+    raise ValueError(f"Unknown DDS format '{dds_format}'")
+
+def estimate_mod_cost(frame_count, width, height, dds_format='BC7_UNORM'):
+    """
+    Estimate what an animated UI mod costs in game.
+
+    Returns a dict with the per-frame and total VRAM bytes, the bytes on disk (including DDS
+    headers) and an estimated startup load time for all frame resources.
+    """
+    per_frame = texture_bytes(width, height, dds_format)
+    header = DDS_HEADER_BYTES + (DX10_HEADER_BYTES if dds_format in DX10_FORMATS else 0)
+    vram_bytes = per_frame * frame_count
+    disk_bytes = (per_frame + header) * frame_count
+    load_seconds = frame_count * LOAD_OVERHEAD_SECONDS_PER_RESOURCE + disk_bytes / LOAD_BYTES_PER_SECOND
+    return {
+        'frame_count': frame_count,
+        'width': width,
+        'height': height,
+        'format': dds_format,
+        'per_frame_bytes': per_frame,
+        'vram_bytes': vram_bytes,
+        'disk_bytes': disk_bytes,
+        'load_seconds': load_seconds,
+    }
+
+def read_frame_store(folder):
+    """Return (frame_count, (width, height)) for a folder of extracted frames, reading only the first image header."""
+    frame_files = sorted(entry.path for entry in os.scandir(folder)
+                         if entry.is_file() and entry.name.lower().endswith(FRAME_EXTENSIONS))
+    if not frame_files:
+        return 0, None
+    with Image.open(frame_files[0]) as img:
+        return len(frame_files), img.size
+
+def plan_budget(frame_count, width, height, budget_bytes, formats=('BC7_UNORM', 'BC3_UNORM'),
+                min_scale=0.25, max_frame_step=4, scale_step=0.05):
+    """
+    Propose a scale factor, frame subsampling step and DDS format that fit `budget_bytes` of VRAM.
+
+    Every combination is scored by how much of the original it keeps (pixels, frames and format
+    quality); the best scoring one that fits the budget is returned. If nothing fits, the cheapest
+    combination is returned with 'fits' set to False. Only add 'BC1_UNORM' to `formats` when
+    the frames have no partial transparency.
+    """
+    candidates = []
+    steps = int(round((1.0 - min_scale) / scale_step))
+    scales = [round(1.0 - i * scale_step, 4) for i in range(steps + 1)]
+    for dds_format in formats:
+        for frame_step in range(1, max_frame_step + 1):
+            kept_frames = (frame_count + frame_step - 1) // frame_step
+            for scale_factor in scales:
+                new_width, new_height = calculate_new_dimensions(width, height, scale_factor)
+                cost = estimate_mod_cost(kept_frames, new_width, new_height, dds_format)
+                quality = (scale_factor ** 2) * (1.0 / frame_step) * FORMAT_QUALITY.get(dds_format, 0.5)
+                cost.update({'scale': scale_factor, 'frame_step': frame_step, 'quality': quality})
+                candidates.append(cost)
+
+    if not candidates:
+        return None
+    fitting = [c for c in candidates if c['vram_bytes'] <= budget_bytes]
+    if fitting:
+        best = max(fitting, key=lambda c: (c['quality'], -c['vram_bytes']))
+        best['fits'] = True
+    else:
+        best = min(candidates, key=lambda c: c['vram_bytes'])
+        best['fits'] = False
+    return best
+
+def format_bytes(num_bytes):
+    """Human readable byte count for labels."""
+    for unit in ('B', 'KB', 'MB'):
+        if num_bytes < 1024:
+            return f"{num_bytes:.0f} {unit}" if unit == 'B' else f"{num_bytes:.1f} {unit}"
+        num_bytes /= 1024.0
+    return f"{num_bytes:.2f} GB"
+
+def describe_cost(cost):
+    """One line summary of an estimate_mod_cost() result."""
+    return (f"{cost['frame_count']} frames @ {cost['width']}x{cost['height']} {cost['format']}: "
+            f"{format_bytes(cost['vram_bytes'])} VRAM, ~{cost['load_seconds'] * 1000:.0f} ms load")
@@ -1,9 +1,9 @@
 import tkinter as tk
 from tkinter import filedialog, ttk, messagebox
 import subprocess
-import os
 import threading
-import time
+
+from progress_events import parse_event, event_progress, format_eta, ITEM_DONE, ITEM_FAILED, THROUGHPUT, FINISHED
 
 class Converter:
     def __init__(self, root):
@@ -55,7 +55,7 @@ class Converter:
     def show_gpu_info(self):
         """Show information about how to get the GPU ID."""
         messagebox.showinfo("GPU ID Information",
-                            "To find your GPU ID:\n1. Open Task Manager.\n2. Go to the Performance tab.\n3. Select your GPU on the left side.\n4. The GPU ID will be displayed in the details.")
+                            "To find your GPU ID:\n1. Open Task Manager.\n2. Go to the Performance tab.\n3. Select your GPU on the left side.\n4. The GPU ID will be displayed in the details.\n\nEnter several IDs separated by commas (e.g. 0, 1) to share the work between GPUs, or 'cpu' to also convert on the processor.")
 
     def select_input_folder(self):
         """Open a dialog to select the input folder."""
@@ -84,67 +84,47 @@ class Converter:
         self.progress_bar['value'] = 0
         self.root.update_idletasks()
 
-        # Get the total number of files in batch folders, excluding the output folder
-        total_files = self.count_total_files(input_folder, output_folder)
-        print(f"Total files to convert: {total_files}")
-
         # Start conversion in a new thread
-        threading.Thread(target=self.execute_conversion, args=(input_folder, output_folder, gpu_id, total_files)).start()
-
-    def count_total_files(self, input_folder, output_folder):
-        """Count the total number of files in all batch folders, excluding the output folder."""
-        total_files = 0
-        for batch_folder in os.listdir(input_folder):
-            batch_path = os.path.join(input_folder, batch_folder)
-            if os.path.isdir(batch_path) and batch_folder.startswith("batch"):
-                # Count files in the batch folder
-                total_files += len(os.listdir(batch_path))
-        return total_files
-
-    def execute_conversion(self, input_folder, output_folder, gpu_id, total_files):
-        """Execute the conversion and update progress."""
-        command = ["python", "General_UI_Tool/dds-converter.py", input_folder, output_folder, "--gpu", gpu_id]
-        
-        process = subprocess.Popen(command, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
+        threading.Thread(target=self.execute_conversion, args=(input_folder, output_folder, gpu_id)).start()
 
-        # Start a thread for updating progress
-        threading.Thread(target=self.update_progress, args=(output_folder, total_files)).start()
-
-        # Monitor the output
-        while True:
-            output = process.stdout.readline()
-            if output == '' and process.poll() is not None:
-                break
-            if output:
-                print(output.strip())
+    def execute_conversion(self, input_folder, output_folder, gpu_id):
+        """Execute the conversion and update progress from the converter's event stream."""
+        # Several devices can be given, separated by spaces or commas (e.g. "0, 1" or "0 cpu")
+        devices = gpu_id.replace(',', ' ').split()
+        command = ["python", "General_UI_Tool/dds-converter.py", input_folder, output_folder, "--gpu", *devices, "--events"]
+        
+        process = subprocess.Popen(command, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True)
+
+        # Monitor the output; progress comes from the converter's events instead of polling the output folder
+        for output in process.stdout:
+            event = parse_event(output)
+            if event is None:
+                if output.strip():
+                    print(output.strip())
+                continue
+            if event['event'] in (ITEM_DONE, ITEM_FAILED):
+                progress = event_progress(event)
+                if progress is not None:
+                    self.progress_bar['value'] = progress
+                if event['event'] == ITEM_FAILED:
+                    print(f"Failed: {event['item']}: {event['error']}")
+            elif event['event'] == THROUGHPUT:
+                print(f"{event['done']}/{event['total']} converted, {event['items_per_second']:.1f} files/s, ETA {format_eta(event.get('eta_seconds'))}")
+            elif event['event'] == FINISHED:
+                print(f"Converted {event['done']} of {event['total']} files in {event['elapsed']}s ({event['failed']} failed)")
+            self.root.update_idletasks()  # Update the GUI
 
         # Ensure completion
         process.wait()
         if process.returncode == 0:
             print("Conversion completed successfully.")
         else:
-            print(f"Error during conversion: {process.stderr.read()}")
+            print(f"Error during conversion (exit code {process.returncode}).")
 
         # Re-enable the convert button and finalize progress
         self.convert_button.config(state=tk.NORMAL)
         self.progress_bar['value'] = 100
 
-    def update_progress(self, output_folder, total_files):
-        """Update the progress bar based on the number of converted files."""
-        while True:
-            converted_files = self.count_converted_files(output_folder)  # Count converted files
-            if total_files > 0:
-                progress = (converted_files / total_files) * 100  # Calculate percentage
-                self.progress_bar['value'] = progress
-            if self.progress_bar['value'] >= 100:
-                break
-            self.root.update_idletasks()  # Update the GUI
-            time.sleep(0.1)  # Pause for a second before checking again
-
-    def count_converted_files(self, output_folder):
-        """Count the number of files in the output folder."""
-        return len(os.listdir(output_folder))
-
 # Create the main application window
 root = tk.Tk()
 converter = Converter(root)
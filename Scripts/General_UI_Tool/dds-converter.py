@@ -1,77 +1,231 @@
 import os
+import queue
 import subprocess
+import threading
+import time
 from pathlib import Path
-from concurrent.futures import ProcessPoolExecutor
 import argparse
 
+from progress_events import ProgressEvents
+from alpha_analysis import FORMAT_CHOICES, select_format_for_file
+from encode_quality import (EFFORT_ARGS, METRICS, pick_sample, tune_effort, measure_dds,
+                            meets_target, format_scores)
+
 # Path to Texconv executable
 TEXCONV_PATH = 'General_UI_Tool/texconv.exe'
 
-def convert_batch_to_dds(batch_folder, output_folder, gpu_id):
-    """Convert images from a specific batch folder to DDS format using the -srgbi option."""
-    # Convert paths to Path objects
-    batch_folder = Path(batch_folder)
-    output_folder = Path(output_folder)
+# Extensions texconv can read from the scaled-output batch folders
+IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.bmp', '.tga', '.tif', '.tiff')
 
-    # Create output directory if it doesn't exist
-    output_folder.mkdir(parents=True, exist_ok=True)
+def parse_device(value):
+    """Parse a device id from the command line: a GPU index or 'cpu' for texconv's -nogpu path."""
+    if value.lower() == 'cpu':
+        return 'cpu'
+    try:
+        return int(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"Invalid device '{value}', expected a GPU index or 'cpu'.")
 
-    # List all files to convert
-    input_files = list(batch_folder.glob('*'))  # Get all files in the batch folder
+def find_batch_files(base_input_folder):
+    """Return every image file in the batchN folders, ordered by batch and then by name."""
+    batch_folders = sorted(
+        (entry for entry in os.scandir(base_input_folder) if entry.is_dir() and entry.name.startswith("batch")),
+        key=lambda entry: (len(entry.name), entry.name)
+    )
+    input_files = []
+    for batch_folder in batch_folders:
+        files = [Path(entry.path) for entry in os.scandir(batch_folder.path)
+                 if entry.is_file() and entry.name.lower().endswith(IMAGE_EXTENSIONS)]
+        input_files.extend(sorted(files))
+    return input_files
 
-    # Build the command for the Texconv tool to process all compatible images in the batch folder
+def build_texconv_command(input_file, output_folder, device, dds_format='BC7_UNORM', effort_args=None):
+    """Build the texconv command line converting one file on the given device."""
     command = [
         TEXCONV_PATH,
-        '-f', 'BC7_UNORM',  # Specify the format as BC7_UNORM
+        '-f', dds_format,   # BC7_UNORM, or BC1_UNORM for frames without partial alpha
         '-srgbi',           # Use the -srgbi option
-        '-gpu', str(gpu_id),   # Use specified GPU
-        '-bc', 'x',           # Maximum quality
-        '-o', str(output_folder),    # Output folder
-        str(batch_folder) + '/*'     # Input folder, all files in batch
     ]
+    if device == 'cpu':
+        command.append('-nogpu')
+    else:
+        command.extend(['-gpu', str(device)])
+    # Encoder effort, maximum quality unless a quality target picked a cheaper level
+    command.extend(EFFORT_ARGS['max'] if effort_args is None else effort_args)
+    command.extend([
+        '-y',                        # Overwrite outputs from a previous run
+        '-o', str(output_folder),    # Output folder
+        str(input_file)
+    ])
+    return command
+
+def convert_file_to_dds(input_file, output_folder, device, dds_format='BC7_UNORM', effort_args=None):
+    """Convert a single image to DDS on the given device. Returns True if the DDS was written."""
+    input_file = Path(input_file)
+    output_path = Path(output_folder) / f"{input_file.stem}.dds"
+    command = build_texconv_command(input_file, output_folder, device, dds_format, effort_args)
 
     try:
-        # Execute the command
-        subprocess.run(command, check=True)
-        print(f"Converted images in {batch_folder} successfully.")
+        subprocess.run(command, check=True, capture_output=True, text=True)
+    except FileNotFoundError:
+        print(f"Error: Texconv executable not found at '{TEXCONV_PATH}'")
+        return False
     except subprocess.CalledProcessError as e:
-        print(f"Error during conversion of {batch_folder}: {e}")
+        print(f"Error during conversion of {input_file} on device {device}: {e.stderr or e}")
+        return False
 
-    # Return the number of input files and the number of converted files
-    converted_files = list(output_folder.glob('*'))  # Get all converted files
-    return len(input_files), len(converted_files)
+    if not output_path.exists():
+        print(f"Error: texconv reported success but {output_path} was not written.")
+        return False
+    print(f"writing {output_path}")
+    return True
+
+class ConversionAccounting:
+    """Thread-safe record of which files were converted or failed, and on which device."""
+
+    def __init__(self, devices):
+        self._lock = threading.Lock()
+        self.converted = []
+        self.failed = []
+        self.per_device = {device: {'converted': 0, 'failed': 0} for device in devices}
+        self.per_format = {}
+        self.quality = []
+
+    def record(self, input_file, device, success, dds_format=None):
+        with self._lock:
+            if success:
+                self.converted.append(input_file)
+                self.per_device[device]['converted'] += 1
+                if dds_format:
+                    self.per_format[dds_format] = self.per_format.get(dds_format, 0) + 1
+            else:
+                self.failed.append(input_file)
+                self.per_device[device]['failed'] += 1
+
+    def record_quality(self, input_file, scores):
+        with self._lock:
+            self.quality.append((input_file, scores))
+
+    @property
+    def total(self):
+        return len(self.converted) + len(self.failed)
+
+def schedule_conversions(input_files, output_folder, devices, jobs_per_device=2, events=None, format_override='auto',
+                         effort_args=None, measure_quality=False):
+    """
+    Convert files across several devices, balancing individual files rather than whole batches.
+
+    Every device gets `jobs_per_device` worker threads that pull the next pending file from a
+    shared queue, so a fast device simply takes more files. Workers only wait on texconv, so
+    threads are used instead of processes and the pool is sized by device slots, not CPU count.
+    Per-file results are reported through `events` (a ProgressEvents) when given.
+    With `format_override` set to 'auto' each file's alpha channel picks its BC format.
+    With `measure_quality` every written DDS is decoded and its PSNR/SSIM against the source is logged.
+    """
+    output_folder = Path(output_folder)
+    output_folder.mkdir(parents=True, exist_ok=True)
+
+    pending = queue.Queue()
+    for input_file in input_files:
+        pending.put(input_file)
+
+    accounting = ConversionAccounting(devices)
+
+    def worker(device):
+        while True:
+            try:
+                input_file = pending.get_nowait()
+            except queue.Empty:
+                return
+            start_time = time.perf_counter()
+            dds_format = None
+            try:
+                dds_format = select_format_for_file(input_file, format_override)
+                success = convert_file_to_dds(input_file, output_folder, device, dds_format, effort_args)
+            except Exception as e:
+                print(f"Error occurred during processing of {input_file}: {e}")
+                success = False
+            accounting.record(input_file, device, success, dds_format)
+            quality = {}
+            if success and measure_quality:
+                try:
+                    scores = measure_dds(input_file, output_folder / f"{Path(input_file).stem}.dds")
+                    accounting.record_quality(input_file, scores)
+                    print(f"quality {Path(input_file).name} ({dds_format}): {format_scores(scores)}")
+                    quality = {'psnr': round(scores['psnr'], 3), 'ssim': round(scores['ssim'], 5)}
+                except Exception as e:
+                    print(f"Could not measure quality of {input_file}: {e}")
+            if events:
+                seconds = time.perf_counter() - start_time
+                if success:
+                    events.item_done(Path(input_file).name, seconds, device=str(device), format=dds_format, **quality)
+                else:
+                    events.item_failed(Path(input_file).name, f"texconv failed on device {device}", seconds)
+
+    workers = [threading.Thread(target=worker, args=(device,), daemon=True)
+               for device in devices for _ in range(max(1, jobs_per_device))]
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+
+    return accounting
 
 def main():
     # Define input and output paths
     parser = argparse.ArgumentParser(description='Convert images to DDS format using Texconv with -srgbi option.')
     parser.add_argument('input_folder', type=str, help='Path to the base input folder containing batch folders.')
     parser.add_argument('output_folder', type=str, help='Path to the output folder for converted DDS files.')
-    parser.add_argument('--gpu', type=int, default=0, help='ID of the GPU to use (default: 0)')
+    parser.add_argument('--gpu', type=parse_device, nargs='+', default=[0],
+                        help="One or more device ids to spread the work over, e.g. '--gpu 0 1' or '--gpu 0 cpu' (default: 0)")
+    parser.add_argument('--jobs-per-device', type=int, default=2,
+                        help='Number of concurrent texconv jobs per device (default: 2)')
+    parser.add_argument('--format', choices=FORMAT_CHOICES, default='auto',
+                        help="DDS format; 'auto' uses BC1 for opaque or 1-bit alpha frames and BC7 otherwise (default: auto)")
+    parser.add_argument('--quality-target', type=float, default=None,
+                        help='Pick the fastest encoder effort whose sample frames reach this score '
+                             '(e.g. 0.995 for SSIM or 45 for PSNR), and log every frame\'s error.')
+    parser.add_argument('--quality-metric', choices=METRICS, default='ssim',
+                        help='Metric used for --quality-target (default: ssim)')
+    parser.add_argument('--quality-samples', type=int, default=3,
+                        help='Number of evenly spaced frames encoded while tuning (default: 3)')
+    parser.add_argument('--events', action='store_true', help='Emit JSON-lines progress events on stdout for GUIs.')
     args = parser.parse_args()
 
-    base_input_folder = Path(args.input_folder)
-    output_folder = Path(args.output_folder)
+    input_files = find_batch_files(Path(args.input_folder))
+    devices = list(dict.fromkeys(args.gpu))
 
-    # Identify all batch folders (e.g., batch1, batch2, ...)
-    batch_folders = [str(folder) for folder in base_input_folder.iterdir() if folder.is_dir() and folder.name.startswith("batch")]
+    effort_args = None
+    if args.quality_target is not None and input_files:
+        def encode_sample(input_file, output_folder, sample_effort):
+            dds_format = select_format_for_file(input_file, args.format)
+            return convert_file_to_dds(input_file, output_folder, devices[0], dds_format, sample_effort)
 
-    total_files = 0
-    total_converted = 0
+        samples = pick_sample(input_files, args.quality_samples)
+        level, results = tune_effort(samples, encode_sample, args.quality_target, args.quality_metric)
+        for tried_level, level_results in results.items():
+            for sample, scores in level_results:
+                print(f"tuning {tried_level} {Path(sample).name}: {format_scores(scores)}")
+        print(f"Encoder effort '{level}' meets {args.quality_metric} >= {args.quality_target}")
+        effort_args = EFFORT_ARGS[level]
 
-    # Use ProcessPoolExecutor to run conversion on each batch folder in parallel
-    with ProcessPoolExecutor() as executor:
-        futures = [executor.submit(convert_batch_to_dds, batch_folder, output_folder, args.gpu) for batch_folder in batch_folders]
-
-        # Collect results as they complete
-        for future in futures:
-            try:
-                files_to_convert, converted = future.result()  # This will block until the conversion is done
-                total_files += files_to_convert
-                total_converted += converted
-            except Exception as e:
-                print(f"Error occurred during processing: {e}")
+    events = ProgressEvents('convert', len(input_files), enabled=args.events)
+    events.started()
+    accounting = schedule_conversions(input_files, args.output_folder, devices, args.jobs_per_device, events, args.format,
+                                      effort_args, measure_quality=args.quality_target is not None)
+    events.finished()
 
-    print(f"Total files: {total_files}, Total converted: {total_converted}")
+    for device, counts in accounting.per_device.items():
+        print(f"Device {device}: converted {counts['converted']}, failed {counts['failed']}")
+    for dds_format, count in sorted(accounting.per_format.items()):
+        print(f"Format {dds_format}: {count} files")
+    for input_file in accounting.failed:
+        print(f"Failed: {input_file}")
+    if accounting.quality:
+        below = [(f, s) for f, s in accounting.quality if not meets_target(s, args.quality_metric, args.quality_target)]
+        worst_file, worst_scores = min(accounting.quality, key=lambda item: item[1][args.quality_metric])
+        print(f"Worst frame: {worst_file}: {format_scores(worst_scores)}; {len(below)} frames below target")
+    print(f"Total files: {len(input_files)}, Total converted: {len(accounting.converted)}, Total failed: {len(accounting.failed)}")
 
 if __name__ == '__main__':
-    main()
\ No newline at end of file
+    main()
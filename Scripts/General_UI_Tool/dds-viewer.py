@@ -1,46 +1,241 @@
 import os
-import imageio
-from tkinter import Tk, Label, Button, filedialog, Frame
-from PIL import Image, ImageTk
+import re
+import sys
+import queue
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from tkinter import Tk, Label, Button, filedialog, Frame, PhotoImage
+from PIL import ImageTk
+
+from bcn_decoder import load_preview
+from dds_header import read_dds_header
+
+DISPLAY_SIZE = (800, 600)
+FILMSTRIP_SIZE = (96, 96)
+# Files decoded ahead of and behind the current one while browsing a folder
+PREFETCH_RADIUS = 4
+FILMSTRIP_RADIUS = 3
+# Decoded images kept in memory; comfortably more than the prefetch window
+CACHE_SIZE = 48
+DECODE_WORKERS = 4
+POLL_INTERVAL_MS = 30
+
+def natural_sort_key(name):
+    return [int(t) if t.isdigit() else t.lower() for t in re.split('([0-9]+)', name)]
+
+class PrefetchCache:
+    """
+    Bounded LRU cache of decoded previews, filled by background threads.
+
+    request() queues a decode unless the image is cached or already pending; finished
+    decodes are handed to the Tk thread through `results`, since Tk may only be touched there.
+    """
+
+    def __init__(self, max_items=CACHE_SIZE, workers=DECODE_WORKERS):
+        self.max_items = max_items
+        self.results = queue.Queue()
+        self._images = OrderedDict()
+        self._pending = {}
+        self._failed = set()
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=workers)
+
+    def get(self, key):
+        with self._lock:
+            if key in self._images:
+                self._images.move_to_end(key)
+                return self._images[key]
+        return None
+
+    def request(self, path, size):
+        key = (path, size)
+        with self._lock:
+            if key in self._images or key in self._pending or key in self._failed:
+                return
+            self._pending[key] = self._executor.submit(self._decode, key)
+
+    def _decode(self, key):
+        path, size = key
+        try:
+            image = load_preview(path, size)
+        except Exception as e:
+            print(f"Error reading {os.path.basename(path)}: {e}")
+            image = None
+        with self._lock:
+            self._pending.pop(key, None)
+            if image is None:
+                self._failed.add(key)
+            else:
+                self._images[key] = image
+                while len(self._images) > self.max_items:
+                    self._images.popitem(last=False)
+        self.results.put(key)
+
+    def failed(self, key):
+        with self._lock:
+            return key in self._failed
+
+    def cancel_except(self, keys):
+        """Drop queued decodes that are no longer near the current file."""
+        with self._lock:
+            for key, future in list(self._pending.items()):
+                if key not in keys and future.cancel():
+                    del self._pending[key]
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
 
 class DDSViewer:
     def __init__(self, master):
         self.master = master
         self.master.title("DDS Image Viewer")
-        
+
+        self.files = []
+        self.index = 0
+        self.cache = PrefetchCache()
+
         self.frame = Frame(self.master)
         self.frame.pack()
 
         self.label = Label(self.frame)
         self.label.pack()
 
-        self.btn_open = Button(self.frame, text="Open DDS File", command=self.open_file)
-        self.btn_open.pack()
+        self.info_label = Label(self.frame, text="")
+        self.info_label.pack()
+
+        # Empty filmstrip cells show a blank image so they keep their pixel size
+        self.blank = PhotoImage(width=FILMSTRIP_SIZE[0], height=FILMSTRIP_SIZE[1])
+        self.filmstrip = Frame(self.frame)
+        self.filmstrip.pack(pady=4)
+        self.filmstrip_labels = []
+        for offset in range(-FILMSTRIP_RADIUS, FILMSTRIP_RADIUS + 1):
+            cell = Label(self.filmstrip, image=self.blank, relief="sunken" if offset == 0 else "flat", borderwidth=2)
+            cell.pack(side="left", padx=2)
+            cell.bind("<Button-1>", lambda _event, o=offset: self.step(o))
+            self.filmstrip_labels.append(cell)
+
+        buttons = Frame(self.frame)
+        buttons.pack()
+        self.btn_open = Button(buttons, text="Open DDS File", command=self.open_file)
+        self.btn_open.pack(side="left")
+        self.btn_folder = Button(buttons, text="Browse Folder", command=self.open_folder)
+        self.btn_folder.pack(side="left")
+        self.btn_prev = Button(buttons, text="< Prev", command=lambda: self.step(-1))
+        self.btn_prev.pack(side="left")
+        self.btn_next = Button(buttons, text="Next >", command=lambda: self.step(1))
+        self.btn_next.pack(side="left")
+
+        self.master.bind("<Left>", lambda _event: self.step(-1))
+        self.master.bind("<Right>", lambda _event: self.step(1))
+        self.master.bind("<Prior>", lambda _event: self.step(-10))
+        self.master.bind("<Next>", lambda _event: self.step(10))
+        self.master.bind("<Home>", lambda _event: self.step(-len(self.files)))
+        self.master.bind("<End>", lambda _event: self.step(len(self.files)))
+        self.master.protocol("WM_DELETE_WINDOW", self.close)
+        self.master.after(POLL_INTERVAL_MS, self.poll_results)
 
     def open_file(self):
         file_path = filedialog.askopenfilename(filetypes=[("DDS files", "*.dds")])
         if file_path:
-            self.show_image(file_path)
+            self.browse(os.path.dirname(file_path), os.path.basename(file_path))
 
-    def show_image(self, file_path):
-        # Use imageio to read the DDS image
-        try:
-            image = imageio.imread(file_path)
-            image_pil = Image.fromarray(image)
+    def open_folder(self):
+        folder = filedialog.askdirectory()
+        if folder:
+            self.browse(folder)
 
-            # Resize image for better display
-            image_pil.thumbnail((800, 600))
+    def browse(self, folder, start_file=None):
+        """Show the DDS files of `folder` in name order, starting at `start_file` if given."""
+        names = sorted((name for name in os.listdir(folder) if name.lower().endswith('.dds')), key=natural_sort_key)
+        if not names:
+            self.info_label.config(text=f"No DDS files in {folder}")
+            return
+        self.files = [os.path.join(folder, name) for name in names]
+        self.index = names.index(start_file) if start_file in names else 0
+        self.show_current()
 
-            # Convert to ImageTk format for displaying in Tkinter
-            self.img_tk = ImageTk.PhotoImage(image_pil)
+    def step(self, delta):
+        if not self.files:
+            return
+        index = max(0, min(len(self.files) - 1, self.index + delta))
+        if index != self.index:
+            self.index = index
+            self.show_current()
 
-            # Update label with the new image
-            self.label.config(image=self.img_tk)
-            self.label.image = self.img_tk  # Keep a reference to avoid garbage collection
+    def show_current(self):
+        path = self.files[self.index]
+        try:
+            header = read_dds_header(path)
+            details = f"{header['width']}x{header['height']} {header['format']}, {header['mip_count']} mip(s)"
         except Exception as e:
-            print(f"Error reading the image: {e}")
+            details = f"unreadable header: {e}"
+        self.info_label.config(text=f"[{self.index + 1}/{len(self.files)}] {os.path.basename(path)}  {details}")
+        self.prefetch()
+        self.refresh()
+
+    def prefetch(self):
+        """Queue the current file first, then its neighbours outwards, and cancel anything out of range."""
+        wanted = [(self.files[self.index], DISPLAY_SIZE)]
+        for distance in range(1, PREFETCH_RADIUS + 1):
+            for i in (self.index + distance, self.index - distance):
+                if 0 <= i < len(self.files):
+                    wanted.append((self.files[i], DISPLAY_SIZE))
+        for offset in range(-FILMSTRIP_RADIUS, FILMSTRIP_RADIUS + 1):
+            i = self.index + offset
+            if 0 <= i < len(self.files):
+                wanted.append((self.files[i], FILMSTRIP_SIZE))
+        self.cache.cancel_except(set(wanted))
+        for path, size in wanted:
+            self.cache.request(path, size)
+
+    def refresh(self):
+        """Draw whatever of the current view is decoded; the rest appears as results arrive."""
+        if not self.files:
+            return
+        self.set_label_image(self.label, (self.files[self.index], DISPLAY_SIZE), None)
+        for cell, offset in zip(self.filmstrip_labels, range(-FILMSTRIP_RADIUS, FILMSTRIP_RADIUS + 1)):
+            i = self.index + offset
+            key = (self.files[i], FILMSTRIP_SIZE) if 0 <= i < len(self.files) else None
+            self.set_label_image(cell, key, self.blank)
+
+    def set_label_image(self, label, key, placeholder):
+        image = self.cache.get(key) if key else None
+        shown = key if image is not None else None
+        if getattr(label, 'key', None) == shown and shown is not None:
+            return
+        label.key = shown
+        # Keep a reference on the label to avoid garbage collection of the PhotoImage
+        label.image = ImageTk.PhotoImage(image) if image is not None else placeholder
+        if label.image is not None:
+            label.config(image=label.image, text="")
+        else:
+            label.config(image="", text=("Could not decode" if self.cache.failed(key) else "Loading...") if key else "")
+
+    def poll_results(self):
+        changed = False
+        try:
+            while True:
+                self.cache.results.get_nowait()
+                changed = True
+        except queue.Empty:
+            pass
+        if changed:
+            self.refresh()
+        self.master.after(POLL_INTERVAL_MS, self.poll_results)
+
+    def close(self):
+        self.cache.shutdown()
+        self.master.destroy()
 
 if __name__ == "__main__":
     root = Tk()
     viewer = DDSViewer(root)
+    # Optional folder or file argument, e.g. view_dds.bat "path\to\FrameAnalysis-..."
+    if len(sys.argv) > 1:
+        target = os.path.abspath(sys.argv[1])
+        if os.path.isdir(target):
+            viewer.browse(target)
+        elif os.path.isfile(target):
+            viewer.browse(os.path.dirname(target), os.path.basename(target))
     root.mainloop()
@@ -0,0 +1,174 @@
+import os
+import struct
+
+DDS_MAGIC = b'DDS '
+DDS_HEADER_SIZE = 4 + 124
+DX10_HEADER_SIZE = 20
+
+# DDS_PIXELFORMAT flags
+DDPF_ALPHAPIXELS = 0x1
+DDPF_FOURCC = 0x4
+DDPF_RGB = 0x40
+DDPF_LUMINANCE = 0x20000
+
+# dwCaps2
+DDSCAPS2_CUBEMAP = 0x200
+
+# DXGI formats that show up in game dumps and texconv output: name and either the
+# bytes per 4x4 block ('block') or bytes per pixel ('pixel').
+DXGI_FORMATS = {
+    2: ('R32G32B32A32_FLOAT', 'pixel', 16),
+    10: ('R16G16B16A16_FLOAT', 'pixel', 8),
+    11: ('R16G16B16A16_UNORM', 'pixel', 8),
+    24: ('R10G10B10A2_UNORM', 'pixel', 4),
+    26: ('R11G11B10_FLOAT', 'pixel', 4),
+    27: ('R8G8B8A8_TYPELESS', 'pixel', 4),
+    28: ('R8G8B8A8_UNORM', 'pixel', 4),
+    29: ('R8G8B8A8_UNORM_SRGB', 'pixel', 4),
+    34: ('R16G16_FLOAT', 'pixel', 4),
+    41: ('R32_FLOAT', 'pixel', 4),
+    49: ('R8G8_UNORM', 'pixel', 2),
+    54: ('R16_FLOAT', 'pixel', 2),
+    56: ('R16_UNORM', 'pixel', 2),
+    61: ('R8_UNORM', 'pixel', 1),
+    65: ('A8_UNORM', 'pixel', 1),
+    70: ('BC1_TYPELESS', 'block', 8),
+    71: ('BC1_UNORM', 'block', 8),
+    72: ('BC1_UNORM_SRGB', 'block', 8),
+    73: ('BC2_TYPELESS', 'block', 16),
+    74: ('BC2_UNORM', 'block', 16),
+    75: ('BC2_UNORM_SRGB', 'block', 16),
+    76: ('BC3_TYPELESS', 'block', 16),
+    77: ('BC3_UNORM', 'block', 16),
+    78: ('BC3_UNORM_SRGB', 'block', 16),
+    79: ('BC4_TYPELESS', 'block', 8),
+    80: ('BC4_UNORM', 'block', 8),
+    81: ('BC4_SNORM', 'block', 8),
+    82: ('BC5_TYPELESS', 'block', 16),
+    83: ('BC5_UNORM', 'block', 16),
+    84: ('BC5_SNORM', 'block', 16),
+    87: ('B8G8R8A8_UNORM', 'pixel', 4),
+    88: ('B8G8R8X8_UNORM', 'pixel', 4),
+    90: ('B8G8R8A8_TYPELESS', 'pixel', 4),
+    91: ('B8G8R8A8_UNORM_SRGB', 'pixel', 4),
+    93: ('B8G8R8X8_UNORM_SRGB', 'pixel', 4),
+    94: ('BC6H_TYPELESS', 'block', 16),
+    95: ('BC6H_UF16', 'block', 16),
+    96: ('BC6H_SF16', 'block', 16),
+    97: ('BC7_TYPELESS', 'block', 16),
+    98: ('BC7_UNORM', 'block', 16),
+    99: ('BC7_UNORM_SRGB', 'block', 16),
+}
+
+# Legacy FourCC codes written by older tools instead of a DX10 header
+FOURCC_FORMATS = {
+    b'DXT1': ('BC1_UNORM', 'block', 8),
+    b'DXT2': ('BC2_UNORM', 'block', 16),
+    b'DXT3': ('BC2_UNORM', 'block', 16),
+    b'DXT4': ('BC3_UNORM', 'block', 16),
+    b'DXT5': ('BC3_UNORM', 'block', 16),
+    b'ATI1': ('BC4_UNORM', 'block', 8),
+    b'BC4U': ('BC4_UNORM', 'block', 8),
+    b'BC4S': ('BC4_SNORM', 'block', 8),
+    b'ATI2': ('BC5_UNORM', 'block', 16),
+    b'BC5U': ('BC5_UNORM', 'block', 16),
+    b'BC5S': ('BC5_SNORM', 'block', 16),
+}
+
+class DDSHeaderError(ValueError):
+    """Raised for files that are not DDS textures or use a layout we cannot size."""
+
+def _legacy_format(pf_flags, fourcc, bit_count, masks):
+    if pf_flags & DDPF_FOURCC:
+        if fourcc in FOURCC_FORMATS:
+            return FOURCC_FORMATS[fourcc]
+        raise DDSHeaderError(f"Unsupported FourCC {fourcc!r}")
+    if pf_flags & (DDPF_RGB | DDPF_LUMINANCE) and bit_count in (8, 16, 24, 32):
+        if bit_count == 32:
+            red_mask = masks[0]
+            name = 'R8G8B8A8_UNORM' if red_mask == 0x000000ff else 'B8G8R8A8_UNORM'
+            if not pf_flags & DDPF_ALPHAPIXELS:
+                name = name.replace('A8', 'X8')
+        else:
+            name = f'RGB{bit_count}'
+        return name, 'pixel', bit_count // 8
+    raise DDSHeaderError(f"Unsupported pixel format (flags 0x{pf_flags:x}, {bit_count} bpp)")
+
+def level_size(width, height, kind, unit_bytes):
+    """Bytes in one mip level of the given dimensions."""
+    if kind == 'block':
+        return max(1, (width + 3) // 4) * max(1, (height + 3) // 4) * unit_bytes
+    return width * height * unit_bytes
+
+def parse_dds_header(data):
+    """
+    Parse the header of a DDS file from its first bytes (at least 148).
+
+    Returns a dict with width, height, depth, mip_count, array_size, format, kind
+    ('block' or 'pixel'), unit_bytes, data_offset and payload_size (expected pixel bytes
+    for every mip, face and array slice).
+    """
+    if len(data) < DDS_HEADER_SIZE or data[:4] != DDS_MAGIC:
+        raise DDSHeaderError("Not a DDS file")
+    (size, _flags, height, width, _pitch, depth, mip_count) = struct.unpack_from('<7I', data, 4)
+    if size != 124:
+        raise DDSHeaderError(f"Bad header size {size}")
+    pf_flags, fourcc, bit_count = struct.unpack_from('<I4sI', data, 4 + 76)
+    masks = struct.unpack_from('<4I', data, 4 + 88)
+    caps2 = struct.unpack_from('<I', data, 4 + 108)[0]
+    if width == 0 or height == 0:
+        raise DDSHeaderError("Zero-sized texture")
+
+    data_offset = DDS_HEADER_SIZE
+    array_size = 1
+    if pf_flags & DDPF_FOURCC and fourcc == b'DX10':
+        if len(data) < DDS_HEADER_SIZE + DX10_HEADER_SIZE:
+            raise DDSHeaderError("Truncated DX10 header")
+        dxgi_format, _dimension, _misc, array_size = struct.unpack_from('<4I', data, DDS_HEADER_SIZE)
+        if dxgi_format not in DXGI_FORMATS:
+            raise DDSHeaderError(f"Unsupported DXGI format {dxgi_format}")
+        name, kind, unit_bytes = DXGI_FORMATS[dxgi_format]
+        data_offset += DX10_HEADER_SIZE
+        array_size = max(1, array_size)
+    else:
+        name, kind, unit_bytes = _legacy_format(pf_flags, fourcc, bit_count, masks)
+
+    mip_count = max(1, mip_count)
+    depth = max(1, depth)
+    faces = 6 if caps2 & DDSCAPS2_CUBEMAP else 1
+    payload_size = 0
+    level_width, level_height, level_depth = width, height, depth
+    for _ in range(mip_count):
+        payload_size += level_size(level_width, level_height, kind, unit_bytes) * level_depth
+        level_width, level_height, level_depth = max(1, level_width // 2), max(1, level_height // 2), max(1, level_depth // 2)
+    payload_size *= faces * array_size
+
+    return {
+        'width': width,
+        'height': height,
+        'depth': depth,
+        'mip_count': mip_count,
+        'array_size': array_size * faces,
+        'format': name,
+        'kind': kind,
+        'unit_bytes': unit_bytes,
+        'data_offset': data_offset,
+        'payload_size': payload_size,
+    }
+
+def read_dds_header(path):
+    """Parse a DDS file's header without reading its pixel data."""
+    with open(path, 'rb') as f:
+        return parse_dds_header(f.read(DDS_HEADER_SIZE + DX10_HEADER_SIZE))
+
+def validate_dds(path):
+    """
+    Return the parsed header if `path` is a complete DDS file, i.e. the header is valid and
+    the file holds at least the payload its format and dimensions require; otherwise raise
+    DDSHeaderError.
+    """
+    info = read_dds_header(path)
+    file_size = os.path.getsize(path)
+    if file_size < info['data_offset'] + info['payload_size']:
+        raise DDSHeaderError(f"Truncated: {file_size} bytes, expected {info['data_offset'] + info['payload_size']}")
+    return info
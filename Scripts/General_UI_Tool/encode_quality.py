@@ -0,0 +1,140 @@
+import shutil
+import tempfile
+from pathlib import Path
+
+import numpy as np
+from PIL import Image
+
+try:
+    from General_UI_Tool.bcn_decoder import read_dds
+    from General_UI_Tool.dds_header import read_dds_header
+except ImportError:
+    from bcn_decoder import read_dds
+    from dds_header import read_dds_header
+
+# texconv encoder effort, cheapest first. '-bc q' is BC7's quick mode and '-bc x' its
+# exhaustive mode; BC1/BC3 ignore both and encode the same at every level.
+EFFORT_LEVELS = [
+    ('quick', ['-bc', 'q']),
+    ('default', []),
+    ('max', ['-bc', 'x']),
+]
+EFFORT_ARGS = dict(EFFORT_LEVELS)
+
+METRICS = ('ssim', 'psnr')
+SSIM_WINDOW = 7
+SSIM_C1 = (0.01 * 255) ** 2
+SSIM_C2 = (0.03 * 255) ** 2
+
+def _prepare(image):
+    """RGBA float array with colour premultiplied by alpha, so hidden colour under transparent pixels is ignored."""
+    if isinstance(image, Image.Image):
+        image = np.asarray(image.convert('RGBA'))
+    pixels = image.astype(np.float64)
+    if pixels.ndim == 2:
+        pixels = pixels[:, :, None]
+    if pixels.shape[2] == 4:
+        pixels[:, :, :3] *= pixels[:, :, 3:4] / 255.0
+    return pixels
+
+def _match_shapes(ref, test):
+    height = min(ref.shape[0], test.shape[0])
+    width = min(ref.shape[1], test.shape[1])
+    return ref[:height, :width], test[:height, :width]
+
+def psnr(reference, test):
+    """Peak signal-to-noise ratio in dB over all (premultiplied) channels; inf for identical images."""
+    ref, tst = _match_shapes(_prepare(reference), _prepare(test))
+    mse = np.mean((ref - tst) ** 2)
+    if mse == 0:
+        return float('inf')
+    return float(10.0 * np.log10(255.0 ** 2 / mse))
+
+def _box_mean(x, size):
+    """Mean over every size x size window ('valid' region) using a summed-area table."""
+    table = np.cumsum(np.cumsum(x, axis=0), axis=1)
+    table = np.pad(table, ((1, 0), (1, 0)) + ((0, 0),) * (x.ndim - 2))
+    sums = table[size:, size:] - table[:-size, size:] - table[size:, :-size] + table[:-size, :-size]
+    return sums / (size * size)
+
+def ssim(reference, test, window=SSIM_WINDOW):
+    """Mean structural similarity over all (premultiplied) channels with a uniform window."""
+    ref, tst = _match_shapes(_prepare(reference), _prepare(test))
+    window = max(1, min(window, ref.shape[0], ref.shape[1]))
+    mu_x = _box_mean(ref, window)
+    mu_y = _box_mean(tst, window)
+    var_x = _box_mean(ref * ref, window) - mu_x * mu_x
+    var_y = _box_mean(tst * tst, window) - mu_y * mu_y
+    cov = _box_mean(ref * tst, window) - mu_x * mu_y
+    numerator = (2 * mu_x * mu_y + SSIM_C1) * (2 * cov + SSIM_C2)
+    denominator = (mu_x * mu_x + mu_y * mu_y + SSIM_C1) * (var_x + var_y + SSIM_C2)
+    return float(np.mean(numerator / denominator))
+
+def measure(reference, test):
+    return {'psnr': psnr(reference, test), 'ssim': ssim(reference, test)}
+
+def meets_target(scores, metric, target):
+    return scores[metric] >= target
+
+def linear_to_srgb(values):
+    """Apply the sRGB transfer curve to 8-bit linear values."""
+    linear = values / 255.0
+    encoded = np.where(linear <= 0.0031308, linear * 12.92, 1.055 * np.power(linear, 1 / 2.4) - 0.055)
+    return np.clip(np.round(encoded * 255.0), 0, 255).astype(np.uint8)
+
+def decode_dds(dds_path, srgb=True):
+    """Decode a DDS back to an RGBA array, undoing the -srgbi conversion when `srgb` is set."""
+    pixels = read_dds(dds_path)
+    if srgb and not read_dds_header(dds_path)['format'].endswith('_SRGB'):
+        pixels = pixels.copy()
+        pixels[:, :, :3] = linear_to_srgb(pixels[:, :, :3])
+    return pixels
+
+def measure_dds(source_path, dds_path, srgb=True):
+    """Error of an encoded DDS against the image it was made from."""
+    with Image.open(source_path) as img:
+        reference = np.asarray(img.convert('RGBA'))
+    return measure(reference, decode_dds(dds_path, srgb))
+
+def pick_sample(files, count):
+    """Evenly spaced sample of `count` files, including the first and last."""
+    files = list(files)
+    if count >= len(files):
+        return files
+    if count <= 1:
+        return files[:1]
+    step = (len(files) - 1) / (count - 1)
+    return [files[int(round(i * step))] for i in range(count)]
+
+def tune_effort(sample_files, encode, target, metric='ssim', srgb=True):
+    """
+    Find the cheapest effort level at which every sample frame meets `target`.
+
+    `encode(input_file, output_folder, effort_args)` must write `<stem>.dds` into
+    output_folder and return True on success. Returns (level_name, results) where results
+    maps each tried level to a list of (file, scores) tuples. Falls back to the maximum
+    level if no cheaper one is good enough.
+    """
+    if metric not in METRICS:
+        raise ValueError(f"Unknown metric '{metric}', expected one of {METRICS}")
+    results = {}
+    temp_dir = Path(tempfile.mkdtemp(prefix='tune_'))
+    try:
+        for level, effort_args in EFFORT_LEVELS:
+            level_dir = temp_dir / level
+            level_dir.mkdir()
+            level_results = []
+            for sample in sample_files:
+                if not encode(sample, level_dir, effort_args):
+                    raise RuntimeError(f"Encoding sample {sample} at effort '{level}' failed")
+                scores = measure_dds(sample, level_dir / f"{Path(sample).stem}.dds", srgb)
+                level_results.append((sample, scores))
+            results[level] = level_results
+            if all(meets_target(scores, metric, target) for _, scores in level_results):
+                return level, results
+        return EFFORT_LEVELS[-1][0], results
+    finally:
+        shutil.rmtree(temp_dir, ignore_errors=True)
+
+def format_scores(scores):
+    return f"PSNR {scores['psnr']:.2f} dB, SSIM {scores['ssim']:.4f}"
@@ -1,61 +1,54 @@
 # api.py
 import os
-import re
-import imageio
-from typing import List, Tuple
+from typing import Dict, List, Optional, Tuple
 
-def find_dds_hashes(folder_path: str) -> Tuple[List[str], List[str]]:
+try:
+    from General_UI_Tool.frame_dump_index import get_index
+except ImportError:
+    from frame_dump_index import get_index
+
+def find_dds_textures(folder_path: str, max_workers: Optional[int] = None) -> List[Dict]:
     """
-    Scans a folder for DDS files with a specific hash pattern in their names,
-    verifies they are viewable, and returns their hashes and file paths.
+    Scans a folder for DDS files with a specific hash pattern in their names and
+    verifies them from their headers alone.
+
+    Results come from the frame-dump index (frame_dump_index.db): a folder is only
+    fully validated the first time, later scans check just new or changed files.
+    A file is accepted when its header parses and the file holds the full payload the
+    declared format, dimensions and mip count require.
 
     Args:
         folder_path: The absolute or relative path to the folder to scan.
+        max_workers: Size of the validation thread pool (defaults to the executor's choice).
 
     Returns:
-        A tuple containing two lists:
-        - A list of the extracted hashes (strings).
-        - A list of the corresponding full file paths (strings).
-        Returns empty lists if the folder doesn't exist or no valid files are found.
+        A list of dicts with 'hash', 'path', 'width', 'height' and 'format', sorted by
+        file name. Returns an empty list if the folder doesn't exist or no valid files are found.
     """
     if not os.path.isdir(folder_path):
         print(f"Error: Directory not found at '{folder_path}'")
-        return [], []
-
-    hashes = []
-    dds_file_paths = []
-    
-    # Regex to capture the first hexadecimal hash in filenames like:
-    # '...t0=a1b2c3d4(e5f6g7h8).dds'
-    hash_pattern = re.compile(r't0=([a-f0-9]+)\([a-f0-9]+\)')
+        return []
 
     print(f"Scanning folder: {folder_path}...")
-
-    # Sort files for consistent ordering
     try:
-        filenames = sorted(os.listdir(folder_path))
+        return get_index().scan(folder_path, max_workers)
     except FileNotFoundError:
         print(f"Error: Directory not found at '{folder_path}'")
-        return [], []
-
-    for filename in filenames:
-        if filename.endswith(".dds"):
-            match = hash_pattern.search(filename)
-            if match:
-                file_path = os.path.join(folder_path, filename)
-                
-                # --- Verification Step ---
-                # Try to read the image data to ensure it's a valid, viewable file.
-                # If it causes an error, it's skipped and not included in the results.
-                try:
-                    imageio.imread(file_path)
-                    
-                    # If readable, extract hash and add to lists
-                    extracted_hash = match.group(1)
-                    hashes.append(extracted_hash)
-                    dds_file_paths.append(file_path)
-
-                except Exception as e:
-                    print(f"Skipping un-viewable file {filename}: {e}")
-
-    return hashes, dds_file_paths
\ No newline at end of file
+        return []
+
+def find_dds_hashes(folder_path: str) -> Tuple[List[str], List[str]]:
+    """
+    Scans a folder for DDS files with a specific hash pattern in their names,
+    verifies they are viewable, and returns their hashes and file paths.
+
+    Args:
+        folder_path: The absolute or relative path to the folder to scan.
+
+    Returns:
+        A tuple containing two lists:
+        - A list of the extracted hashes (strings).
+        - A list of the corresponding full file paths (strings).
+        Returns empty lists if the folder doesn't exist or no valid files are found.
+    """
+    textures = find_dds_textures(folder_path)
+    return [t['hash'] for t in textures], [t['path'] for t in textures]
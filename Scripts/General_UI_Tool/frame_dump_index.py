@@ -0,0 +1,230 @@
+import io
+import os
+import re
+import sqlite3
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    from General_UI_Tool.bcn_decoder import load_preview
+    from General_UI_Tool.dds_header import validate_dds
+except ImportError:
+    from bcn_decoder import load_preview
+    from dds_header import validate_dds
+
+# Index database, next to config.json in the directory the tools are run from
+INDEX_PATH = 'frame_dump_index.db'
+THUMBNAIL_SIZE = (128, 128)
+
+# Regex to capture the first hexadecimal hash in filenames like:
+# '...t0=a1b2c3d4(e5f6g7h8).dds'
+HASH_PATTERN = re.compile(r't0=([a-f0-9]+)\([a-f0-9]+\)')
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    folder TEXT NOT NULL,
+    filename TEXT NOT NULL,
+    hash TEXT NOT NULL,
+    width INTEGER,
+    height INTEGER,
+    format TEXT,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    valid INTEGER NOT NULL,
+    thumbnail BLOB,
+    fingerprint INTEGER,
+    PRIMARY KEY (folder, filename)
+);
+CREATE INDEX IF NOT EXISTS files_hash ON files (hash);
+CREATE TABLE IF NOT EXISTS thumbnails (
+    path TEXT PRIMARY KEY,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    thumbnail BLOB NOT NULL
+);
+"""
+
+def _normalize_folder(folder_path):
+    return os.path.normcase(os.path.abspath(folder_path))
+
+def _validate(path):
+    """Header check for one file; returns the header dict or None for broken files."""
+    try:
+        return validate_dds(path)
+    except (OSError, ValueError) as e:
+        print(f"Skipping un-viewable file {os.path.basename(path)}: {e}")
+        return None
+
+def _row_to_texture(folder, row):
+    filename, texture_hash, width, height, dds_format = row
+    return {
+        'hash': texture_hash,
+        'path': os.path.join(folder, filename),
+        'width': width,
+        'height': height,
+        'format': dds_format,
+    }
+
+def make_thumbnail_png(path, size=THUMBNAIL_SIZE):
+    """Decode an image or DDS and return a small PNG of it as bytes."""
+    image = load_preview(path, size)
+    buffer = io.BytesIO()
+    image.save(buffer, format='PNG')
+    return buffer.getvalue()
+
+class FrameDumpIndex:
+    """
+    SQLite index of scanned frame-analysis folders.
+
+    Every hash-named DDS file is stored with its dims, format, size and mtime, plus a
+    small PNG thumbnail and perceptual fingerprint once requested. Files that fail
+    validation are kept as invalid rows so they are not re-checked until they change. Thumbnails of other
+    files (e.g. saved templates) are cached in a separate table keyed by path.
+    """
+
+    def __init__(self, db_path=INDEX_PATH):
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.executescript(SCHEMA)
+            # Databases created before fingerprints were cached
+            columns = {row[1] for row in self._conn.execute("PRAGMA table_info(files)")}
+            if 'fingerprint' not in columns:
+                self._conn.execute("ALTER TABLE files ADD COLUMN fingerprint INTEGER")
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def scan(self, folder_path, max_workers=None):
+        """
+        Bring the index of `folder_path` up to date and return its valid textures.
+
+        Only files whose size or mtime changed since the last scan, and new files, are
+        validated (on a thread pool); rows of deleted files are dropped.
+        """
+        folder = _normalize_folder(folder_path)
+        on_disk = {}
+        with os.scandir(folder_path) as entries:
+            for entry in entries:
+                if entry.name.lower().endswith('.dds') and entry.is_file():
+                    match = HASH_PATTERN.search(entry.name)
+                    if match:
+                        stat = entry.stat()
+                        on_disk[entry.name] = (match.group(1), stat.st_size, stat.st_mtime_ns)
+
+        with self._lock:
+            known = {filename: (size, mtime_ns) for filename, size, mtime_ns in self._conn.execute(
+                "SELECT filename, size, mtime_ns FROM files WHERE folder = ?", (folder,))}
+
+        changed = sorted(name for name, (_, size, mtime_ns) in on_disk.items() if known.get(name) != (size, mtime_ns))
+        removed = [name for name in known if name not in on_disk]
+
+        if changed:
+            print(f"Indexing {len(changed)} new or changed files in {folder_path}...")
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                headers = list(executor.map(_validate, [os.path.join(folder_path, name) for name in changed]))
+        else:
+            headers = []
+
+        rows = []
+        for name, info in zip(changed, headers):
+            texture_hash, size, mtime_ns = on_disk[name]
+            if info is None:
+                rows.append((folder, name, texture_hash, None, None, None, size, mtime_ns, 0))
+            else:
+                rows.append((folder, name, texture_hash, info['width'], info['height'], info['format'], size, mtime_ns, 1))
+
+        with self._lock, self._conn:
+            if removed:
+                self._conn.executemany("DELETE FROM files WHERE folder = ? AND filename = ?",
+                                       [(folder, name) for name in removed])
+            # REPLACE also clears the cached thumbnail and fingerprint of a changed file
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO files (folder, filename, hash, width, height, format, size, mtime_ns, valid) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", rows)
+
+        return self.textures(folder_path)
+
+    def textures(self, folder_path):
+        """Valid textures of an already scanned folder, sorted by file name."""
+        folder = _normalize_folder(folder_path)
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT filename, hash, width, height, format FROM files "
+                "WHERE folder = ? AND valid = 1 ORDER BY filename", (folder,)).fetchall()
+        return [_row_to_texture(folder_path, row) for row in rows]
+
+    def find_hash(self, texture_hash):
+        """Every indexed texture with the given hash, across all scanned folders."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT folder, filename, hash, width, height, format FROM files "
+                "WHERE hash = ? AND valid = 1 ORDER BY folder, filename", (texture_hash,)).fetchall()
+        return [_row_to_texture(row[0], row[1:]) for row in rows]
+
+    def fingerprints(self, folder_path):
+        """Cached perceptual fingerprints of a scanned folder's valid textures, as {filename: int}."""
+        folder = _normalize_folder(folder_path)
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT filename, fingerprint FROM files "
+                "WHERE folder = ? AND valid = 1 AND fingerprint IS NOT NULL", (folder,)).fetchall()
+        # SQLite integers are signed 64-bit
+        return {filename: fingerprint & 0xFFFFFFFFFFFFFFFF for filename, fingerprint in rows}
+
+    def store_fingerprints(self, folder_path, fingerprints):
+        """Cache {filename: 64-bit fingerprint} for files of a scanned folder."""
+        folder = _normalize_folder(folder_path)
+        rows = [(fingerprint - (1 << 64) if fingerprint >= (1 << 63) else fingerprint, folder, filename)
+                for filename, fingerprint in fingerprints.items()]
+        with self._lock, self._conn:
+            self._conn.executemany("UPDATE files SET fingerprint = ? WHERE folder = ? AND filename = ?", rows)
+
+    def thumbnail(self, path):
+        """
+        PNG bytes of a small thumbnail for `path`, from the index when cached.
+
+        Cached thumbnails are reused while the file's size and mtime still match. Safe to
+        call from worker threads.
+        """
+        folder, filename = _normalize_folder(os.path.dirname(path)), os.path.basename(path)
+        stat = os.stat(path)
+        current = (stat.st_size, stat.st_mtime_ns)
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT size, mtime_ns, thumbnail FROM files WHERE folder = ? AND filename = ?",
+                (folder, filename)).fetchone()
+            if row is None:
+                row = self._conn.execute(
+                    "SELECT size, mtime_ns, thumbnail FROM thumbnails WHERE path = ?",
+                    (os.path.join(folder, filename),)).fetchone()
+                indexed = False
+            else:
+                indexed = True
+        if row and row[2] is not None and (row[0], row[1]) == current:
+            return row[2]
+
+        png = make_thumbnail_png(path)
+        with self._lock, self._conn:
+            if indexed:
+                # A changed indexed file keeps its stale row until the next scan; don't cache against it
+                if (row[0], row[1]) == current:
+                    self._conn.execute("UPDATE files SET thumbnail = ? WHERE folder = ? AND filename = ?",
+                                       (png, folder, filename))
+            else:
+                self._conn.execute("INSERT OR REPLACE INTO thumbnails (path, size, mtime_ns, thumbnail) VALUES (?, ?, ?, ?)",
+                                   (os.path.join(folder, filename), current[0], current[1], png))
+        return png
+
+_index = None
+_index_lock = threading.Lock()
+
+def get_index():
+    """The shared index, opened on first use."""
+    global _index
+    with _index_lock:
+        if _index is None:
+            _index = FrameDumpIndex()
+        return _index
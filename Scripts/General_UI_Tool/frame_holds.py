@@ -0,0 +1,88 @@
+from concurrent.futures import ThreadPoolExecutor
+from itertools import chain
+
+import numpy as np
+from PIL import Image
+
+try:
+    from General_UI_Tool.bcn_decoder import load_preview
+    from General_UI_Tool.frame_selection import iter_branch_lines
+except ImportError:
+    from bcn_decoder import load_preview
+    from frame_selection import iter_branch_lines
+
+# Frames are compared on copies of this size; plenty to tell motion from encoder noise
+COMPARE_SIZE = (64, 64)
+# Mean absolute difference per RGBA channel (0-255) up to which a frame repeats its span's first frame
+DEFAULT_HOLD_THRESHOLD = 1.5
+# Frames compared against a span's first frame per vectorized step
+COMPARE_WINDOW = 64
+
+def load_small_frames(paths, size=COMPARE_SIZE, max_workers=None):
+    """Stack of the frames as uint8 RGBA arrays of `size`, shape (N, height, width, 4), decoded on a thread pool."""
+    def small(path):
+        return np.asarray(load_preview(path, size).resize(size, Image.BILINEAR), dtype=np.uint8)
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        return np.stack(list(executor.map(small, paths)))
+
+def merge_holds(stack, threshold=DEFAULT_HOLD_THRESHOLD, max_hold=None):
+    """
+    Spans of frames that look the same, as [(first frame index, hold count), ...].
+
+    Each frame is compared with its span's first frame rather than only its neighbour, so a
+    slow fade can't drift through many small steps into one span. `max_hold` caps the
+    frames per span.
+    """
+    spans = []
+    key, count = 0, len(stack)
+    while key < count:
+        limit = count if max_hold is None else min(count, key + max_hold)
+        end = key + 1
+        while end < limit:
+            window = stack[end:min(limit, end + COMPARE_WINDOW)]
+            differences = np.abs(window.astype(np.int16) - stack[key]).mean(axis=(1, 2, 3))
+            over = np.flatnonzero(differences > threshold)
+            if len(over):
+                end += int(over[0])
+                break
+            end += len(window)
+        spans.append((key, end - key))
+        key = end
+    return spans
+
+def analyze_holds(paths, threshold=DEFAULT_HOLD_THRESHOLD, max_hold=None, max_workers=None):
+    """merge_holds() for frame files."""
+    if not paths:
+        return []
+    return merge_holds(load_small_frames(paths, max_workers=max_workers), threshold, max_hold)
+
+def has_holds(holds):
+    return bool(holds) and any(hold > 1 for hold in holds)
+
+def hold_constants():
+    """[Constants] lines for hold timing."""
+    return ["global $holdvar = 0", "global $framehold = 1"]
+
+def hold_advance_lines(variable, last, tick, holds, mode='auto'):
+    """
+    [Present] lines advancing `variable` through frames 0..last, showing frame i for holds[i] ticks.
+
+    Only frames held longer than one tick get a case in the duration lookup, which runs on
+    ticks alone.
+    """
+    durations = iter_branch_lines(variable, last + 1, lambda i: [f"$framehold = {holds[i]}"] if holds[i] > 1 else [],
+                                  mode, indent="    ")
+    return chain([f"if {tick}",
+                  "    $holdvar = $holdvar + 1",
+                  "    $framehold = 1"],
+                 durations,
+                 ["    if $holdvar >= $framehold",
+                  "        $holdvar = 0",
+                  f"        if {variable} < {last}",
+                  f"            {variable} = {variable} + 1",
+                  "        else",
+                  f"            {variable} = 0",
+                  "        endif",
+                  "    endif",
+                  "endif"])
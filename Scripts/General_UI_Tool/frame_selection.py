@@ -0,0 +1,125 @@
+from itertools import chain
+
+# How the CommandlistFrame picks the resource for the current frame:
+# 'linear' - if $framevar == 0 / else if $framevar == 1 / ... (up to N comparisons per draw)
+# 'tree'   - nested if $framevar < k halving the range (about log2(N) comparisons per draw)
+# 'auto'   - 'tree' above BINARY_SEARCH_THRESHOLD frames, 'linear' otherwise
+FRAME_SELECT_MODES = ('auto', 'linear', 'tree')
+BINARY_SEARCH_THRESHOLD = 8
+INDENT = "    "
+
+def resolve_mode(frame_count, mode='auto'):
+    if mode not in FRAME_SELECT_MODES:
+        raise ValueError(f"Unknown frame selection mode '{mode}'")
+    if mode == 'auto':
+        return 'tree' if frame_count > BINARY_SEARCH_THRESHOLD else 'linear'
+    return mode
+
+def _peek(lines):
+    """`lines` as an iterator still holding its first line, or None when there are no lines."""
+    iterator = iter(lines)
+    for first in iterator:
+        return chain((first,), iterator)
+    return None
+
+def _branch(branch, i, indent):
+    return (indent + line for line in branch(i))
+
+def _tree_lines(variable, low, high, branch, indent):
+    """
+    Lines running branch(i) for `variable` in [low, high) by halving the range; empty subtrees are left out.
+
+    Lines are produced lazily and only one path down the tree is looked ahead at a time,
+    so memory stays proportional to the tree depth.
+    """
+    if high - low == 1:
+        yield from _branch(branch, low, indent)
+        return
+    middle = (low + high) // 2
+    inner = indent + INDENT
+    left = _peek(_tree_lines(variable, low, middle, branch, inner))
+    if left is None:
+        right = _peek(_tree_lines(variable, middle, high, branch, inner))
+        if right is not None:
+            yield f"{indent}if {variable} >= {middle}"
+            yield from right
+            yield f"{indent}endif"
+        return
+    yield f"{indent}if {variable} < {middle}"
+    yield from left
+    right = _peek(_tree_lines(variable, middle, high, branch, inner))
+    if right is not None:
+        yield f"{indent}else"
+        yield from right
+    yield f"{indent}endif"
+
+def _full_tree_lines(variable, low, high, branch, indent):
+    """
+    _tree_lines() for branches that are never empty, such as frame selection.
+
+    Walks the tree with an explicit stack instead of nested generators, so each line costs
+    the same however deep it is; long animations have hundreds of thousands of them.
+    """
+    stack = [(low, high, indent)]
+    while stack:
+        item = stack.pop()
+        if isinstance(item, str):
+            yield item
+            continue
+        low, high, indent = item
+        if high - low == 1:
+            for line in branch(low):
+                yield indent + line
+            continue
+        middle = (low + high) // 2
+        inner = indent + INDENT
+        yield f"{indent}if {variable} < {middle}"
+        stack += [f"{indent}endif", (middle, high, inner), f"{indent}else", (low, middle, inner)]
+
+def _linear_lines(variable, count, branch, chained, indent):
+    opened = False
+    for i in range(count):
+        body = _peek(_branch(branch, i, indent + INDENT))
+        if body is not None:
+            keyword = "if" if not opened and not chained else "else if"
+            opened = True
+            yield f"{indent}{keyword} {variable} == {i}"
+            yield from body
+    if opened and not chained:
+        yield f"{indent}endif"
+
+def iter_branch_lines(variable, count, branch, mode='auto', chained=False, indent="", tree_lines=_tree_lines):
+    """branch_lines() produced one line at a time, every line prefixed with `indent`."""
+    if resolve_mode(count, mode) == 'linear':
+        return _linear_lines(variable, count, branch, chained, indent)
+    if not chained:
+        return tree_lines(variable, 0, count, branch, indent)
+    tree = _peek(tree_lines(variable, 0, count, branch, indent + INDENT))
+    return chain((f"{indent}else",), tree) if tree is not None else iter(())
+
+def branch_lines(variable, count, branch, mode='auto', chained=False):
+    """
+    Command list lines running the lines of branch(i) when `variable` == i, for i in 0..count-1.
+
+    Indices whose branch is empty get no case. With `chained`, the lines continue an `if`
+    opened by the caller (starting with 'else if' or 'else') and the caller's own `endif`
+    closes them; otherwise they form a complete block.
+
+    Both modes run the same branch for every value 0..count-1. Values outside that range
+    run nothing in 'linear' mode and the nearest end branch in 'tree' mode.
+    """
+    return list(iter_branch_lines(variable, count, branch, mode, chained))
+
+def frame_selection_lines(variable, resource, frame_count, mode='auto', chained=False, indent=""):
+    """
+    Command list lines assigning `this = <resource>` for the frame in `variable`, produced lazily.
+
+    `resource` is a format string taking the frame index, e.g. 'ResourceFrame{}'. See
+    branch_lines() for `mode` and `chained`.
+    """
+    return iter_branch_lines(variable, frame_count, lambda i: (f"this = {resource.format(i)}",), mode, chained, indent,
+                             tree_lines=_full_tree_lines)
+
+def frame_selection(variable, resource, frame_count, mode='auto', chained=False, indent=""):
+    """frame_selection_lines() joined into a block, every line prefixed with `indent`."""
+    return "\n".join(frame_selection_lines(variable, resource, frame_count, mode, chained, indent))
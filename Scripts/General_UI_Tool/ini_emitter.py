@@ -0,0 +1,69 @@
+# Shared writer for the generated mod INIs. Sections are written to the file as their lines
+# are produced, so an animation with tens of thousands of frames never exists as one string.
+
+class Section:
+    """
+    One INI section: a [name] header followed by its body lines.
+
+    `body` may be any iterable of lines, including a generator, so long sections are
+    produced while they are being written.
+    """
+
+    def __init__(self, name, body=()):
+        self.name = name
+        self.body = body
+
+    def lines(self):
+        yield f"[{self.name}]"
+        yield from self.body
+
+class IniWriter:
+    """
+    Writes INI lines to a text stream as they are produced.
+
+    Lines are separated by newlines; whether the file ends with one is decided by finish().
+    """
+
+    def __init__(self, stream):
+        self.stream = stream
+        self._started = False
+
+    def lines(self, lines):
+        lines = iter(lines)
+        if not self._started:
+            for first in lines:
+                self.stream.write(first)
+                self._started = True
+                break
+        self.stream.writelines("\n" + line for line in lines)
+
+    def line(self, text=""):
+        self.lines((text,))
+
+    def blank(self):
+        self.line()
+
+    def text(self, text):
+        """Newline-separated lines from a string; an empty string writes nothing."""
+        self.lines(text.splitlines())
+
+    def section(self, section):
+        self.lines(section.lines())
+
+    def sections(self, sections, separator=False):
+        """Write each section in turn, with a blank line between them if `separator`."""
+        for i, section in enumerate(sections):
+            if separator and i:
+                self.blank()
+            self.section(section)
+
+    def finish(self, final_newline=True):
+        if final_newline and self._started:
+            self.stream.write("\n")
+
+def write_ini(path, write, final_newline=True, encoding=None):
+    """Open `path` and call write(writer) with an IniWriter on it."""
+    with open(path, 'w', encoding=encoding) as stream:
+        writer = IniWriter(stream)
+        write(writer)
+        writer.finish(final_newline)
@@ -1,63 +1,71 @@
+import argparse
+import io
 import os
-import shutil
 import sys
+from itertools import chain
 from pathlib import Path
 
-def generate_ini_content(folder_name, hash_value, num_frames, file_type):
-    ini_content = f"""[Constants]
-global $framevar = 0
-global $active
-global $fpsvar = 0
-global $speedtoggle
-
-[Present]
-post $active = 0
-if $active == 1 && $fpsvar < 60
-    $fpsvar = $fpsvar + 24
-    $speedtoggle = 0
-endif
-if $fpsvar >= 60
-    $fpsvar = $fpsvar - 60
-    $speedtoggle = 1
-endif
-if $framevar < {num_frames} && $speedtoggle == 1
-    $framevar = $framevar + 1
-else if $framevar == {num_frames}
-    $framevar = 0
-endif
-
-[TextureOverrideFrame]
-hash = {hash_value}
-run = CommandlistFrame
-$active = 1
-
-[CommandlistFrame]"""
-
-    # Build frame conditions
-    frame_conditions = []
-    for i in range(num_frames + 1):
-        if i == 0:
-            frame_conditions.append(f"""
-if $framevar == 0
-    this = ResourceFrame0""")
-        else:
-            frame_conditions.append(f"""
-else if $framevar == {i}
-    this = ResourceFrame{i}""")
-    
-    ini_content += ''.join(frame_conditions)
-    ini_content += "\nendif\n\n"
-    
+try:
+    from General_UI_Tool.frame_selection import frame_selection_lines, FRAME_SELECT_MODES
+    from General_UI_Tool.ini_emitter import IniWriter, Section, write_ini
+    from General_UI_Tool.package_sync import sync_files, LINK_MODES
+    from General_UI_Tool.frame_holds import analyze_holds, has_holds, hold_constants, hold_advance_lines, DEFAULT_HOLD_THRESHOLD
+    from General_UI_Tool.shared_clock import clock_constants, clock_update, tick_condition, install_clock_ini
+except ImportError:
+    from frame_selection import frame_selection_lines, FRAME_SELECT_MODES
+    from ini_emitter import IniWriter, Section, write_ini
+    from package_sync import sync_files, LINK_MODES
+    from frame_holds import analyze_holds, has_holds, hold_constants, hold_advance_lines, DEFAULT_HOLD_THRESHOLD
+    from shared_clock import clock_constants, clock_update, tick_condition, install_clock_ini
+
+def write_ini_content(writer, folder_name, hash_value, num_frames, file_type, frame_select='auto', shared_clock=False,
+                      holds=None):
+    """
+    Write the mod INI for frames 0..num_frames.
+
+    `holds` optionally gives the ticks each frame is shown for (see frame_holds); without
+    it every frame lasts one tick.
+    """
+    held = has_holds(holds)
+    writer.section(Section("Constants", ["global $framevar = 0", "global $active", *(hold_constants() if held else [])]))
+    writer.text(clock_constants(shared_clock))
+    writer.blank()
+    if held:
+        advance = hold_advance_lines('$framevar', num_frames, tick_condition(shared_clock), holds, frame_select)
+    else:
+        advance = [f"if $framevar < {num_frames} && {tick_condition(shared_clock)}",
+                   "    $framevar = $framevar + 1",
+                   f"else if $framevar == {num_frames}",
+                   "    $framevar = 0",
+                   "endif"]
+    writer.section(Section("Present", chain(["post $active = 0"], clock_update(shared_clock).splitlines(), advance)))
+    writer.blank()
+    writer.section(Section("TextureOverrideFrame", [f"hash = {hash_value}", "run = CommandlistFrame", "$active = 1"]))
+    writer.blank()
+
+    # Build frame conditions (frames 0..num_frames)
+    writer.section(Section("CommandlistFrame", frame_selection_lines('$framevar', 'ResourceFrame{}', num_frames + 1, frame_select)))
+    writer.blank()
+
     # Add resource frames
-    resource_frames = []
-    for i in range(num_frames + 1):
-        resource_frames.append(f"""[ResourceFrame{i}]
-filename = {hash_value} - {folder_name}/{i}.{file_type}""")
-    
-    ini_content += '\n'.join(resource_frames)
-    return ini_content
-
-def generate_package(input_folder, hash_value, output_folder):
+    writer.sections(Section(f"ResourceFrame{i}", [f"filename = {hash_value} - {folder_name}/{i}.{file_type}"])
+                    for i in range(num_frames + 1))
+
+def generate_ini_content(folder_name, hash_value, num_frames, file_type, frame_select='auto', shared_clock=False,
+                         holds=None):
+    stream = io.StringIO()
+    write_ini_content(IniWriter(stream), folder_name, hash_value, num_frames, file_type, frame_select, shared_clock, holds)
+    return stream.getvalue()
+
+def generate_package(input_folder, hash_value, output_folder, frame_select='auto', shared_clock=False,
+                     link_mode='copy', deploy_folder=None, hold_threshold=None):
+    """
+    Build the mod in `output_folder` and, if given, sync it into `deploy_folder` (e.g. the game's Mods folder).
+
+    Frames are synced through a per-mod manifest, so rebuilding or redeploying only copies
+    (or links, see package_sync.LINK_MODES) the files that changed. With `hold_threshold`,
+    runs of near-identical frames are packaged once and held in the INI (see frame_holds).
+    """
     try:
         folder_name = os.path.basename(input_folder)
         dds_folder = os.path.join(input_folder, "dds")
@@ -80,54 +88,71 @@ def generate_package(input_folder, hash_value, output_folder):
         if not frame_files:
             raise Exception("No valid frame files found!")
 
+        holds = None
+        if hold_threshold is not None:
+            spans = analyze_holds([os.path.join(source_folder, f) for f in frame_files], hold_threshold)
+            print(f"Merged {len(frame_files)} frames into {len(spans)} held frames")
+            holds = [hold for _, hold in spans]
+            # Kept frames are renumbered so the frame files stay 0..N
+            frame_files = [(f"{i}{os.path.splitext(frame_files[first])[1]}", frame_files[first])
+                           for i, (first, _) in enumerate(spans)]
+        else:
+            frame_files = [(file, file) for file in frame_files]
+
         num_frames = len(frame_files) - 1
         
-        # Generate INI content
-        ini_content = generate_ini_content(folder_name, hash_value, num_frames, file_type)
-        ini_filename = f"{folder_name}.ini"
+        # Frame files go in a subfolder named after the hash value
+        frames_folder = f"{hash_value} - {folder_name}"
+        package = {f"{frames_folder}/{name}": os.path.join(source_folder, file) for name, file in frame_files}
+        stats = sync_files(package, output_folder, folder_name, link_mode)
+        print(f"Frames: {stats['placed']} updated, {stats['unchanged']} unchanged, {stats['removed']} removed")
         
         # Write INI file
-        with open(ini_filename, 'w') as f:
-            f.write(ini_content)
-        
-        # Create output folder if it doesn't exist
-        os.makedirs(output_folder, exist_ok=True)
-        
-        # Create subfolder named after the hash value
-        hash_folder = os.path.join(output_folder, hash_value)
-        os.makedirs(f"{hash_folder} - {folder_name}", exist_ok=True)
-        
-        # Copy frame files to the hash subfolder
-        for file in frame_files:
-            file_path = os.path.join(source_folder, file)
-            shutil.copy(file_path, os.path.join(f"{hash_folder} - {folder_name}", file))
-        
-        # Copy INI file to the output folder
-        shutil.copy(ini_filename, os.path.join(output_folder, ini_filename))
-        
-        # Cleanup
-        os.remove(ini_filename)
+        ini_filename = f"{folder_name}.ini"
+        write_ini(os.path.join(output_folder, ini_filename), lambda writer: write_ini_content(
+            writer, folder_name, hash_value, num_frames, file_type, frame_select, shared_clock, holds), final_newline=False)
+        if shared_clock:
+            install_clock_ini(output_folder)
         print(f"Package generated successfully: {output_folder}")
+
+        if deploy_folder:
+            built = {relative: os.path.join(output_folder, relative) for relative in [*package, ini_filename]}
+            stats = sync_files(built, deploy_folder, folder_name, link_mode)
+            if shared_clock:
+                install_clock_ini(deploy_folder)
+            print(f"Deployed to {deploy_folder}: {stats['placed']} updated, {stats['unchanged']} unchanged, "
+                  f"{stats['removed']} removed")
         
     except Exception as e:
         print(f"Error: {str(e)}")
         sys.exit(1)
 
 def main():
-    if len(sys.argv) != 4:
-        print("Usage: python ini_maker.py <hash_value> <input_folder> <output_folder>")
-        print("Example: python ini_maker.py 1234abcd ./extracted_frames/character1 ./output_folder")
-        sys.exit(1)
-    
-    hash_value = sys.argv[1]
-    input_folder = sys.argv[2]
-    output_folder = sys.argv[3]
-    
-    if not os.path.exists(input_folder):
-        print(f"Error: Input folder '{input_folder}' does not exist")
+    parser = argparse.ArgumentParser(
+        description='Generate an animated texture mod from a folder of frames.',
+        epilog='Example: python ini_maker_v2.py 1234abcd ./extracted_frames/character1 ./output_folder')
+    parser.add_argument('hash_value', help='Hash of the texture to replace.')
+    parser.add_argument('input_folder', help='Folder of numbered frames (or containing a dds/ subfolder).')
+    parser.add_argument('output_folder', help='Folder to write the mod to.')
+    parser.add_argument('--frame-select', choices=FRAME_SELECT_MODES, default='auto',
+                        help="How the INI picks the current frame (default: auto, a binary search for long animations)")
+    parser.add_argument('--shared-clock', action='store_true',
+                        help='Time the animation from the shared clock INI, written to the output folder.')
+    parser.add_argument('--link', choices=LINK_MODES, default='copy',
+                        help='How frame files are placed: copy, hardlink or reflink (default: copy)')
+    parser.add_argument('--deploy', metavar='MODS_FOLDER',
+                        help="Also sync the built mod into this folder, e.g. the game's Mods folder.")
+    parser.add_argument('--merge-holds', nargs='?', type=float, const=DEFAULT_HOLD_THRESHOLD, metavar='THRESHOLD',
+                        help='Store runs of near-identical frames once and hold them in the INI. THRESHOLD is the mean '
+                             f'per-channel difference (0-255) still counted as the same frame (default: {DEFAULT_HOLD_THRESHOLD})')
+    args = parser.parse_args()
+
+    if not os.path.exists(args.input_folder):
+        print(f"Error: Input folder '{args.input_folder}' does not exist")
         sys.exit(1)
-        
-    generate_package(input_folder, hash_value, output_folder)
+
+    generate_package(args.input_folder, args.hash_value, args.output_folder, args.frame_select, args.shared_clock,
+                     args.link, args.deploy, args.merge_holds)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -4,18 +4,29 @@ import json
 import shutil
 import subprocess
 import re
-import imageio.v2 as imageio
 from pathlib import Path
 
 from PyQt5.QtWidgets import (QApplication, QWidget, QVBoxLayout, QHBoxLayout, QLabel, QLineEdit,
                              QPushButton, QFileDialog, QSlider, QGridLayout, QFrame, QDialog,
                              QDialogButtonBox, QMainWindow, QProgressBar, QScrollArea, QTabWidget,
-                             QMessageBox, QComboBox, QCompleter)
-from PyQt5.QtCore import Qt, QTimer, QThread, pyqtSignal, QSize
+                             QMessageBox, QComboBox, QCompleter, QCheckBox)
+from PyQt5.QtCore import Qt, QTimer, QThread, pyqtSignal, QSize, QStringListModel
 from PyQt5.QtGui import QPixmap, QImage, QIcon, QPalette
 
 from PIL import Image, ImageSequence
 
+from General_UI_Tool.bcn_decoder import load_image
+from General_UI_Tool.find_hashes import find_dds_textures
+from General_UI_Tool.frame_selection import frame_selection_lines
+from General_UI_Tool.frame_holds import analyze_holds, has_holds, hold_constants, hold_advance_lines
+from General_UI_Tool.ini_emitter import Section, write_ini
+from General_UI_Tool.shared_clock import clock_constants, clock_update, tick_condition, install_clock_ini
+from General_UI_Tool.ui_hash_registry import get_registry
+from General_UI_Tool.thumbnail_grid import ThumbnailGrid, texture_tooltip
+from General_UI_Tool.budget_planner import estimate_mod_cost, describe_cost
+from General_UI_Tool.alpha_analysis import FORMAT_CHOICES, AUTO_FORMAT_HELP, classify_image, select_format
+from General_UI_Tool.resampling import resize, pick_backend_for
+
 # --- Global Constants ---
 CONFIG_FILE = "config.json"
 TEMPLATE_OPACITY = 255
@@ -24,23 +35,6 @@ TEXCONV_PATH = 'General_UI_Tool/texconv.exe'
 
 # --- Helper Functions ---
 
-def load_character_hashes(file_path):
-    hashes = {}
-    try:
-        with open(file_path, "r", encoding='utf-8') as file:
-            for line in file:
-                line = line.strip()
-                if not line or " --> " not in line: continue
-                name, hash_value = line.split(" --> ", 1)
-                hashes[name.strip()] = hash_value.strip()
-    except FileNotFoundError:
-        print(f"Warning: Character hashes file not found at '{file_path}'")
-    except Exception as e:
-        print(f"An error occurred while loading character hashes: {e}")
-    return hashes
-
-CHARACTER_HASHES = load_character_hashes("UI_Hashes.txt")
-
 def load_config():
     if os.path.exists(CONFIG_FILE):
         try:
@@ -57,93 +51,51 @@ def save_config(folder_path):
     except IOError as e:
         print(f"Error saving config: {e}")
 
-def generate_frame_conditions(frame_count):
-    return "\n".join([f"else if $framevar == {i}\n    this = ResourceFrame{i}" for i in range(1, frame_count)])
+def generate_frame_conditions(frame_count, frame_select='auto'):
+    return frame_selection_lines('$framevar', 'ResourceFrame{}', frame_count, frame_select)
 
 def generate_resource_frames(char_name, hash_value, frame_count):
-    return "\n".join([f"[ResourceFrame{i}]\nfilename = {hash_value} - {char_name}/{i}.dds" for i in range(frame_count)])
-
-def generate_ini_file(char_name, hash_value, frame_count):
-    template = f"""[Constants]
-global $framevar = 0
-global $active
-global $fpsvar = 0
-global $speedtoggle
-
-[Present]
-post $active = 0
-if $active == 1 && $fpsvar < 60
-    $fpsvar = $fpsvar + 24
-    $speedtoggle = 0
-endif
-if $fpsvar >= 60
-    $fpsvar = $fpsvar - 60
-    $speedtoggle = 1
-endif
-if $framevar < {frame_count - 1} && $speedtoggle == 1
-    $framevar = $framevar + 1
-else if $framevar >= {frame_count - 1}
-    $framevar = 0
-endif
-
-[TextureOverrideFrame]
-hash = {hash_value}
-run = CommandlistFrame
-$active = 1
-
-[CommandlistFrame]
-if $framevar == 0
-    this = ResourceFrame0
-{generate_frame_conditions(frame_count)}
-endif
-
-{generate_resource_frames(char_name, hash_value, frame_count)}
-"""
+    return (Section(f"ResourceFrame{i}", [f"filename = {hash_value} - {char_name}/{i}.dds"]) for i in range(frame_count))
+
+def write_ini_content(writer, char_name, hash_value, frame_count, frame_select='auto', shared_clock=False, holds=None):
+    held = has_holds(holds)
+    writer.section(Section("Constants", ["global $framevar = 0", "global $active", *(hold_constants() if held else [])]))
+    writer.text(clock_constants(shared_clock))
+    writer.blank()
+    if held:
+        advance = hold_advance_lines('$framevar', frame_count - 1, tick_condition(shared_clock), holds, frame_select)
+    else:
+        advance = [f"if $framevar < {frame_count - 1} && {tick_condition(shared_clock)}",
+                   "    $framevar = $framevar + 1",
+                   f"else if $framevar >= {frame_count - 1}",
+                   "    $framevar = 0",
+                   "endif"]
+    writer.section(Section("Present", ["post $active = 0", *clock_update(shared_clock).splitlines(), *advance]))
+    writer.blank()
+    writer.section(Section("TextureOverrideFrame", [f"hash = {hash_value}", "run = CommandlistFrame", "$active = 1"]))
+    writer.blank()
+    writer.section(Section("CommandlistFrame", generate_frame_conditions(frame_count, frame_select)))
+    writer.blank()
+    writer.sections(generate_resource_frames(char_name, hash_value, frame_count))
+
+def generate_ini_file(char_name, hash_value, frame_count, frame_select='auto', shared_clock=False, holds=None):
     try:
         filename = f"{char_name}.ini"
-        with open(filename, "w", encoding='utf-8') as file:
-            file.write(template)
+        write_ini(filename, lambda writer: write_ini_content(writer, char_name, hash_value, frame_count, frame_select, shared_clock,
+                                                             holds), encoding='utf-8')
         return filename
     except IOError as e:
         print(f"Error generating INI file: {e}")
         return None
 
-def find_dds_hashes(folder_path):
-    hashes, paths = [], []
-    if not os.path.isdir(folder_path): return hashes, paths
-    pattern = re.compile(r't0=([a-f0-9]+)\([a-f0-9]+\)')
-    for filename in sorted(os.listdir(folder_path)):
-        if filename.lower().endswith(".dds"):
-            if match := pattern.search(filename):
-                file_path = os.path.join(folder_path, filename)
-                try:
-                    imageio.imread(file_path) # Verify file is readable
-                    hashes.append(match.group(1))
-                    paths.append(file_path)
-                except Exception as e:
-                    print(f"Skipping un-viewable file {filename}: {e}")
-    return hashes, paths
-
 # --- UI Helper Classes ---
 
-class ThumbnailLabel(QLabel):
-    clicked = pyqtSignal()
-    def __init__(self, parent=None): super().__init__(parent); self.setCursor(Qt.PointingHandCursor)
-    def mousePressEvent(self, event): self.clicked.emit()
-    def set_selected(self, is_selected):
-        self.setProperty("selected", is_selected)
-        self.style().unpolish(self); self.style().polish(self)
-
 class TemplateSelectionDialog(QDialog):
     def __init__(self, parent=None):
         super().__init__(parent)
         self.setWindowTitle("Select Template"); self.setMinimumSize(700, 600)
         self.selected_path = None
         layout = QVBoxLayout(self)
-        try:
-            highlight_color = self.palette().color(QPalette.Highlight).name()
-            self.setStyleSheet(f"QLabel[selected=true] {{ border: 2px solid {highlight_color}; }}")
-        except Exception: pass
 
         tabs = QTabWidget(); tabs.addTab(self._create_recent_tab(), "Recent Templates")
         tabs.addTab(self._create_dds_search_tab(), "Search DDS")
@@ -153,41 +105,21 @@ class TemplateSelectionDialog(QDialog):
         layout.addWidget(buttons)
 
     def _create_grid_widget(self):
-        scroll = QScrollArea(); scroll.setWidgetResizable(True)
-        container = QWidget(); grid = QGridLayout(container)
-        scroll.setWidget(container); return scroll, grid
+        grid = ThumbnailGrid()
+        grid.path_selected.connect(self._on_thumbnail_selected)
+        grid.path_activated.connect(self._on_thumbnail_activated)
+        return grid
 
-    def _create_pixmap_from_path(self, path, size):
-        try:
-            np_array = imageio.imread(path)
-            h, w, ch = np_array.shape
-            fmt = QImage.Format_RGBA8888 if ch == 4 else QImage.Format_RGB888
-            q_img = QImage(np_array.data, w, h, ch * w, fmt)
-            return QPixmap.fromImage(q_img).scaled(size, Qt.KeepAspectRatio, Qt.SmoothTransformation)
-        except Exception as e:
-            print(f"Could not load thumbnail for {path}: {e}"); return None
-
-    def _populate_grid(self, grid, paths):
-        while grid.count():
-            if child := grid.takeAt(0).widget(): child.deleteLater()
-        self.thumbnail_widgets = []
-        for i, path in enumerate(paths):
-            if pixmap := self._create_pixmap_from_path(path, QSize(128, 128)):
-                thumb = ThumbnailLabel(); thumb.setPixmap(pixmap)
-                thumb.setAlignment(Qt.AlignCenter); thumb.setProperty("file_path", path)
-                thumb.clicked.connect(self._on_thumbnail_clicked)
-                self.thumbnail_widgets.append(thumb); grid.addWidget(thumb, i // 4, i % 4)
-
-    def _on_thumbnail_clicked(self):
-        self.selected_path = self.sender().property("file_path")
-        for widget in self.thumbnail_widgets: widget.set_selected(widget == self.sender())
+    def _on_thumbnail_selected(self, path): self.selected_path = path
+
+    def _on_thumbnail_activated(self, path): self.selected_path = path; self.accept()
 
     def _create_recent_tab(self):
         widget = QWidget(); layout = QVBoxLayout(widget)
-        scroll, grid = self._create_grid_widget(); layout.addWidget(scroll)
+        self.recent_grid = self._create_grid_widget(); layout.addWidget(self.recent_grid)
         templates_dir = Path("templates")
         if templates_dir.is_dir():
-            self._populate_grid(grid, [str(p) for p in templates_dir.iterdir() if p.is_file()])
+            self.recent_grid.set_paths(sorted(str(p) for p in templates_dir.iterdir() if p.is_file()))
         else:
             layout.addWidget(QLabel("The 'templates' folder will be created when you select your first template."))
         return widget
@@ -195,15 +127,19 @@ class TemplateSelectionDialog(QDialog):
     def _create_dds_search_tab(self):
         widget = QWidget(); layout = QVBoxLayout(widget)
         btn = QPushButton("Browse for Folder Containing DDS Files...")
-        scroll, self.dds_grid = self._create_grid_widget(); layout.addWidget(btn); layout.addWidget(scroll)
+        self.dds_grid = self._create_grid_widget(); layout.addWidget(btn); layout.addWidget(self.dds_grid)
         btn.clicked.connect(self._search_for_dds)
         return widget
 
     def _search_for_dds(self):
         if folder := QFileDialog.getExistingDirectory(self, "Select Folder"):
-            _, paths = find_dds_hashes(folder)
-            if not paths: QMessageBox.information(self, "Not Found", "No viewable DDS files found.")
-            else: self._populate_grid(self.dds_grid, paths)
+            textures = find_dds_textures(folder)
+            if not textures: QMessageBox.information(self, "Not Found", "No viewable DDS files found.")
+            else: self.dds_grid.set_paths([t['path'] for t in textures], [texture_tooltip(t) for t in textures])
+
+    def done(self, result):
+        self.recent_grid.shutdown(); self.dds_grid.shutdown()
+        super().done(result)
 
     def _create_browse_file_tab(self):
         widget = QWidget(); layout = QVBoxLayout(widget); btn = QPushButton("Click to Browse for an Image File...")
@@ -223,13 +159,17 @@ class ProcessThread(QThread):
 
     # --- MODIFICATION START 1 ---
     # Added 'template_size' to handle resizing
-    def __init__(self, ui_element_name, hash_value, source_frame_paths, save_path, template_size):
+    def __init__(self, ui_element_name, hash_value, source_frame_paths, save_path, template_size, dds_format='auto', shared_clock=False,
+                 merge_holds=False):
         super().__init__()
         self.name = ui_element_name
         self.hash = hash_value
         self.source_frame_paths = source_frame_paths
         self.save_path = save_path
         self.target_width, self.target_height = template_size
+        self.dds_format = dds_format
+        self.shared_clock = shared_clock
+        self.merge_holds = merge_holds
     # --- MODIFICATION END 1 ---
 
     def run(self):
@@ -240,12 +180,21 @@ class ProcessThread(QThread):
             if not Path(TEXCONV_PATH).exists():
                 raise FileNotFoundError(f"texconv.exe not found at '{TEXCONV_PATH}'. Please ensure it is in the correct location.")
 
-            frame_count = len(self.source_frame_paths)
-            if frame_count == 0:
+            source_frame_paths = self.source_frame_paths
+            if not source_frame_paths:
                 raise ValueError("No source frames provided.")
 
+            holds = None
+            if self.merge_holds:
+                # Near-identical runs become one frame shown for several ticks
+                self.progress.emit(7, "Finding held frames...")
+                spans = analyze_holds(source_frame_paths)
+                source_frame_paths = [source_frame_paths[first] for first, _ in spans]
+                holds = [hold for _, hold in spans]
+
+            frame_count = len(source_frame_paths)
             self.progress.emit(10, "Generating INI file...")
-            ini_file_path = generate_ini_file(self.name, self.hash, frame_count)
+            ini_file_path = generate_ini_file(self.name, self.hash, frame_count, shared_clock=self.shared_clock, holds=holds)
             if not ini_file_path:
                 raise IOError("Failed to generate INI file.")
 
@@ -261,15 +210,18 @@ class ProcessThread(QThread):
             temp_png_dir.mkdir()
 
             # Process each frame: Resize -> Save Temp PNG -> Convert to DDS
-            total_frames = len(self.source_frame_paths)
-            for i, frame_path in enumerate(self.source_frame_paths):
+            total_frames = len(source_frame_paths)
+            resampler = None
+            for i, frame_path in enumerate(source_frame_paths):
                 # Update progress for this specific step
                 progress_percent = 25 + int(70 * (i / total_frames))
                 self.progress.emit(progress_percent, f"Processing frame {i + 1}/{total_frames}...")
 
-                # 1. Read and Resize image using Pillow
-                source_image = Image.open(frame_path).convert("RGBA")
-                resized_image = source_image.resize((self.target_width, self.target_height), Image.LANCZOS)
+                # 1. Read and Resize image, with the backend benchmarked fastest for this scale on the first frame
+                source_image = load_image(frame_path)
+                target_size = (self.target_width, self.target_height)
+                resampler = resampler or pick_backend_for(source_image.size, target_size)
+                resized_image = resize(source_image, target_size, resampler)
                 
                 # 2. Save as a temporary PNG
                 temp_png_path = temp_png_dir / f"{i}.png"
@@ -278,10 +230,11 @@ class ProcessThread(QThread):
                 # 3. Use texconv.exe to convert the PNG to a DDS
                 final_dds_path = final_dds_folder / f"{i}.dds"
                 
-                # Using BC7_UNORM for high quality UI textures with alpha
+                # BC7_UNORM for frames with partial alpha, BC1_UNORM for opaque or 1-bit alpha frames
+                dds_format = select_format(classify_image(resized_image), self.dds_format)
                 command = [
                     TEXCONV_PATH,
-                    '-f', 'BC7_UNORM',
+                    '-f', dds_format,
                     '-o', str(final_dds_folder),
                     '-y', # Overwrite existing file
                     str(temp_png_path)
@@ -296,6 +249,8 @@ class ProcessThread(QThread):
             self.progress.emit(95, "Cleaning up...")
             shutil.rmtree(temp_png_dir) # Clean up temporary directory
             shutil.move(ini_file_path, final_mod_folder / Path(ini_file_path).name)
+            if self.shared_clock:
+                install_clock_ini(self.save_path)
             
             self.progress.emit(100, "Finished!")
             self.finished.emit(True, "Mod created successfully!")
@@ -334,11 +289,15 @@ class AnimationWidget(QWidget):
         self.hash_entry = QLineEdit()
         top_grid.addWidget(self.hash_entry, 1, 1)
 
-        self.completer = QCompleter(CHARACTER_HASHES.keys(), self)
+        self.registry = get_registry()
+        self.completer_model = QStringListModel(self.registry.names(), self)
+        self.completer_version = self.registry.version
+        self.completer = QCompleter(self.completer_model, self)
         self.completer.setCaseSensitivity(Qt.CaseInsensitive)
         self.completer.setFilterMode(Qt.MatchStartsWith)
         self.ui_element_entry.setCompleter(self.completer)
         self.completer.activated.connect(self.select_suggestion)
+        self.ui_element_entry.textEdited.connect(self.refresh_completer)
 
         # --- Middle Stretchy Preview ---
         self.preview_frame = QFrame()
@@ -363,13 +322,33 @@ class AnimationWidget(QWidget):
         self.folder_combo.currentTextChanged.connect(self.on_folder_selected)
         bottom_grid.addWidget(self.folder_combo, 1, 1)
 
+        bottom_grid.addWidget(QLabel("DDS Format:"), 2, 0)
+        self.format_combo = QComboBox()
+        self.format_combo.addItems(FORMAT_CHOICES)
+        self.format_combo.setToolTip(AUTO_FORMAT_HELP)
+        self.format_combo.currentTextChanged.connect(self.update_cost_label)
+        bottom_grid.addWidget(self.format_combo, 2, 1)
+
+        self.shared_clock_checkbox = QCheckBox("Use shared animation clock")
+        self.shared_clock_checkbox.setToolTip("Time the animation from one clock INI shared by all mods made with it,\n"
+                                              "written next to the mod folder, instead of a private clock per mod.")
+        bottom_grid.addWidget(self.shared_clock_checkbox, 3, 0, 1, 2)
+
+        self.merge_holds_checkbox = QCheckBox("Merge held frames")
+        self.merge_holds_checkbox.setToolTip("Store runs of near-identical frames once and show them for longer,\n"
+                                             "cutting the number of DDS files, encode time and VRAM.")
+        bottom_grid.addWidget(self.merge_holds_checkbox, 4, 0, 1, 2)
+
+        self.cost_label = QLabel("Estimated Cost: -")
+        bottom_grid.addWidget(self.cost_label, 5, 0, 1, 2)
+
         self.create_button = QPushButton("Create Mod")
         self.create_button.clicked.connect(self.start_processing)
-        bottom_grid.addWidget(self.create_button, 2, 0, 1, 2)
+        bottom_grid.addWidget(self.create_button, 6, 0, 1, 2)
 
         self.progress_bar = QProgressBar()
         self.progress_bar.setVisible(False)
-        bottom_grid.addWidget(self.progress_bar, 3, 0, 1, 2)
+        bottom_grid.addWidget(self.progress_bar, 7, 0, 1, 2)
 
         # --- Assemble Layout ---
         main_layout.addLayout(top_grid)
@@ -380,10 +359,17 @@ class AnimationWidget(QWidget):
         super().resizeEvent(event)
         self.adjust_template_size()
     
+    def refresh_completer(self):
+        # Picks up edits to UI_Hashes.txt made while the tool is open
+        names = self.registry.names()
+        if self.registry.version != self.completer_version:
+            self.completer_version = self.registry.version
+            self.completer_model.setStringList(names)
+
     def select_suggestion(self, name):
-        if name in CHARACTER_HASHES:
+        if (hash_value := self.registry.hash_for(name)) is not None:
             self.ui_element_entry.setText(name)
-            self.hash_entry.setText(CHARACTER_HASHES[name])
+            self.hash_entry.setText(hash_value)
 
     def load_animation_folders(self):
         self.folder_combo.clear(); self.folder_combo.addItem("Select a folder...")
@@ -402,16 +388,17 @@ class AnimationWidget(QWidget):
             dest = templates_dir / Path(path).name
             if not dest.exists() and Path(path).exists(): shutil.copy2(path, dest)
             
-            self.template_img = Image.open(path).convert("RGBA")
+            self.template_img = load_image(path)
             self.adjust_template_size()
+            self.update_cost_label()
             
             filename = Path(path).name
             hash_pattern = re.compile(r't0=([a-f0-9]+)\([a-f0-9]+\)')
             if match := hash_pattern.search(filename):
                 extracted_hash = match.group(1)
                 self.hash_entry.setText(extracted_hash)
-                found_name = next((name for name, h in CHARACTER_HASHES.items() if h == extracted_hash), "")
-                self.ui_element_entry.setText(found_name)
+                found_names = self.registry.names_for(extracted_hash)
+                self.ui_element_entry.setText(found_names[0] if found_names else "")
         except Exception as e:
             QMessageBox.critical(self, "Error", f"Could not load template image:\n{e}")
             self.template_img = None
@@ -427,7 +414,7 @@ class AnimationWidget(QWidget):
 
     def on_folder_selected(self, folder_name):
         self.timer.stop(); self.source_frames.clear(); self.source_frame_paths.clear()
-        if folder_name == "Select a folder...": self.redraw_preview(); return
+        if folder_name == "Select a folder...": self.redraw_preview(); self.update_cost_label(); return
         
         base_path = Path("extracted_frames") / folder_name
         source_path = base_path / "dds" if (base_path / "dds").is_dir() else base_path
@@ -435,18 +422,29 @@ class AnimationWidget(QWidget):
         def natural_sort_key(s): return [int(t) if t.isdigit() else t.lower() for t in re.split('([0-9]+)', s.stem)]
         
         image_files = sorted([f for f in source_path.iterdir() if f.suffix.lower() in ['.dds', '.png']], key=natural_sort_key)
-        if not image_files: self.redraw_preview(); return
+        if not image_files: self.redraw_preview(); self.update_cost_label(); return
         
         self.source_frame_paths = image_files
         try:
             for img_path in image_files:
-                self.source_frames.append(Image.fromarray(imageio.imread(img_path)))
+                self.source_frames.append(load_image(img_path))
             self.current_frame_index = 0
             self.timer.start(1000 // 30)
         except Exception as e:
             QMessageBox.critical(self, "Error", f"Could not load animation frames:\n{e}")
             self.source_frames.clear(); self.source_frame_paths.clear()
         self.redraw_preview()
+        self.update_cost_label()
+
+    def update_cost_label(self):
+        # Frames are resized to the template's size by ProcessThread; 'auto' is shown at its BC7 upper bound
+        if not self.template_img or not self.source_frame_paths:
+            self.cost_label.setText("Estimated Cost: -"); return
+        width, height = self.template_img.size
+        dds_format = self.format_combo.currentText()
+        cost = estimate_mod_cost(len(self.source_frame_paths), width, height,
+                                 'BC7_UNORM' if dds_format == 'auto' else dds_format)
+        self.cost_label.setText(f"Estimated Cost: {describe_cost(cost)}")
 
     def update_template_opacity(self, opacity):
         global TEMPLATE_OPACITY; TEMPLATE_OPACITY = opacity; self.redraw_preview()
@@ -455,12 +453,12 @@ class AnimationWidget(QWidget):
         if not self.template_img: self.preview_label.setText("Click to select template"); self.preview_label.setPixmap(QPixmap()); return
         if self.template_width <= 0 or self.template_height <= 0: return
         
-        scaled_template = self.template_img.resize((self.template_width, self.template_height), Image.LANCZOS)
+        scaled_template = resize(self.template_img, (self.template_width, self.template_height))
         base_image = Image.new("RGBA", (self.template_width, self.template_height))
         
         if self.source_frames:
             media_frame = self.source_frames[self.current_frame_index]
-            scaled_media = media_frame.resize((self.template_width, self.template_height), Image.LANCZOS)
+            scaled_media = resize(media_frame, (self.template_width, self.template_height))
             base_image = Image.alpha_composite(base_image, scaled_media)
         
         alpha = scaled_template.split()[3].point(lambda p: p * (TEMPLATE_OPACITY / 255.0))
@@ -494,7 +492,9 @@ class AnimationWidget(QWidget):
         # --- MODIFICATION START 3 ---
         # Pass the original template's dimensions to the processing thread
         template_size = self.template_img.size 
-        self.process_thread = ProcessThread(name, hash_val, self.source_frame_paths, save_path, template_size)
+        self.process_thread = ProcessThread(name, hash_val, self.source_frame_paths, save_path, template_size,
+                                            self.format_combo.currentText(), self.shared_clock_checkbox.isChecked(),
+                                            self.merge_holds_checkbox.isChecked())
         # --- MODIFICATION END 3 ---
         
         self.process_thread.progress.connect(self.update_progress)
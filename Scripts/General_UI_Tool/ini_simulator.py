@@ -0,0 +1,366 @@
+import argparse
+import json
+import os
+import re
+from collections import Counter
+
+# Offline interpreter for the subset of 3DMigoto INI syntax the generators emit: [Constants]
+# globals, [Present] (with post), TextureOverride sections, command lists called with run =,
+# if / else if / else / endif, arithmetic and comparisons, this = and cycling key sections.
+#
+# Each simulated frame runs in the order the game sees it: key presses, then the draws of
+# every visible TextureOverride hash, then [Present] and finally its post commands.
+# An "instruction" is one executed command (assignment, this =, run =) or one evaluated
+# if / else if condition, which is what the frame-selection modes trade against each other.
+
+INSTRUCTION_PATTERN = re.compile(r'^(?:if\b|else\b|elif\b|endif\b|run\s*=|this\s*=|\$)', re.IGNORECASE)
+TOKEN_PATTERN = re.compile(r'\s*(\$[\\\w.]+|\d+\.\d*|\.\d+|\d+|//|==|!=|<=|>=|&&|\|\||[-+*/%()<>!])')
+OPERATORS = {'&&': ' and ', '||': ' or ', '!': ' not '}
+
+class INISimulatorError(ValueError):
+    pass
+
+def _number(value):
+    """Assigned values are plain numbers; comparisons yield 0 or 1 as in 3DMigoto."""
+    if isinstance(value, bool):
+        return int(value)
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    return value
+
+class ModFile:
+    """One parsed INI: its namespace and its sections as lists of (line number, text)."""
+
+    def __init__(self, path, index=0):
+        self.path = path
+        self.namespace = None
+        self.sections = {}
+        self.order = []
+        # Variables of files without a namespace can't be reached from other files
+        self.scope = f"<{index}:{os.path.basename(path)}>"
+        section = None
+        with open(path, 'r', encoding='utf-8', errors='replace') as f:
+            for number, raw in enumerate(f, 1):
+                line = raw.strip()
+                if not line or line.startswith(';'):
+                    continue
+                if line.startswith('[') and line.endswith(']'):
+                    section = line[1:-1].strip()
+                    if section.lower() in self.sections:
+                        raise INISimulatorError(f"{path}:{number}: duplicate section [{section}]")
+                    self.sections[section.lower()] = []
+                    self.order.append(section)
+                elif section is None:
+                    key, _, value = line.partition('=')
+                    if key.strip().lower() == 'namespace':
+                        self.namespace = value.strip()
+                        self.scope = self.namespace.lower()
+                else:
+                    self.sections[section.lower()].append((number, line))
+
+    def variable(self, name):
+        """Storage key of a $variable referenced from this file."""
+        name = name[1:].lower()
+        if name.startswith('\\'):
+            return name[1:]
+        return f"{self.scope}\\{name}"
+
+class Simulator:
+    """
+    Runs frames of one or more mod INIs loaded together, as 3DMigoto would.
+
+    `visible` decides which TextureOverride sections are drawn on a frame: a callable
+    taking (frame, section name, hash), by default every override on every frame.
+    """
+
+    def __init__(self, paths, visible=None):
+        self.files = [ModFile(path, i) for i, path in enumerate(paths)]
+        self.visible = visible or (lambda frame, name, hash_value: True)
+        self.variables = {}
+        self.overrides = []
+        self.present = []
+        self.post_present = []
+        self.keys = []
+        self._lists = {}
+        self._functions = {}
+        self.frame = 0
+
+        for mod in self.files:
+            for number, line in mod.sections.get('constants', []):
+                self._declare(mod, number, line)
+        for mod in self.files:
+            constants = [(n, l) for n, l in mod.sections.get('constants', []) if not l.lower().startswith('global ')]
+            self._execute(self._compile(mod, constants, 'Constants'), Counter())
+            pre, post = self._split_post(mod.sections.get('present', []))
+            self.present.append(self._compile(mod, pre, 'Present'))
+            self.post_present.append(self._compile(mod, post, 'Present'))
+            for name in mod.order:
+                lowered = name.lower()
+                if lowered.startswith('textureoverride'):
+                    self.overrides.append(self._override(mod, name))
+                elif lowered.startswith('key'):
+                    self.keys.append(self._key(mod, name))
+
+    # --- Parsing ---
+
+    def _declare(self, mod, number, line):
+        match = re.match(r'^global\s+(?:persist\s+)?(\$[\\\w.]+)\s*(?:=\s*(.+))?$', line, re.IGNORECASE)
+        if not match:
+            if line.lower().startswith('global '):
+                raise INISimulatorError(f"{mod.path}:{number}: bad declaration '{line}'")
+            return
+        value = self._expression(mod, number, match.group(2))(self.variables) if match.group(2) else 0
+        self.variables[mod.variable(match.group(1))] = _number(value)
+
+    def _split_post(self, lines):
+        pre, post = [], []
+        for number, line in lines:
+            if re.match(r'^post\s', line, re.IGNORECASE):
+                post.append((number, line[4:].strip()))
+            else:
+                pre.append((number, re.sub(r'^pre\s+', '', line, flags=re.IGNORECASE)))
+        return pre, post
+
+    def _expression(self, mod, number, text):
+        key = (mod.scope, text)
+        if key in self._functions:
+            return self._functions[key]
+        position, parts = 0, []
+        text = text.strip()
+        while position < len(text):
+            match = TOKEN_PATTERN.match(text, position)
+            if not match:
+                raise INISimulatorError(f"{mod.path}:{number}: can't parse '{text[position:]}'")
+            token = match.group(1)
+            position = match.end()
+            if token.startswith('$'):
+                variable = mod.variable(token)
+                if variable not in self.variables:
+                    raise INISimulatorError(f"{mod.path}:{number}: undeclared variable {token}")
+                parts.append(f"v[{variable!r}]")
+            else:
+                parts.append(OPERATORS.get(token, token))
+        try:
+            function = eval(f"lambda v: {' '.join(parts)}")
+        except SyntaxError:
+            raise INISimulatorError(f"{mod.path}:{number}: bad expression '{text}'") from None
+        self._functions[key] = function
+        return function
+
+    def _compile(self, mod, lines, section):
+        """
+        Nested command list: ('set', variable, expression), ('this', resource), ('run', list)
+        and ('if', [(condition, block), ...], else_block) entries.
+        """
+        root = []
+        # (block being filled, enclosing if node, whether its else was reached)
+        stack = [(root, None, False)]
+        for number, line in lines:
+            lowered = line.lower()
+            if lowered.startswith('if ') or lowered.startswith('if('):
+                node = ('if', [(self._expression(mod, number, line[2:]), [])], [])
+                stack[-1][0].append(node)
+                stack.append((node[1][0][1], node, False))
+            elif lowered.startswith('else if ') or lowered.startswith('elif '):
+                condition = line[7:] if lowered.startswith('else') else line[4:]
+                _, node, in_else = stack[-1]
+                if node is None or in_else:
+                    raise INISimulatorError(f"{mod.path}:{number}: 'else if' without 'if'")
+                node[1].append((self._expression(mod, number, condition), []))
+                stack[-1] = (node[1][-1][1], node, False)
+            elif lowered == 'else':
+                _, node, in_else = stack[-1]
+                if node is None or in_else:
+                    raise INISimulatorError(f"{mod.path}:{number}: 'else' without 'if'")
+                stack[-1] = (node[2], node, True)
+            elif lowered == 'endif':
+                if len(stack) == 1:
+                    raise INISimulatorError(f"{mod.path}:{number}: 'endif' without 'if'")
+                stack.pop()
+            elif lowered.startswith('this'):
+                stack[-1][0].append(('this', line.partition('=')[2].strip()))
+            elif lowered.startswith('run'):
+                stack[-1][0].append(('run', (mod, line.partition('=')[2].strip())))
+            elif line.startswith('$'):
+                target, _, value = line.partition('=')
+                variable = mod.variable(target.strip())
+                if variable not in self.variables:
+                    raise INISimulatorError(f"{mod.path}:{number}: undeclared variable {target.strip()}")
+                stack[-1][0].append(('set', variable, self._expression(mod, number, value)))
+            else:
+                raise INISimulatorError(f"{mod.path}:{number}: unsupported command '{line}' in [{section}]")
+        if len(stack) != 1:
+            raise INISimulatorError(f"{mod.path}: [{section}] has an 'if' without 'endif'")
+        return root
+
+    def _command_list(self, mod, name):
+        key = (mod.scope, name.lower())
+        if key not in self._lists:
+            if name.lower() not in mod.sections:
+                raise INISimulatorError(f"{mod.path}: run = {name}, but there is no [{name}]")
+            self._lists[key] = []  # guards against recursion while compiling
+            self._lists[key] = self._compile(mod, mod.sections[name.lower()], name)
+        return self._lists[key]
+
+    def _override(self, mod, name):
+        hash_value, commands = None, []
+        for number, line in mod.sections[name.lower()]:
+            if INSTRUCTION_PATTERN.match(line):
+                commands.append((number, line))
+            elif line.lower().startswith('hash'):
+                hash_value = line.partition('=')[2].strip()
+        return {'name': name, 'hash': hash_value, 'commands': self._compile(mod, commands, name)}
+
+    def _key(self, mod, name):
+        key = {'name': name, 'key': None, 'type': 'cycle', 'condition': None, 'cycles': []}
+        for number, line in mod.sections[name.lower()]:
+            setting, _, value = (part.strip() for part in line.partition('='))
+            if setting.startswith('$'):
+                variable = mod.variable(setting)
+                if variable not in self.variables:
+                    raise INISimulatorError(f"{mod.path}:{number}: undeclared variable {setting}")
+                values = [_number(self._expression(mod, number, v)(self.variables)) for v in value.split(',')]
+                key['cycles'].append((variable, values))
+            elif setting.lower() == 'condition':
+                key['condition'] = self._expression(mod, number, value)
+            elif setting.lower() in ('key', 'type'):
+                key[setting.lower()] = value.lower()
+        if key['type'] != 'cycle':
+            raise INISimulatorError(f"{mod.path}: [{name}] type = {key['type']} is not supported, only cycle")
+        return key
+
+    # --- Running ---
+
+    def _execute(self, commands, counts, resources=None):
+        variables = self.variables
+        for command in commands:
+            kind = command[0]
+            if kind == 'if':
+                for condition, block in command[1]:
+                    counts['conditions'] += 1
+                    if condition(variables):
+                        self._execute(block, counts, resources)
+                        break
+                else:
+                    self._execute(command[2], counts, resources)
+            elif kind == 'set':
+                counts['commands'] += 1
+                variables[command[1]] = _number(command[2](variables))
+            elif kind == 'this':
+                counts['commands'] += 1
+                if resources is not None:
+                    resources.append(command[1])
+            else:
+                counts['commands'] += 1
+                self._execute(self._command_list(*command[1]), counts, resources)
+
+    def press(self, key_name):
+        """Press a key: every key section bound to it whose condition holds cycles its variables."""
+        for key in self.keys:
+            if key['key'] != key_name.lower():
+                continue
+            if key['condition'] is not None and not key['condition'](self.variables):
+                continue
+            for variable, values in key['cycles']:
+                current = self.variables[variable]
+                self.variables[variable] = values[(values.index(current) + 1) % len(values)] if current in values else values[0]
+
+    def step(self, presses=()):
+        """Run one frame; returns the resource each drawn override ended on and the instruction counts."""
+        for key_name in presses:
+            self.press(key_name)
+        draw, present = Counter(), Counter()
+        resources = {}
+        for override in self.overrides:
+            if not self.visible(self.frame, override['name'], override['hash']):
+                continue
+            assigned = []
+            self._execute(override['commands'], draw, assigned)
+            resources[override['name']] = assigned[-1] if assigned else None
+        for commands in self.present:
+            self._execute(commands, present)
+        for commands in self.post_present:
+            self._execute(commands, present)
+        result = {'frame': self.frame, 'resources': resources,
+                  'draw_instructions': draw['commands'] + draw['conditions'], 'draw_conditions': draw['conditions'],
+                  'present_instructions': present['commands'] + present['conditions'],
+                  'present_conditions': present['conditions']}
+        self.frame += 1
+        return result
+
+    def run(self, frames, presses=None):
+        """Results of `frames` frames; `presses` maps frame numbers to the keys pressed on them."""
+        presses = presses or {}
+        return [self.step(presses.get(self.frame, ())) for _ in range(frames)]
+
+def summarize(results):
+    """Per-frame instruction statistics of a run."""
+    summary = {'frames': len(results)}
+    for phase in ('draw', 'present'):
+        counts = [r[f'{phase}_instructions'] for r in results]
+        summary[phase] = {'mean': round(sum(counts) / len(counts), 2) if counts else 0,
+                          'max': max(counts, default=0), 'total': sum(counts)}
+    return summary
+
+def resource_runs(results, override):
+    """Run-length encoded resource sequence of one override: [(resource, frames), ...]."""
+    runs = []
+    for result in results:
+        resource = result['resources'].get(override, '-')
+        if runs and runs[-1][0] == resource:
+            runs[-1][1] += 1
+        else:
+            runs.append([resource, 1])
+    return [tuple(run) for run in runs]
+
+def parse_frame_ranges(text):
+    """Frames from '10-20,35' style ranges."""
+    frames = set()
+    for part in filter(None, (p.strip() for p in text.split(','))):
+        first, _, last = part.partition('-')
+        frames.update(range(int(first), int(last or first) + 1))
+    return frames
+
+def main():
+    parser = argparse.ArgumentParser(description='Simulate generated mod INIs frame by frame and count the work they do.')
+    parser.add_argument('ini_files', nargs='+', help='INI files loaded together, e.g. a mod and the shared animation clock.')
+    parser.add_argument('--frames', type=int, default=120, help='Frames to simulate (default: 120)')
+    parser.add_argument('--press', action='append', default=[], metavar='FRAME:KEY',
+                        help="Press a key at the start of a frame, e.g. 30:p (repeatable)")
+    parser.add_argument('--hidden', default='', metavar='RANGES',
+                        help="Frames on which no override is drawn, e.g. 10-20,40")
+    parser.add_argument('--table', action='store_true', help='Print every frame instead of the run-length sequence.')
+    parser.add_argument('--json', action='store_true', help='Print the per-frame results and summary as JSON.')
+    args = parser.parse_args()
+
+    presses = {}
+    for press in args.press:
+        frame, _, key_name = press.partition(':')
+        presses.setdefault(int(frame), []).append(key_name)
+    hidden = parse_frame_ranges(args.hidden)
+
+    try:
+        simulator = Simulator(args.ini_files, visible=lambda frame, name, hash_value: frame not in hidden)
+        results = simulator.run(args.frames, presses)
+    except (INISimulatorError, OSError) as e:
+        parser.exit(1, f"Error: {e}\n")
+    summary = summarize(results)
+
+    if args.json:
+        print(json.dumps({'summary': summary, 'frames': results}, indent=2))
+        return
+    for override in simulator.overrides:
+        print(f"[{override['name']}] hash = {override['hash']}")
+        if args.table:
+            for result in results:
+                print(f"    {result['frame']:>6}  {result['resources'].get(override['name'], '-') or '(none)':<32}"
+                      f"draw {result['draw_instructions']:>4}  present {result['present_instructions']:>4}")
+        else:
+            for resource, frames in resource_runs(results, override['name']):
+                print(f"    {resource or '(none)'} x{frames}")
+    for phase in ('draw', 'present'):
+        stats = summary[phase]
+        print(f"{phase.capitalize()} instructions per frame: mean {stats['mean']}, max {stats['max']}, total {stats['total']}")
+
+if __name__ == '__main__':
+    main()
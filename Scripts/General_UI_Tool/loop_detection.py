@@ -0,0 +1,127 @@
+import cv2
+import numpy as np
+
+# Frames are compared as grayscale thumbnails of this size; enough to tell where the motion is
+THUMBNAIL_SIZE = (32, 32)
+# Shortest loop proposed, so a still stretch of the clip can't collapse into a two-frame loop
+MIN_LOOP_FRAMES = 8
+# RMS thumbnail difference (0-1) up to which a loop's seam is treated as invisible
+SEAMLESS_COST = 0.02
+# Loops whose seam is at most this much worse than the best one count as just as good,
+# and the shortest of them is proposed
+COST_TOLERANCE = 0.005
+
+def thumbnail(frame, size=THUMBNAIL_SIZE):
+    """A BGR, BGRA or grayscale frame as a flat float32 grayscale thumbnail scaled to 0-1."""
+    if frame.ndim == 3:
+        frame = cv2.cvtColor(frame, cv2.COLOR_BGRA2GRAY if frame.shape[2] == 4 else cv2.COLOR_BGR2GRAY)
+    small = cv2.resize(frame, size, interpolation=cv2.INTER_AREA)
+    return small.astype(np.float32).ravel() / 255.0
+
+def thumbnails(frames, size=THUMBNAIL_SIZE):
+    """Stack of thumbnail() vectors, shape (N, width * height)."""
+    return np.stack([thumbnail(frame, size) for frame in frames])
+
+def video_thumbnails(path, size=THUMBNAIL_SIZE):
+    """thumbnails() of every frame of the video at `path`, read once without keeping the frames."""
+    cap = cv2.VideoCapture(path)
+    vectors = []
+    try:
+        while True:
+            ret, frame = cap.read()
+            if not ret:
+                break
+            vectors.append(thumbnail(frame, size))
+    finally:
+        cap.release()
+    return np.stack(vectors) if vectors else np.empty((0, size[0] * size[1]), dtype=np.float32)
+
+def distance_matrix(vectors):
+    """RMS difference between every pair of thumbnails, shape (N, N)."""
+    vectors = np.asarray(vectors, dtype=np.float32)
+    squares = np.einsum('ij,ij->i', vectors, vectors)
+    distances = squares[:, None] + squares[None, :] - 2.0 * (vectors @ vectors.T)
+    np.maximum(distances, 0.0, out=distances)
+    return np.sqrt(distances / vectors.shape[1])
+
+def _shortest_good(candidates):
+    """The shortest of the (cost, length, start) candidates costing at most COST_TOLERANCE over the best."""
+    if not candidates:
+        return None
+    best = min(cost for cost, _, _ in candidates)
+    return min((length, cost, start) for cost, length, start in candidates if cost <= best + COST_TOLERANCE)
+
+def find_loop(distances, min_length=MIN_LOOP_FRAMES):
+    """
+    Best plain loop as {'mode': 'loop', 'start', 'end', 'cost'}, playing frames start..end-1
+    and jumping back to start; None when the clip is too short.
+
+    The seam is scored by how closely frame `start` stands in for frame `end`, the frame that
+    would have followed, and frame start-1 for end-1, so motion carries across the jump as
+    well as the picture. A loop from the first frame has no frame before it, so start+1 is
+    compared with end+1 instead; loops need one frame after `end` to be scored either way.
+    """
+    count = len(distances)
+    candidates = []
+    for length in range(max(2, min_length), count - 1):
+        seams = np.diagonal(distances, offset=length)  # distances[s, s + length]
+        pairs = (seams[1:] + seams[:-1]) / 2  # pairs[s] scores seams s and s + 1
+        costs = np.concatenate((pairs[:1], pairs))  # start 0 looks forward, later starts back
+        start = int(np.argmin(costs))
+        candidates.append((float(costs[start]), length, start))
+    found = _shortest_good(candidates)
+    if found is None:
+        return None
+    length, cost, start = found
+    return {'mode': 'loop', 'start': start, 'end': start + length, 'cost': cost}
+
+def find_ping_pong(distances, min_length=MIN_LOOP_FRAMES):
+    """
+    Best ping-pong span as {'mode': 'ping-pong', 'start', 'end', 'cost'}, playing frames
+    start..end-1 forwards then back; None when the clip is too short.
+
+    Both turns are continuous in position, so the cost is how much the picture is moving where
+    it reverses.
+    """
+    count = len(distances)
+    if count < 3:
+        return None
+    motion = np.diagonal(distances, offset=1)  # distances[i, i + 1]
+    candidates = []
+    for length in range(max(3, min_length), count + 1):
+        costs = (motion[:count - length + 1] + motion[length - 2:]) / 2
+        start = int(np.argmin(costs))
+        candidates.append((float(costs[start]), length, start))
+    found = _shortest_good(candidates)
+    if found is None:
+        return None
+    length, cost, start = found
+    return {'mode': 'ping-pong', 'start': start, 'end': start + length, 'cost': cost}
+
+def propose_loop(vectors, min_length=MIN_LOOP_FRAMES, allow_ping_pong=False):
+    """
+    Loop to trim the clip to, from its thumbnails.
+
+    A plain loop wins whenever its seam is invisible; otherwise a ping-pong span is proposed
+    if allowed and its turns are smoother than the loop's seam. Returns the find_loop() or
+    find_ping_pong() result with 'frames' (the clip's frame count) added, or None when the
+    clip is too short for either.
+    """
+    distances = distance_matrix(vectors)
+    proposal = find_loop(distances, min_length)
+    if allow_ping_pong and (proposal is None or proposal['cost'] > SEAMLESS_COST):
+        ping_pong = find_ping_pong(distances, min_length)
+        if ping_pong is not None and (proposal is None or ping_pong['cost'] < proposal['cost']):
+            proposal = ping_pong
+    if proposal is not None:
+        proposal['frames'] = len(distances)
+    return proposal
+
+def describe_proposal(proposal, fps=None):
+    """One line describing a propose_loop() result for status messages."""
+    kept = proposal['end'] - proposal['start']
+    span = f"frames {proposal['start'] + 1}-{proposal['end']} of {proposal['frames']}"
+    if fps:
+        span += f" ({kept / fps:.2f}s)"
+    quality = "seamless" if proposal['cost'] <= SEAMLESS_COST else f"seam cost {proposal['cost']:.3f}"
+    return f"{'Ping-pong' if proposal['mode'] == 'ping-pong' else 'Loop'} over {span}, {quality}"
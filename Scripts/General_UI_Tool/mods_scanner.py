@@ -0,0 +1,265 @@
+import argparse
+import json
+import os
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+try:
+    from General_UI_Tool.budget_planner import format_bytes
+except ImportError:
+    from budget_planner import format_bytes
+
+# Parsed INIs, next to config.json in the directory the tools are run from
+CACHE_PATH = 'mods_scan_cache.json'
+CACHE_VERSION = 1
+# Below this many changed INIs, parsing in worker processes costs more than it saves
+PARALLEL_PARSE_MIN_FILES = 32
+OVERRIDE_KINDS = ('textureoverride', 'shaderoverride')
+
+def _is_disabled(name):
+    # 3DMigoto skips files and folders whose name starts with DISABLED
+    return name.lower().startswith('disabled')
+
+def find_ini_files(mods_folder):
+    """(enabled, disabled) INI paths under `mods_folder`; every INI inside a DISABLED folder is disabled."""
+    enabled, disabled = [], []
+    for root, dirs, files in os.walk(mods_folder):
+        skip = any(_is_disabled(part) for part in os.path.relpath(root, mods_folder).split(os.sep) if part != '.')
+        dirs.sort()
+        for name in sorted(files):
+            if name.lower().endswith('.ini'):
+                (disabled if skip or _is_disabled(name) else enabled).append(os.path.join(root, name))
+    return enabled, disabled
+
+def parse_ini(path):
+    """
+    Namespace, override sections and resource files of one mod INI.
+
+    Override entries hold the section, its kind ('textureoverride' or 'shaderoverride'),
+    hash, any match_* filters and whether allow_duplicate_hash is set.
+    """
+    namespace = None
+    overrides, resources = [], []
+    section = None
+    with open(path, 'r', encoding='utf-8', errors='replace') as f:
+        for line in f:
+            line = line.strip()
+            if not line or line.startswith(';'):
+                continue
+            if line.startswith('[') and line.endswith(']'):
+                name = line[1:-1].strip()
+                lowered = name.lower()
+                kind = next((k for k in OVERRIDE_KINDS if lowered.startswith(k)), None)
+                if kind:
+                    section = {'section': name, 'kind': kind, 'hash': None, 'filters': {}, 'allow_duplicate': False}
+                    overrides.append(section)
+                elif lowered.startswith('resource'):
+                    section = {'section': name, 'filename': None}
+                    resources.append(section)
+                else:
+                    section = None
+                continue
+            key, separator, value = line.partition('=')
+            if not separator:
+                continue
+            key, value = key.strip().lower(), value.strip()
+            if section is None:
+                if key == 'namespace' and not overrides and not resources:
+                    namespace = value
+            elif 'kind' in section:
+                if key == 'hash':
+                    section['hash'] = value.lower()
+                elif key.startswith('match_'):
+                    section['filters'][key] = value
+                elif key == 'allow_duplicate_hash':
+                    section['allow_duplicate'] = value.lower() in ('true', 'overrule', '1')
+            elif key == 'filename':
+                section['filename'] = value
+    return {'namespace': namespace, 'overrides': overrides,
+            'resources': [r for r in resources if r['filename']]}
+
+def _parse_or_error(path):
+    try:
+        return parse_ini(path)
+    except OSError as e:
+        return {'error': str(e)}
+
+def parse_all(paths, cache_path=CACHE_PATH, max_workers=None):
+    """
+    Parsed INIs for `paths`, as {path: parsed}, plus the number parsed rather than cached.
+
+    Results are cached by size and mtime; changed INIs are parsed in worker processes
+    when there are enough of them. INIs that couldn't be read aren't cached.
+    """
+    cache = {}
+    if cache_path:
+        try:
+            with open(cache_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if data.get('version') == CACHE_VERSION:
+                cache = data.get('files', {})
+        except (OSError, ValueError):
+            pass
+
+    parsed, stats, changed = {}, {}, []
+    for path in paths:
+        stat = os.stat(path)
+        stats[path] = [stat.st_size, stat.st_mtime_ns]
+        entry = cache.get(os.path.abspath(path))
+        if entry and entry['stat'] == stats[path]:
+            parsed[path] = entry['parsed']
+        else:
+            changed.append(path)
+
+    if len(changed) >= PARALLEL_PARSE_MIN_FILES:
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            results = list(executor.map(_parse_or_error, changed, chunksize=16))
+    else:
+        results = [_parse_or_error(path) for path in changed]
+    parsed.update(zip(changed, results))
+
+    if cache_path and changed:
+        # Entries of other Mods folders are kept
+        entries = dict(cache)
+        for path in paths:
+            # Failures (e.g. a file the game has locked) aren't cached, so the next scan retries them
+            if 'error' in parsed[path]:
+                entries.pop(os.path.abspath(path), None)
+            else:
+                entries[os.path.abspath(path)] = {'stat': stats[path], 'parsed': parsed[path]}
+        try:
+            with open(cache_path, 'w', encoding='utf-8') as f:
+                json.dump({'version': CACHE_VERSION, 'files': entries}, f)
+        except OSError as e:
+            print(f"Could not save scan cache: {e}")
+    return parsed, len(changed)
+
+def mod_name(mods_folder, path):
+    """The top-level folder of `path` under `mods_folder`, or the INI's own name when it sits at the top."""
+    parts = os.path.relpath(path, mods_folder).split(os.sep)
+    return parts[0] if len(parts) > 1 else os.path.splitext(parts[0])[0]
+
+def _resource_size(path):
+    try:
+        return os.path.getsize(path)
+    except OSError:
+        return None
+
+def scan_mods(mods_folder, cache_path=CACHE_PATH, max_workers=None):
+    """
+    Scan every INI under `mods_folder` and report what breaks or slows loading.
+
+    Returns a dict with:
+      'conflicts': override hashes defined by more than one INI, as
+                   {'kind', 'hash', 'filters', 'definitions': [{'mod', 'ini', 'section'}, ...]};
+                   sections with allow_duplicate_hash or different match_* filters don't conflict
+      'namespaces': namespaces declared by more than one INI, as {namespace: [ini, ...]}
+      'missing': resources whose file doesn't exist, as {'mod', 'ini', 'section', 'filename'}
+      'mods': per mod {'inis', 'overrides', 'resources', 'bytes'}, counting each resource file once
+      'hash_index': {hash: [mod, ...]} for every overridden hash
+    """
+    paths, disabled = find_ini_files(mods_folder)
+    parsed, parsed_count = parse_all(paths, cache_path, max_workers)
+
+    definitions = defaultdict(list)
+    namespaces = defaultdict(list)
+    hash_index = defaultdict(set)
+    mods = defaultdict(lambda: {'inis': 0, 'overrides': 0, 'resources': 0, 'bytes': 0})
+    resource_files = {}
+    errors = []
+    for path in paths:
+        info = parsed[path]
+        mod = mod_name(mods_folder, path)
+        ini = os.path.relpath(path, mods_folder)
+        if 'error' in info:
+            errors.append({'ini': ini, 'error': info['error']})
+            continue
+        mods[mod]['inis'] += 1
+        if info['namespace']:
+            namespaces[info['namespace'].lower()].append(ini)
+        for override in info['overrides']:
+            if not override['hash']:
+                continue
+            mods[mod]['overrides'] += 1
+            hash_index[override['hash']].add(mod)
+            if not override['allow_duplicate']:
+                key = (override['kind'], override['hash'], tuple(sorted(override['filters'].items())))
+                definitions[key].append({'mod': mod, 'ini': ini, 'section': override['section']})
+        folder = os.path.dirname(path)
+        for resource in info['resources']:
+            file_path = os.path.normpath(os.path.join(folder, resource['filename'].replace('\\', os.sep).replace('/', os.sep)))
+            resource_files.setdefault(file_path, []).append((mod, ini, resource))
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        sizes = dict(zip(resource_files, executor.map(_resource_size, resource_files)))
+
+    missing = []
+    for file_path, references in resource_files.items():
+        counted = set()
+        for mod, ini, resource in references:
+            if sizes[file_path] is None:
+                missing.append({'mod': mod, 'ini': ini, 'section': resource['section'], 'filename': resource['filename']})
+            mods[mod]['resources'] += 1
+            if sizes[file_path] is not None and mod not in counted:
+                mods[mod]['bytes'] += sizes[file_path]
+                counted.add(mod)
+
+    conflicts = [{'kind': kind, 'hash': hash_value, 'filters': dict(filters), 'definitions': found}
+                 for (kind, hash_value, filters), found in sorted(definitions.items()) if len({d['ini'] for d in found}) > 1]
+    return {
+        'inis': len(paths),
+        'parsed': parsed_count,
+        'disabled': len(disabled),
+        'errors': errors,
+        'conflicts': conflicts,
+        'namespaces': {ns: inis for ns, inis in sorted(namespaces.items()) if len(inis) > 1},
+        'missing': sorted(missing, key=lambda m: (m['ini'], m['section'])),
+        'mods': dict(sorted(mods.items())),
+        'hash_index': {h: sorted(found) for h, found in sorted(hash_index.items())},
+    }
+
+def print_report(report):
+    print(f"Scanned {report['inis']} INIs in {len(report['mods'])} mods "
+          f"({report['parsed']} parsed, {report['inis'] - report['parsed']} cached, {report['disabled']} disabled skipped)")
+    for error in report['errors']:
+        print(f"Could not read {error['ini']}: {error['error']}")
+
+    print(f"\nHash conflicts: {len(report['conflicts'])}")
+    for conflict in report['conflicts']:
+        kind = 'ShaderOverride' if conflict['kind'] == 'shaderoverride' else 'TextureOverride'
+        print(f"  {kind} {conflict['hash']}")
+        for definition in conflict['definitions']:
+            print(f"    {definition['ini']} [{definition['section']}]")
+
+    if report['namespaces']:
+        print(f"\nNamespaces declared more than once: {len(report['namespaces'])}")
+        for namespace, inis in report['namespaces'].items():
+            print(f"  {namespace}: {', '.join(inis)}")
+
+    print(f"\nMissing resource files: {len(report['missing'])}")
+    for missing in report['missing']:
+        print(f"  {missing['ini']} [{missing['section']}]: {missing['filename']}")
+
+    print("\nResources per mod:")
+    for mod, stats in sorted(report['mods'].items(), key=lambda item: -item[1]['bytes']):
+        print(f"  {format_bytes(stats['bytes']):>10}  {stats['resources']:>6} resources  {mod}")
+
+def main():
+    parser = argparse.ArgumentParser(description='Find hash conflicts and missing resources in a 3DMigoto Mods folder.')
+    parser.add_argument('mods_folder', help='Mods folder to scan.')
+    parser.add_argument('--cache', default=CACHE_PATH, help=f'Parse cache file (default: {CACHE_PATH})')
+    parser.add_argument('--no-cache', action='store_true', help='Parse every INI and leave the cache alone.')
+    parser.add_argument('--workers', type=int, default=None, help='Worker processes for parsing (default: CPU count)')
+    parser.add_argument('--json', action='store_true', help='Print the report as JSON.')
+    args = parser.parse_args()
+
+    if not os.path.isdir(args.mods_folder):
+        parser.exit(1, f"Error: '{args.mods_folder}' is not a folder\n")
+    report = scan_mods(args.mods_folder, None if args.no_cache else args.cache, args.workers)
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print_report(report)
+
+if __name__ == '__main__':
+    main()
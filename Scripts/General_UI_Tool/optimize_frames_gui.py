@@ -9,11 +9,22 @@ from PyQt5.QtWidgets import (QApplication, QWidget, QVBoxLayout,
                             QStackedWidget, QRadioButton, QButtonGroup, QMessageBox)
 from PyQt5.QtCore import Qt, pyqtSignal, QObject
 from PyQt5.QtGui import QPalette, QColor, QFont
-from PIL import Image
+
+from General_UI_Tool.progress_events import (parse_event, event_progress, format_eta,
+                                             ITEM_DONE, ITEM_FAILED, THROUGHPUT)
+from General_UI_Tool.budget_planner import (read_frame_store, estimate_mod_cost, plan_budget,
+                                            describe_cost, format_bytes)
+from General_UI_Tool.scale import calculate_new_dimensions
+from General_UI_Tool.alpha_analysis import FORMAT_CHOICES, AUTO_FORMAT_HELP, group_by_format
+
+PROGRESS_FORMATS = {1: 'Scaling Progress', 2: 'Conversion Progress'}
 
 class SignalHandler(QObject):
     progress_update = pyqtSignal(int, int)
+    progress_text = pyqtSignal(int, str)
     process_complete = pyqtSignal(int)
+    suggestion_ready = pyqtSignal(object)
+    suggestion_failed = pyqtSignal(str)
 
 class ProcessingWidget(QMainWindow):
     def __init__(self):
@@ -178,14 +189,20 @@ class ProcessingWidget(QMainWindow):
         self.folder_combo.currentIndexChanged.connect(self.select_folder)
         self.folder_combo.activated.connect(self.refresh_folder_dropdown)
         self.scale_spin.valueChanged.connect(self.update_estimated_dimensions)
+        self.format_combo.currentTextChanged.connect(self.update_estimated_dimensions)
+        self.suggest_btn.clicked.connect(self.suggest_budget_settings)
         self.start_btn.clicked.connect(self.start_processing)
         self.signal_handler.progress_update.connect(self.update_progress)
+        self.signal_handler.progress_text.connect(self.update_progress_text)
         self.signal_handler.process_complete.connect(self.process_completed)
+        self.signal_handler.suggestion_ready.connect(self.show_budget_suggestion)
+        self.signal_handler.suggestion_failed.connect(self.show_budget_suggestion_error)
 
         # Manual mode connections
         self.manual_folder_combo.currentIndexChanged.connect(self.select_manual_folder)
         self.manual_folder_combo.activated.connect(self.refresh_folder_dropdown)
         self.manual_scale_spin.valueChanged.connect(self.update_manual_estimated_dimensions)
+        self.manual_format_combo.currentTextChanged.connect(self.update_manual_estimated_dimensions)
         self.scale_btn.clicked.connect(self.start_scaling)
         self.convert_btn.clicked.connect(self.start_converting)
 
@@ -245,6 +262,30 @@ class ProcessingWidget(QMainWindow):
         self.dimensions_label.setStyleSheet("color: #4a5568;")
         layout.addWidget(self.dimensions_label)
 
+        # Estimated in-game cost of the scaled frames
+        self.cost_label = QLabel('Estimated Cost: -')
+        self.cost_label.setStyleSheet("color: #4a5568;")
+        layout.addWidget(self.cost_label)
+
+        # VRAM budget planner
+        budget_layout = QHBoxLayout()
+        budget_label = QLabel('VRAM Budget:')
+        self.budget_spin = QSpinBox()
+        self.budget_spin.setRange(1, 4096)
+        self.budget_spin.setValue(64)
+        self.budget_spin.setSuffix(' MB')
+        self.suggest_btn = QPushButton('Suggest Settings')
+        budget_layout.addWidget(budget_label)
+        budget_layout.addWidget(self.budget_spin)
+        budget_layout.addWidget(self.suggest_btn)
+        budget_layout.addStretch()
+        layout.addLayout(budget_layout)
+
+        self.suggestion_label = QLabel('')
+        self.suggestion_label.setWordWrap(True)
+        self.suggestion_label.setStyleSheet("color: #718096; font-size: 12px;")
+        layout.addWidget(self.suggestion_label)
+
         # Batch size selection
         batch_layout = QHBoxLayout()
         batch_label = QLabel('Images per Batch:')
@@ -279,6 +320,17 @@ class ProcessingWidget(QMainWindow):
         gpu_layout.addStretch()
         layout.addLayout(gpu_layout)
 
+        # DDS format selection
+        format_layout = QHBoxLayout()
+        format_label = QLabel('DDS Format:')
+        self.format_combo = QComboBox()
+        self.format_combo.addItems(FORMAT_CHOICES)
+        self.format_combo.setToolTip(AUTO_FORMAT_HELP)
+        format_layout.addWidget(format_label)
+        format_layout.addWidget(self.format_combo)
+        format_layout.addStretch()
+        layout.addLayout(format_layout)
+
         # GPU ID instructions
         gpu_instructions_label = QLabel('Open Task Manager > Performance Tab > GPU to find the GPU ID')
         # Contextual color is kept for de-emphasized info text
@@ -365,6 +417,11 @@ class ProcessingWidget(QMainWindow):
         self.manual_dimensions_label.setStyleSheet("color: #4a5568;")
         layout.addWidget(self.manual_dimensions_label)
 
+        # Estimated in-game cost of the scaled frames
+        self.manual_cost_label = QLabel('Estimated Cost: -')
+        self.manual_cost_label.setStyleSheet("color: #4a5568;")
+        layout.addWidget(self.manual_cost_label)
+
         # Batch size selection
         batch_layout = QHBoxLayout()
         batch_label = QLabel('Images per Batch:')
@@ -399,6 +456,17 @@ class ProcessingWidget(QMainWindow):
         gpu_layout.addStretch()
         layout.addLayout(gpu_layout)
 
+        # DDS format selection
+        format_layout = QHBoxLayout()
+        format_label = QLabel('DDS Format:')
+        self.manual_format_combo = QComboBox()
+        self.manual_format_combo.addItems(FORMAT_CHOICES)
+        self.manual_format_combo.setToolTip(AUTO_FORMAT_HELP)
+        format_layout.addWidget(format_label)
+        format_layout.addWidget(self.manual_format_combo)
+        format_layout.addStretch()
+        layout.addLayout(format_layout)
+
         # GPU ID instructions
         gpu_instructions_label = QLabel('Open Task Manager > Performance Tab > GPU to find the GPU ID')
         # Contextual color is kept for de-emphasized info text
@@ -576,26 +644,38 @@ class ProcessingWidget(QMainWindow):
         valid_extensions = ('.png', '.jpg', '.jpeg', '.bmp', '.tiff')
         return file.lower().endswith(valid_extensions)
 
-    def count_files(self, folder, extensions=None):
-        count = 0
-        for root, _, files in os.walk(folder):
-            if extensions:
-                count += sum(1 for f in files if any(f.lower().endswith(ext) for ext in extensions))
-            else:
-                count += len(files)
-        return count
+    def progress_bar_for_step(self, step):
+        if self.stacked_widget.currentIndex() == 0:
+            return self.progress_1 if step == 1 else self.progress_2
+        return self.manual_progress_1 if step == 1 else self.manual_progress_2
 
     def update_progress(self, step, progress):
-        if self.stacked_widget.currentIndex() == 0:
-            if step == 1:
-                self.progress_1.setValue(progress)
-            else:
-                self.progress_2.setValue(progress)
-        else:
-            if step == 1:
-                self.manual_progress_1.setValue(progress)
-            else:
-                self.manual_progress_2.setValue(progress)
+        self.progress_bar_for_step(step).setValue(progress)
+
+    def update_progress_text(self, step, text):
+        self.progress_bar_for_step(step).setFormat(text)
+
+    def run_event_command(self, command, step):
+        """Run a batch CLI with --events and drive the progress bar of `step` from its event stream."""
+        label = PROGRESS_FORMATS[step]
+        process = subprocess.Popen(command + ['--events'], stdout=subprocess.PIPE, stderr=subprocess.STDOUT)
+
+        for line in process.stdout:
+            event = parse_event(line)
+            if event is None:
+                continue
+            if event['event'] in (ITEM_DONE, ITEM_FAILED):
+                progress = event_progress(event)
+                if progress is not None:
+                    self.signal_handler.progress_update.emit(step, progress)
+                if event['event'] == ITEM_FAILED:
+                    print(f"Failed: {event.get('item')}: {event.get('error')}")
+            elif event['event'] == THROUGHPUT:
+                self.signal_handler.progress_text.emit(
+                    step, f"{label}: %p% ({event['items_per_second']:.1f}/s, ETA {format_eta(event.get('eta_seconds'))})")
+
+        process.wait()
+        self.signal_handler.progress_text.emit(step, f"{label}: %p%")
 
     def process_completed(self, step):
         if self.stacked_widget.currentIndex() == 0:
@@ -623,51 +703,22 @@ class ProcessingWidget(QMainWindow):
         os.makedirs(dds_output, exist_ok=True)
 
         scale_factor = self.scale_spin.value() / 100.0
-        total_files = self.count_files(self.input_folder)
-        processed_files = 0
 
-        process = subprocess.Popen([
+        self.run_event_command([
             'python', 'General_UI_Tool/scale.py',
             self.input_folder,
             str(scale_factor),
             str(self.batch_spin.value())
-        ], stdout=subprocess.PIPE, stderr=subprocess.PIPE)
-
-        while True:
-            output = process.stdout.readline()
-            if output == b'' and process.poll() is not None:
-                break
-            if output:
-                processed_files += 1
-                progress_percentage = int((processed_files / total_files) * 100)
-                self.signal_handler.progress_update.emit(1, progress_percentage)
-
-        process.wait()
+        ], 1)
         self.signal_handler.process_complete.emit(1)
 
-        total_conversion_files = self.count_files(scaled_output)
-        converted_files = 0
-
-        process = subprocess.Popen([
+        self.run_event_command([
             'python', 'General_UI_Tool/dds-converter.py',
             scaled_output,
             dds_output, 
-            "--gpu", str(self.gpu_spin.value())
-        ], stdout=subprocess.PIPE, stderr=subprocess.PIPE)
-
-        while True:
-            output = process.stdout.readline()
-            if output == b'' and process.poll() is not None:
-                break
-            if output:
-                output_str = output.decode('utf-8', errors='ignore')
-                if "writing" in output_str:
-                    converted_files += 1
-                    conversion_progress_percentage = int((converted_files / total_conversion_files) * 100)
-                    self.signal_handler.progress_update.emit(2, conversion_progress_percentage)
-                    print(f"Debug: {output_str.strip()}")  # Print the line for debugging
-
-        process.wait()
+            "--gpu", str(self.gpu_spin.value()),
+            "--format", self.format_combo.currentText()
+        ], 2)
         self.signal_handler.process_complete.emit(2)
 
     def run_manual_scaling(self):
@@ -675,26 +726,13 @@ class ProcessingWidget(QMainWindow):
         os.makedirs(scaled_output, exist_ok=True)
 
         scale_factor = self.manual_scale_spin.value() / 100.0
-        total_files = self.count_files(self.manual_input_folder)
-        processed_files = 0
 
-        process = subprocess.Popen([
+        self.run_event_command([
             'python', 'General_UI_Tool/scale.py',
             self.manual_input_folder,
             str(scale_factor),
             str(self.manual_batch_spin.value())
-        ], stdout=subprocess.PIPE, stderr=subprocess.PIPE)
-
-        while True:
-            output = process.stdout.readline()
-            if output == b'' and process.poll() is not None:
-                break
-            if output:
-                processed_files += 1
-                progress_percentage = int((processed_files / total_files) * 100)
-                self.signal_handler.progress_update.emit(1, progress_percentage)
-
-        process.wait()
+        ], 1)
         self.signal_handler.process_complete.emit(1)
 
     def run_manual_converting(self):
@@ -702,29 +740,13 @@ class ProcessingWidget(QMainWindow):
         dds_output = os.path.join(self.manual_input_folder, 'dds')
         os.makedirs(dds_output, exist_ok=True)
 
-        total_files = self.count_files(scaled_output)
-        converted_files = 0
-
-        process = subprocess.Popen([
+        self.run_event_command([
             'python', 'General_UI_Tool/dds-converter.py',
             scaled_output,
             dds_output, 
-            "--gpu", str(self.manual_gpu_spin.value())
-        ], stdout=subprocess.PIPE, stderr=subprocess.PIPE)
-
-        while True:
-            output = process.stdout.readline()
-            if output == b'' and process.poll() is not None:
-                break
-            if output:
-                output_str = output.decode('utf-8', errors='ignore')
-                if "writing" in output_str:
-                    converted_files += 1
-                    progress_percentage = int((converted_files / total_files) * 100)
-                    self.signal_handler.progress_update.emit(2, progress_percentage)
-                    print(f"Debug: {output_str.strip()}")  # Print the line for debugging
-
-        process.wait()
+            "--gpu", str(self.manual_gpu_spin.value()),
+            "--format", self.manual_format_combo.currentText()
+        ], 2)
         self.signal_handler.process_complete.emit(2)
 
     def start_processing(self):
@@ -756,33 +778,78 @@ class ProcessingWidget(QMainWindow):
         processing_thread.daemon = True
         processing_thread.start()
 
+    def describe_scaled_frames(self, folder, scale_percent, dds_format, dimensions_label, cost_label):
+        # Same rounding as scale.py, so the estimate matches the DDS files that will be written
+        frame_count, size = read_frame_store(folder)
+        if not frame_count:
+            dimensions_label.setText('Estimated Dimensions: -')
+            cost_label.setText('Estimated Cost: -')
+            return
+        new_width, new_height = calculate_new_dimensions(size[0], size[1], scale_percent / 100.0)
+        dimensions_label.setText(f'Estimated Dimensions: {new_width}x{new_height}')
+        # 'auto' is shown at its BC7 upper bound
+        cost = estimate_mod_cost(frame_count, new_width, new_height,
+                                 'BC7_UNORM' if dds_format == 'auto' else dds_format)
+        cost_label.setText(f'Estimated Cost: {describe_cost(cost)}')
+
     def update_estimated_dimensions(self):
         if hasattr(self, 'input_folder'):
-            image_files = [f for f in os.listdir(self.input_folder) if f.lower().endswith(('.png', '.jpg', '.jpeg', '.bmp', '.tiff'))]
-            if image_files:
-                first_image_path = os.path.join(self.input_folder, image_files[0])
-                with Image.open(first_image_path) as img:
-                    original_width, original_height = img.size
-                    scale_factor = self.scale_spin.value() / 100.0
-                    new_width = int(original_width * scale_factor)
-                    new_height = int(original_height * scale_factor)
-                    self.dimensions_label.setText(f'Estimated Dimensions: {new_width}x{new_height}')
-            else:
-                self.dimensions_label.setText('Estimated Dimensions: -')
+            self.describe_scaled_frames(self.input_folder, self.scale_spin.value(), self.format_combo.currentText(),
+                                        self.dimensions_label, self.cost_label)
 
     def update_manual_estimated_dimensions(self):
         if hasattr(self, 'manual_input_folder'):
-            image_files = [f for f in os.listdir(self.manual_input_folder) if f.lower().endswith(('.png', '.jpg', '.jpeg', '.bmp', '.tiff'))]
-            if image_files:
-                first_image_path = os.path.join(self.manual_input_folder, image_files[0])
-                with Image.open(first_image_path) as img:
-                    original_width, original_height = img.size
-                    scale_factor = self.manual_scale_spin.value() / 100.0
-                    new_width = int(original_width * scale_factor)
-                    new_height = int(original_height * scale_factor)
-                    self.manual_dimensions_label.setText(f'Estimated Dimensions: {new_width}x{new_height}')
-            else:
-                self.manual_dimensions_label.setText('Estimated Dimensions: -')
+            self.describe_scaled_frames(self.manual_input_folder, self.manual_scale_spin.value(),
+                                        self.manual_format_combo.currentText(),
+                                        self.manual_dimensions_label, self.manual_cost_label)
+
+    def suggest_budget_settings(self):
+        if not hasattr(self, 'input_folder'):
+            QMessageBox.warning(self, "No Folder", "Select a frame folder first.")
+            return
+        frame_count, size = read_frame_store(self.input_folder)
+        if not frame_count:
+            QMessageBox.warning(self, "No Frames", "The selected folder does not contain any frames.")
+            return
+
+        frame_paths = [os.path.join(self.input_folder, f) for f in os.listdir(self.input_folder) if self.is_valid_image_file(f)]
+        budget_bytes = self.budget_spin.value() * 1024 * 1024
+        self.suggest_btn.setEnabled(False)
+        self.suggestion_label.setText("Checking frame transparency...")
+        # Every frame is decoded to find partial transparency, so keep it off the UI thread
+        threading.Thread(target=self.plan_budget_settings, args=(frame_paths, frame_count, size, budget_bytes), daemon=True).start()
+
+    def plan_budget_settings(self, frame_paths, frame_count, size, budget_bytes):
+        try:
+            # BC1 is only an option when no frame has partial transparency; unreadable frames count as having it
+            formats = ('BC7_UNORM', 'BC3_UNORM')
+            if 'BC7_UNORM' not in group_by_format(frame_paths, fallback='BC7_UNORM'):
+                formats += ('BC1_UNORM',)
+            plan = plan_budget(frame_count, size[0], size[1], budget_bytes, formats)
+        except Exception as e:
+            self.signal_handler.suggestion_failed.emit(str(e))
+            return
+        self.signal_handler.suggestion_ready.emit((plan, frame_count, budget_bytes))
+
+    def show_budget_suggestion_error(self, message):
+        self.suggest_btn.setEnabled(True)
+        self.suggestion_label.setText(f"Could not suggest settings: {message}")
+
+    def show_budget_suggestion(self, result):
+        plan, frame_count, budget_bytes = result
+        self.suggest_btn.setEnabled(True)
+        self.scale_spin.setValue(int(round(plan['scale'] * 100)))
+        # 'auto' never costs more than BC7 and still saves on the frames that allow BC1
+        self.format_combo.setCurrentText('auto' if plan['format'] == 'BC7_UNORM' else plan['format'])
+
+        suggestion = f"Suggested: {int(round(plan['scale'] * 100))}% scale, {plan['format']}"
+        if plan['frame_step'] > 1:
+            suggestion += (f", keep every {plan['frame_step']} frames ({plan['frame_count']} of {frame_count}; "
+                           f"lower the FPS in Video Processing)")
+        suggestion += f" - {format_bytes(plan['vram_bytes'])} of {format_bytes(budget_bytes)}"
+        if not plan['fits']:
+            suggestion += ". Nothing fits the budget, this is the smallest option."
+        self.suggestion_label.setText(suggestion)
 
 if __name__ == '__main__':
     app = QApplication(sys.argv)
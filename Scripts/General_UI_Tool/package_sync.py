@@ -0,0 +1,130 @@
+import hashlib
+import json
+import os
+import shutil
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+# How files reach the destination: a full copy, a hard link (no extra disk space; the
+# destination changes whenever the source file is edited in place) or a reflink, a
+# copy-on-write clone on filesystems that support it (Btrfs, XFS; elsewhere a copy is made).
+LINK_MODES = ('copy', 'hardlink', 'reflink')
+MANIFEST_VERSION = 1
+HASH_CHUNK_BYTES = 1024 * 1024
+# FICLONE from linux/fs.h
+FICLONE = 0x40049409
+
+def manifest_path(folder, name):
+    """Manifest of the files package `name` placed in `folder`; one per package, so mods can share a folder."""
+    return os.path.join(folder, f".{name}.manifest.json")
+
+def load_manifest(path):
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    return data.get('files', {}) if data.get('version') == MANIFEST_VERSION else {}
+
+def save_manifest(path, files):
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump({'version': MANIFEST_VERSION, 'files': files}, f, indent=1, sort_keys=True)
+
+def file_digest(path):
+    digest = hashlib.blake2b(digest_size=16)
+    with open(path, 'rb') as f:
+        while chunk := f.read(HASH_CHUNK_BYTES):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def _reflink(source, destination):
+    """Clone `source` to `destination`; False when the platform or filesystem can't."""
+    if not sys.platform.startswith('linux'):
+        return False
+    import fcntl
+    try:
+        with open(source, 'rb') as src, open(destination, 'wb') as dst:
+            fcntl.ioctl(dst.fileno(), FICLONE, src.fileno())
+        return True
+    except OSError:
+        return False
+
+def place_file(source, destination, link_mode='copy'):
+    """Put `source` at `destination` using `link_mode`, falling back to a copy; returns the mode used."""
+    if link_mode not in LINK_MODES:
+        raise ValueError(f"Unknown link mode '{link_mode}', expected one of {LINK_MODES}")
+    os.makedirs(os.path.dirname(destination) or '.', exist_ok=True)
+    # Never write through an existing hard link into the file it shares with the source
+    if os.path.lexists(destination):
+        os.remove(destination)
+    if link_mode == 'hardlink':
+        try:
+            os.link(source, destination)
+            return 'hardlink'
+        except OSError:
+            pass  # e.g. another drive or FAT32
+    elif link_mode == 'reflink' and _reflink(source, destination):
+        shutil.copystat(source, destination)
+        return 'reflink'
+    shutil.copy2(source, destination)
+    return 'copy'
+
+def sync_files(files, destination_folder, name, link_mode='copy', max_workers=None):
+    """
+    Make `destination_folder` hold `files` ({relative path: source path}) for package `name`.
+
+    The package's manifest records each placed file's source, size, the source's mtime and a
+    content hash. Files whose source is the same unchanged file as at the last sync are skipped
+    without being read, files with the same content are kept, and only new or changed ones are
+    copied or linked.
+    Files the previous sync placed that are no longer part of the package are deleted; files
+    the package never placed are left alone.
+
+    Returns counts of 'placed', 'unchanged' and 'removed' files.
+    """
+    path = manifest_path(destination_folder, name)
+    old = load_manifest(path)
+
+    def sync(item):
+        relative, source = item
+        stat = os.stat(source)
+        source_path = os.path.normcase(os.path.abspath(source))
+        destination = os.path.join(destination_folder, relative)
+        entry = old.get(relative)
+        try:
+            present = os.path.getsize(destination) == stat.st_size
+        except OSError:
+            present = False
+        # A different source with the same size and mtime still has to be hashed
+        if (entry and present and entry.get('source') == source_path
+                and (entry['size'], entry['mtime_ns']) == (stat.st_size, stat.st_mtime_ns)):
+            return relative, entry, False
+        digest = file_digest(source)
+        new_entry = {'source': source_path, 'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns, 'hash': digest}
+        if entry and present and entry['hash'] == digest:
+            return relative, new_entry, False
+        place_file(source, destination, link_mode)
+        return relative, new_entry, True
+
+    os.makedirs(destination_folder, exist_ok=True)
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        results = list(executor.map(sync, files.items()))
+
+    removed = 0
+    for relative in sorted(set(old) - set(files)):
+        stale = os.path.join(destination_folder, relative)
+        try:
+            os.remove(stale)
+            removed += 1
+        except FileNotFoundError:
+            continue
+        folder = os.path.dirname(stale)
+        if os.path.normcase(os.path.abspath(folder)) != os.path.normcase(os.path.abspath(destination_folder)):
+            try:
+                os.rmdir(folder)  # only succeeds once the package's subfolder is empty
+            except OSError:
+                pass
+
+    save_manifest(path, {relative: entry for relative, entry, _ in results})
+    placed = sum(1 for _, _, changed in results if changed)
+    return {'placed': placed, 'unchanged': len(results) - placed, 'removed': removed}
@@ -0,0 +1,119 @@
+import json
+import sys
+import threading
+import time
+
+# Event names written by the batch CLIs (scale.py, dds-converter.py) when run with --events.
+# Every event is one JSON object per line on stdout, e.g.
+#   {"event": "started", "stage": "scale", "total": 120}
+#   {"event": "item_done", "stage": "scale", "item": "12.png", "seconds": 0.084, "done": 13, "failed": 0, "total": 120}
+#   {"event": "item_failed", "stage": "scale", "item": "13.png", "error": "...", "done": 13, "failed": 1, "total": 120}
+#   {"event": "throughput", "stage": "scale", "items_per_second": 11.9, "eta_seconds": 8.9, "done": 13, "failed": 1, "total": 120}
+#   {"event": "finished", "stage": "scale", "done": 119, "failed": 1, "total": 120, "elapsed": 10.2}
+STARTED = "started"
+ITEM_DONE = "item_done"
+ITEM_FAILED = "item_failed"
+THROUGHPUT = "throughput"
+FINISHED = "finished"
+
+class ProgressEvents:
+    """Emits the JSON-lines progress protocol for one processing stage. Safe to call from several threads."""
+
+    def __init__(self, stage, total, enabled=True, stream=None, throughput_interval=0.5):
+        self.stage = stage
+        self.total = total
+        self.enabled = enabled
+        self.stream = stream or sys.stdout
+        self.throughput_interval = throughput_interval
+        self.done = 0
+        self.failed = 0
+        self._lock = threading.Lock()
+        self._start_time = time.monotonic()
+        self._last_throughput = 0.0
+
+    def emit(self, event, **fields):
+        if not self.enabled:
+            return
+        payload = {"event": event, "stage": self.stage}
+        payload.update(fields)
+        line = json.dumps(payload)
+        with self._lock:
+            self.stream.write(line + "\n")
+            self.stream.flush()
+
+    def started(self):
+        self._start_time = time.monotonic()
+        self._last_throughput = self._start_time
+        self.emit(STARTED, total=self.total)
+
+    def item_done(self, item, seconds, **extra):
+        with self._lock:
+            self.done += 1
+            done, failed = self.done, self.failed
+        self.emit(ITEM_DONE, item=str(item), seconds=round(seconds, 4), done=done, failed=failed, total=self.total, **extra)
+        self._maybe_emit_throughput()
+
+    def item_failed(self, item, error, seconds=None):
+        with self._lock:
+            self.failed += 1
+            done, failed = self.done, self.failed
+        fields = {"item": str(item), "error": str(error), "done": done, "failed": failed, "total": self.total}
+        if seconds is not None:
+            fields["seconds"] = round(seconds, 4)
+        self.emit(ITEM_FAILED, **fields)
+        self._maybe_emit_throughput()
+
+    def finished(self):
+        self._maybe_emit_throughput(force=True)
+        self.emit(FINISHED, done=self.done, failed=self.failed, total=self.total,
+                  elapsed=round(time.monotonic() - self._start_time, 3))
+
+    def _maybe_emit_throughput(self, force=False):
+        now = time.monotonic()
+        with self._lock:
+            if not force and now - self._last_throughput < self.throughput_interval:
+                return
+            self._last_throughput = now
+            completed = self.done + self.failed
+            done, failed = self.done, self.failed
+        elapsed = max(now - self._start_time, 1e-6)
+        rate = completed / elapsed
+        remaining = max(self.total - completed, 0)
+        eta = remaining / rate if rate > 0 else None
+        self.emit(THROUGHPUT, items_per_second=round(rate, 3),
+                  eta_seconds=round(eta, 1) if eta is not None else None,
+                  done=done, failed=failed, total=self.total)
+
+def parse_event(line):
+    """Return the event dict for a protocol line, or None for ordinary log output."""
+    if isinstance(line, bytes):
+        line = line.decode('utf-8', errors='ignore')
+    # Worker processes share stdout with the emitter, so an event line may be preceded by the
+    # unterminated tail of another process' log output. Events are written in a single call and
+    # are therefore never split, only prefixed.
+    start = line.find('{"event"')
+    if start < 0:
+        return None
+    try:
+        event = json.loads(line[start:].strip())
+    except ValueError:
+        return None
+    if isinstance(event, dict) and "event" in event:
+        return event
+    return None
+
+def event_progress(event):
+    """Percentage (0-100) of completed items described by an event, or None if it carries no counts."""
+    total = event.get("total")
+    if not total:
+        return None
+    completed = event.get("done", 0) + event.get("failed", 0)
+    return int(min(completed, total) * 100 / total)
+
+def format_eta(seconds):
+    """Human readable ETA for progress bar labels."""
+    if seconds is None:
+        return "--"
+    seconds = int(round(seconds))
+    minutes, seconds = divmod(seconds, 60)
+    return f"{minutes}m {seconds:02d}s" if minutes else f"{seconds}s"
@@ -0,0 +1,183 @@
+import argparse
+import time
+from functools import lru_cache
+
+import cv2
+import numpy as np
+from PIL import Image
+
+try:
+    from General_UI_Tool.encode_quality import ssim
+except ImportError:
+    from encode_quality import ssim
+
+# Resize backends, each usable on PIL images and on numpy arrays (any channel order):
+#   pillow-lanczos  Pillow's Lanczos over the full filter support; the quality reference
+#   cv2-area        OpenCV pixel-area averaging; fast, and alias-free when shrinking
+#   cv2-lanczos     OpenCV's fixed 8x8 Lanczos; sharp, but aliases on large downscales
+#   box-lanczos     Pillow box-reduces by whole factors first, then runs Lanczos over the rest
+BACKENDS = ('pillow-lanczos', 'cv2-area', 'cv2-lanczos', 'box-lanczos')
+DEFAULT_BACKEND = 'pillow-lanczos'
+# box-lanczos reduces until the image is within this factor of the target size
+BOX_REDUCING_GAP = 2.0
+# SSIM against pillow-lanczos a backend must reach on every benchmark frame to be picked
+DEFAULT_MIN_SSIM = 0.98
+# Synthetic frames used by benchmark(); larger sources are benchmarked at this size
+BENCHMARK_SIZE = (512, 512)
+BENCHMARK_FRAMES = 3
+BENCHMARK_REPEATS = 3
+
+_CV2_INTERPOLATION = {'cv2-area': cv2.INTER_AREA, 'cv2-lanczos': cv2.INTER_LANCZOS4}
+
+def _resize_cv2(array, size, interpolation):
+    """cv2.resize, with 8-bit 4-channel arrays premultiplied by alpha (last channel) like Pillow does."""
+    if array.ndim != 3 or array.shape[2] != 4 or array.dtype != np.uint8:
+        return cv2.resize(array, size, interpolation=interpolation)
+    *colour, alpha = cv2.split(array)
+    premultiplied = cv2.merge([cv2.multiply(channel, alpha, scale=1 / 255) for channel in colour] + [alpha])
+    *colour, alpha = cv2.split(cv2.resize(premultiplied, size, interpolation=interpolation))
+    # cv2.divide gives 0 where alpha is 0
+    return cv2.merge([cv2.divide(channel, alpha, scale=255) for channel in colour] + [alpha])
+
+def _resize_pil(image, size, backend):
+    if backend in _CV2_INTERPOLATION:
+        if image.mode not in ('L', 'RGB', 'RGBA'):
+            image = image.convert('RGBA')
+        return Image.fromarray(_resize_cv2(np.asarray(image), size, _CV2_INTERPOLATION[backend]))
+    if backend == 'box-lanczos':
+        # Pillow ignores reducing_gap for the modes it premultiplies itself, so premultiply here
+        premultiplied = {'LA': 'La', 'RGBA': 'RGBa'}.get(image.mode)
+        if premultiplied:
+            return image.convert(premultiplied).resize(size, Image.LANCZOS, reducing_gap=BOX_REDUCING_GAP).convert(image.mode)
+        return image.resize(size, Image.LANCZOS, reducing_gap=BOX_REDUCING_GAP)
+    return image.resize(size, Image.LANCZOS)
+
+def resize(image, size, backend=DEFAULT_BACKEND):
+    """
+    `image` resized to `size` (width, height) with `backend`.
+
+    PIL images come back as PIL images and numpy arrays as numpy arrays of the same dtype.
+    """
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown resampling backend '{backend}', expected one of {BACKENDS}")
+    size = (int(size[0]), int(size[1]))
+    if isinstance(image, Image.Image):
+        return _resize_pil(image, size, backend)
+    if backend in _CV2_INTERPOLATION:
+        return _resize_cv2(image, size, _CV2_INTERPOLATION[backend])
+    if image.dtype != np.uint8:
+        raise ValueError(f"{backend} resizes 8-bit arrays only, got {image.dtype}")
+    return np.asarray(_resize_pil(Image.fromarray(image), size, backend))
+
+def synthetic_frame(size=BENCHMARK_SIZE, seed=0):
+    """
+    RGBA test frame shaped like UI media: smooth gradients, hard-edged shapes, thin text and
+    lines, a fine checker patch and an alpha channel with soft and rounded edges.
+    """
+    width, height = size
+    rng = np.random.default_rng(seed)
+    y, x = np.mgrid[0:height, 0:width].astype(np.float32)
+    frame = np.empty((height, width, 4), dtype=np.uint8)
+    frame[:, :, 0] = 255 * x / max(1, width - 1)
+    frame[:, :, 1] = 255 * y / max(1, height - 1)
+    frame[:, :, 2] = 128 + 127 * np.sin((x + y) / max(8.0, width / 16))
+    frame[:, :, 3] = 255
+    for _ in range(8):
+        colour = tuple(int(c) for c in rng.integers(0, 256, 3)) + (255,)
+        x0, y0 = int(rng.integers(0, width)), int(rng.integers(0, height))
+        if rng.random() < 0.5:
+            cv2.rectangle(frame, (x0, y0), (x0 + int(rng.integers(8, width // 3)), y0 + int(rng.integers(8, height // 3))), colour, -1)
+        else:
+            cv2.circle(frame, (x0, y0), int(rng.integers(4, max(5, width // 8))), colour, -1)
+    for row in range(height // 8, height, max(12, height // 10)):
+        cv2.putText(frame, "Lv. 90  ATK 2418", (width // 16, row), cv2.FONT_HERSHEY_SIMPLEX,
+                    max(0.3, width / 1200), (255, 255, 255, 255), 1, cv2.LINE_AA)
+    checker = ((x // 2 + y // 2) % 2 == 0)[:height // 4, :width // 4]
+    frame[-(height // 4):, -(width // 4):, :3][checker] = 0
+    # Rounded, soft-edged alpha like a portrait card
+    radius = min(width, height) / 8
+    dx = np.maximum(np.maximum(radius - x, x - (width - 1 - radius)), 0)
+    dy = np.maximum(np.maximum(radius - y, y - (height - 1 - radius)), 0)
+    frame[:, :, 3] = np.clip((radius - np.hypot(dx, dy)) * 64, 0, 255).astype(np.uint8)
+    # Exporters usually leave black under fully transparent pixels; resizing mustn't bleed it in
+    frame[frame[:, :, 3] == 0, :3] = 0
+    return frame
+
+def _target_size(size, scale_factor):
+    return max(1, int(round(size[0] * scale_factor))), max(1, int(round(size[1] * scale_factor)))
+
+def benchmark(scale_factor, frame_size=BENCHMARK_SIZE, frames=BENCHMARK_FRAMES, repeats=BENCHMARK_REPEATS, backends=BACKENDS):
+    """
+    Time every backend resizing synthetic frames by `scale_factor` and score it against
+    pillow-lanczos.
+
+    Returns {backend: {'seconds': best time per frame, 'megapixels_per_second': source
+    throughput, 'ssim': lowest SSIM over the frames}}.
+    """
+    sources = [Image.fromarray(synthetic_frame(frame_size, seed)) for seed in range(frames)]
+    target = _target_size(frame_size, scale_factor)
+    references = [resize(source, target, 'pillow-lanczos') for source in sources]
+    results = {}
+    for backend in backends:
+        best = float('inf')
+        for _ in range(repeats):
+            start = time.perf_counter()
+            outputs = [resize(source, target, backend) for source in sources]
+            best = min(best, (time.perf_counter() - start) / frames)
+        results[backend] = {
+            'seconds': best,
+            'megapixels_per_second': frame_size[0] * frame_size[1] / 1e6 / best if best else float('inf'),
+            'ssim': min(ssim(reference, output) for reference, output in zip(references, outputs)),
+        }
+    return results
+
+def _benchmark_size(source_size):
+    if source_size is None:
+        return BENCHMARK_SIZE
+    shrink = min(1.0, max(BENCHMARK_SIZE) / max(source_size))
+    return max(8, int(source_size[0] * shrink)), max(8, int(source_size[1] * shrink))
+
+def fastest_good(results, min_ssim=DEFAULT_MIN_SSIM):
+    """The fastest backend in benchmark() `results` reaching `min_ssim`, else DEFAULT_BACKEND."""
+    good = [backend for backend in results if results[backend]['ssim'] >= min_ssim]
+    return min(good, key=lambda backend: results[backend]['seconds']) if good else DEFAULT_BACKEND
+
+@lru_cache(maxsize=None)
+def _pick(scale_factor, min_ssim, frame_size):
+    return fastest_good(benchmark(scale_factor, frame_size), min_ssim)
+
+def pick_backend(scale_factor, min_ssim=DEFAULT_MIN_SSIM, source_size=None):
+    """
+    The fastest backend whose output stays within `min_ssim` of pillow-lanczos when
+    scaling by `scale_factor`; pillow-lanczos itself if none is close enough.
+
+    `source_size` (width, height) shapes the synthetic frames like the real ones. Results
+    are benchmarked once per process for each scale factor (to 2 decimals) and size.
+    """
+    return _pick(round(float(scale_factor), 2), float(min_ssim), _benchmark_size(source_size))
+
+def pick_backend_for(source_size, target_size, min_ssim=DEFAULT_MIN_SSIM):
+    """pick_backend() for resizing frames of `source_size` to `target_size`, by their smaller scale factor."""
+    scale_factor = min(target_size[0] / source_size[0], target_size[1] / source_size[1])
+    return pick_backend(scale_factor, min_ssim, source_size)
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the resampling backends on synthetic frames.')
+    parser.add_argument('scales', type=float, nargs='+', help='Scale factors to benchmark (e.g. 0.25 0.5).')
+    parser.add_argument('--min-ssim', type=float, default=DEFAULT_MIN_SSIM,
+                        help=f'SSIM against pillow-lanczos a backend needs to be picked (default: {DEFAULT_MIN_SSIM})')
+    parser.add_argument('--size', type=int, nargs=2, metavar=('WIDTH', 'HEIGHT'), default=BENCHMARK_SIZE,
+                        help=f'Synthetic frame size (default: {BENCHMARK_SIZE[0]} {BENCHMARK_SIZE[1]})')
+    args = parser.parse_args()
+
+    for scale_factor in args.scales:
+        results = benchmark(scale_factor, tuple(args.size))
+        picked = fastest_good(results, args.min_ssim)
+        print(f"Scale {scale_factor}:")
+        for backend, result in results.items():
+            marker = '*' if backend == picked else ' '
+            print(f" {marker} {backend:<15} {result['seconds'] * 1000:8.2f} ms/frame "
+                  f"{result['megapixels_per_second']:8.1f} MP/s  SSIM {result['ssim']:.4f}")
+
+if __name__ == '__main__':
+    main()
@@ -5,6 +5,8 @@ import tkinter as tk
 from tkinter import filedialog, messagebox, ttk
 import queue
 
+from progress_events import parse_event, event_progress, ITEM_DONE, ITEM_FAILED, FINISHED
+
 class ImageScalerApp:
     def __init__(self, root):
         self.root = root
@@ -136,7 +138,7 @@ class ImageScalerApp:
 
     def run_scale_script(self, folder_path, scale, images_per_batch):
         """Run the scale.py script with the provided arguments."""
-        command = ['python', 'scale.py', folder_path, str(scale), str(images_per_batch)]
+        command = ['python', 'scale.py', folder_path, str(scale), str(images_per_batch), '--events']
         
         try:
             # Count images to process for progress bar
@@ -149,19 +151,23 @@ class ImageScalerApp:
                 raise ValueError("No valid images found in the selected folder.")
 
             # Run the scaling process
-            process = subprocess.Popen(command, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
+            process = subprocess.Popen(command, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True)
 
-            # Monitor the process and update the progress bar
+            # Monitor the event stream and update the progress bar
             self.processed_images = 0
-            while process.poll() is None:
-                output = process.stdout.readline()
-                if output:
+            for output in process.stdout:
+                event = parse_event(output)
+                if event is None:
                     print(output.strip())
-                    if "Scaled and saved" in output:
-                        self.processed_images += 1
-                        self.progress_queue.put(self.processed_images)
-                # Sleep to avoid busy-waiting
-                self.root.update_idletasks()
+                    continue
+                if event['event'] in (ITEM_DONE, ITEM_FAILED):
+                    self.processed_images = event['done'] + event['failed']
+                    self.progress_queue.put(event_progress(event))
+                    if event['event'] == ITEM_FAILED:
+                        print(f"Failed: {event['item']}: {event['error']}")
+                elif event['event'] == FINISHED:
+                    print(f"Scaled {event['done']} images in {event['elapsed']}s ({event['failed']} failed)")
+            process.wait()
 
             # Final update after process completes
             self.progress_queue.put(None)
@@ -176,13 +182,11 @@ class ImageScalerApp:
     def update_progress_from_queue(self):
         """Update the progress bar based on the queue."""
         while True:
-            processed_images = self.progress_queue.get()
-            if processed_images is None:
+            progress = self.progress_queue.get()
+            if progress is None:
                 break
-            if self.total_images > 0:
-                progress = (processed_images / self.total_images) * 100
-                self.progress_bar['value'] = progress
-                self.root.update_idletasks()  # Refresh the GUI
+            self.progress_bar['value'] = progress
+            self.root.update_idletasks()  # Refresh the GUI
 
     def update_scale_from_slider(self, value):
         """Update the scale entry box when the slider is moved."""
@@ -1,11 +1,25 @@
 import os
 from PIL import Image
-from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
 import argparse
 import shutil
+import time
+
+try:
+    from General_UI_Tool.progress_events import ProgressEvents
+    from General_UI_Tool.package_sync import manifest_path, load_manifest, save_manifest, file_digest
+    from General_UI_Tool.resampling import BACKENDS, DEFAULT_BACKEND, resize, pick_backend_for
+except ImportError:
+    from progress_events import ProgressEvents
+    from package_sync import manifest_path, load_manifest, save_manifest, file_digest
+    from resampling import BACKENDS, DEFAULT_BACKEND, resize, pick_backend_for
 
 # Global variables
 new_dimensions = None  # To store the new width and height after first image processing
+# Images queued per worker process; enough to keep every core busy without queueing the whole folder
+PENDING_PER_WORKER = 4
+# Name of the manifest scale_images_in_batches keeps in the output folder
+MANIFEST_NAME = 'scale'
 
 def calculate_new_dimensions(img_width, img_height, scale_factor):
     """Calculate and return new width and height, scaled and adjusted to be divisible by 4."""
@@ -18,30 +32,36 @@ def calculate_new_dimensions(img_width, img_height, scale_factor):
 
     return (new_width, new_height)
 
-def scale_image(file_path, batch_folder, dimensions):
-    """Function to scale a single image and save it, using predetermined dimensions."""
+def scale_image(file_path, batch_folder, dimensions, known_hash=None, backend=DEFAULT_BACKEND):
+    """Function to scale a single image and save it, using predetermined dimensions.
+
+    `known_hash` is the source's content hash when its existing output was made with the
+    same parameters; if the source still hashes the same, the image is skipped without being
+    decoded. Returns a (status, seconds, source hash) tuple where status is 'scaled' or
+    'skipped'. Errors are raised so the parent process can report them per file.
+    """
+    start_time = time.perf_counter()
+    filename = os.path.basename(file_path)
+    output_path = os.path.join(batch_folder, filename)
+    digest = file_digest(file_path)
+    if known_hash == digest:
+        print(f'Skipping already scaled image: {filename}')
+        return 'skipped', time.perf_counter() - start_time, digest
+
+    # Scale and save the image
+    with Image.open(file_path) as img:
+        scaled_img = resize(img, dimensions, backend)
+        scaled_img.save(output_path)
+        print(f'Scaled and saved: {filename}')
+    return 'scaled', time.perf_counter() - start_time, digest
+
+def _output_size(output_folder, output):
     try:
-        # Open the original image
-        with Image.open(file_path) as img:
-            # Define output file path
-            filename = os.path.basename(file_path)
-            output_path = os.path.join(batch_folder, filename)
-
-            # Check if the scaled image already exists and matches the target size
-            if os.path.exists(output_path):
-                with Image.open(output_path) as scaled_img:
-                    if scaled_img.size == dimensions:
-                        print(f'Skipping already scaled image: {filename}')
-                        return  # Skip processing this image if already scaled
-
-            # Scale and save the image
-            scaled_img = img.resize(dimensions, Image.LANCZOS)
-            scaled_img.save(output_path)
-            print(f'Scaled and saved: {filename}')
-    except Exception as e:
-        print(f'Error processing {file_path}: {e}')
-
-def move_images_to_output(input_folder, output_folder, images_per_batch):
+        return os.path.getsize(os.path.join(output_folder, output))
+    except OSError:
+        return None
+
+def move_images_to_output(input_folder, output_folder, images_per_batch, emit_events=False):
     """Move images to output folder without processing, organized in batches."""
     os.makedirs(output_folder, exist_ok=True)
     image_files = [
@@ -49,6 +69,8 @@ def move_images_to_output(input_folder, output_folder, images_per_batch):
         for filename in os.listdir(input_folder)
         if filename.lower().endswith(('.png', '.jpg', '.jpeg', '.gif', '.bmp'))
     ]
+    events = ProgressEvents('scale', len(image_files), enabled=emit_events)
+    events.started()
 
     total_batches = (len(image_files) + images_per_batch - 1) // images_per_batch
     for batch_index in range(total_batches):
@@ -60,48 +82,111 @@ def move_images_to_output(input_folder, output_folder, images_per_batch):
         current_batch_files = image_files[start_index:end_index]
 
         for file_path in current_batch_files:
-            shutil.move(file_path, batch_folder)
-            print(f'Moved {os.path.basename(file_path)} to {batch_folder}')
+            start_time = time.perf_counter()
+            try:
+                shutil.move(file_path, batch_folder)
+                print(f'Moved {os.path.basename(file_path)} to {batch_folder}')
+                events.item_done(os.path.basename(file_path), time.perf_counter() - start_time, status='moved')
+            except Exception as e:
+                print(f'Error moving {file_path}: {e}')
+                events.item_failed(os.path.basename(file_path), e)
         
         print(f"Processed batch {batch_index + 1}/{total_batches} for non-scaling case.")
 
+    events.finished()
     print("All images moved to 'scaled-output' in batches without scaling!")
 
-def scale_images_in_batches(input_folder, output_folder, scale_factor, images_per_batch):
-    """Function to scale all images in the input folder and save to output folders in batches based on IMAGES_PER_BATCH."""
+def scale_images_in_batches(input_folder, output_folder, scale_factor, images_per_batch, emit_events=False, max_workers=None,
+                            resampler='auto'):
+    """Function to scale all images in the input folder and save to output folders in batches based on IMAGES_PER_BATCH.
+
+    One worker pool scales every image. Submissions are streamed with a bounded number in
+    flight and each image is told its batch folder when it is submitted, so workers move
+    straight on to the next batch instead of waiting for the slowest image of the current one.
+
+    A manifest in the output folder records each source's size, mtime and content hash with
+    the output it produced and the scale parameters. On a re-run, images whose source and
+    parameters are unchanged and whose output is still in place are skipped without opening
+    any image; a source with a new mtime is rehashed and only scaled if its content changed.
+
+    `resampler` is one of resampling.BACKENDS, or 'auto' to benchmark them for this scale
+    and use the fastest that matches Pillow's Lanczos closely enough.
+    """
     os.makedirs(output_folder, exist_ok=True)
     image_files = [
         os.path.join(input_folder, filename)
         for filename in os.listdir(input_folder)
         if filename.lower().endswith(('.png', '.jpg', '.jpeg', '.gif', '.bmp'))
     ]
+    events = ProgressEvents('scale', len(image_files), enabled=emit_events)
+    events.started()
 
     # Determine new dimensions based on the first image
     global new_dimensions
     if image_files:
         with Image.open(image_files[0]) as img:
             new_dimensions = calculate_new_dimensions(img.width, img.height, scale_factor)
+            if resampler == 'auto':
+                resampler = pick_backend_for(img.size, new_dimensions)
+                print(f"Resampling with {resampler}")
 
     # Process images in batches based on images_per_batch
     total_batches = (len(image_files) + images_per_batch - 1) // images_per_batch
+    remaining = [min(images_per_batch, len(image_files) - batch_index * images_per_batch) for batch_index in range(total_batches)]
     for batch_index in range(total_batches):
-        batch_folder = os.path.join(output_folder, f"batch{batch_index + 1}")
-        os.makedirs(batch_folder, exist_ok=True)
-
-        start_index = batch_index * images_per_batch
-        end_index = min(start_index + images_per_batch, len(image_files))
-        current_batch_files = image_files[start_index:end_index]
-
-        with ProcessPoolExecutor() as executor:
-            futures = {executor.submit(scale_image, file_path, batch_folder, new_dimensions): file_path for file_path in current_batch_files}
-            for future in futures:
+        os.makedirs(os.path.join(output_folder, f"batch{batch_index + 1}"), exist_ok=True)
+
+    def batch_item_done(index):
+        batch_index = index // images_per_batch
+        remaining[batch_index] -= 1
+        if not remaining[batch_index]:
+            print(f"Processed batch {batch_index + 1}/{total_batches}")
+
+    path = manifest_path(output_folder, MANIFEST_NAME)
+    manifest, entries = load_manifest(path), {}
+    max_workers = max_workers or os.cpu_count() or 1
+    max_pending = max_workers * PENDING_PER_WORKER
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        pending = {}
+        queue = iter(enumerate(image_files))
+        while True:
+            for index, file_path in queue:
+                filename = os.path.basename(file_path)
+                batch_name = f"batch{index // images_per_batch + 1}"
+                params = {'output': f"{batch_name}/{filename}", 'dimensions': list(new_dimensions), 'filter': resampler}
+                stat = os.stat(file_path)
+                entry = manifest.get(filename)
+                current = entry is not None and all(entry.get(key) == value for key, value in params.items()) \
+                    and _output_size(output_folder, entry['output']) == entry.get('output_size')
+                if current and (entry['size'], entry['mtime_ns']) == (stat.st_size, stat.st_mtime_ns):
+                    entries[filename] = entry
+                    events.item_done(filename, 0.0, status='skipped')
+                    batch_item_done(index)
+                    continue
+                future = executor.submit(scale_image, file_path, os.path.join(output_folder, batch_name), new_dimensions,
+                                         entry['hash'] if current else None, resampler)
+                pending[future] = (index, file_path, stat, params)
+                if len(pending) >= max_pending:
+                    break
+            if not pending:
+                break
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                index, file_path, stat, params = pending.pop(future)
+                filename = os.path.basename(file_path)
                 try:
-                    future.result()
+                    status, seconds, digest = future.result()
+                    entries[filename] = {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns, 'hash': digest,
+                                         'output_size': _output_size(output_folder, params['output']), **params}
+                    events.item_done(filename, seconds, status=status)
                 except Exception as e:
-                    print(f'Error occurred while processing {futures[future]}: {e}')
+                    print(f'Error occurred while processing {file_path}: {e}')
+                    events.item_failed(filename, e)
+                batch_item_done(index)
 
-        print(f"Processed batch {batch_index + 1}/{total_batches}")
+    save_manifest(path, entries)
 
+    events.finished()
     print("All batches processed!")
 
 def main():
@@ -109,6 +194,10 @@ def main():
     parser.add_argument('folderpath', type=str, help='Path to the folder containing images.')
     parser.add_argument('scale', type=float, help='Scale value (e.g., 0.25 for 25%).')
     parser.add_argument('images_per_batch', type=int, help='Number of images to process in each batch.')
+    parser.add_argument('--events', action='store_true', help='Emit JSON-lines progress events on stdout for GUIs.')
+    parser.add_argument('--workers', type=int, default=None, help='Worker processes for scaling (default: CPU count)')
+    parser.add_argument('--resampler', choices=('auto',) + BACKENDS, default='auto',
+                        help='Resize backend; auto benchmarks them and picks the fastest close to Lanczos (default: auto)')
 
     args = parser.parse_args()
 
@@ -120,9 +209,9 @@ def main():
     
     if scale_factor == 1:
         print("Scale factor is 1 (100%), moving images without scaling.")
-        move_images_to_output(input_folder, output_folder, images_per_batch)
+        move_images_to_output(input_folder, output_folder, images_per_batch, args.events)
     else:
-        scale_images_in_batches(input_folder, output_folder, scale_factor, images_per_batch)
+        scale_images_in_batches(input_folder, output_folder, scale_factor, images_per_batch, args.events, args.workers, args.resampler)
         print(f'All images have been scaled down and saved in batches in: {output_folder}')
 
 if __name__ == "__main__":
@@ -0,0 +1,81 @@
+import os
+import re
+
+# Mods generated with the shared clock read one namespaced tick instead of each running a
+# private $fpsvar/$speedtoggle accumulator in [Present]. Like the Party INI, users need
+# exactly one copy of the clock INI in their Mods folder.
+CLOCK_NAMESPACE = r"UIModMaker\AnimationClock"
+CLOCK_VERSION = 1
+CLOCK_INI_NAME = "Animation Clock (you can delete this if you already have it).ini"
+SHARED_TICK = f"$\\{CLOCK_NAMESPACE}\\speedtoggle"
+
+# Animations advance 24 times per 60 presented frames, as in the per-mod clocks
+CLOCK_INI = f"""; ------------ One copy for all mods
+; Shared animation clock for UI mods made with UI Mod Maker, version {CLOCK_VERSION}
+namespace = {CLOCK_NAMESPACE}
+
+[Constants]
+global $version = {CLOCK_VERSION}
+global $fpsvar = 0
+global $speedtoggle = 0
+
+[Present]
+$speedtoggle = 0
+$fpsvar = $fpsvar + 24
+if $fpsvar >= 60
+    $fpsvar = $fpsvar - 60
+    $speedtoggle = 1
+endif
+; -----------
+"""
+
+VERSION_PATTERN = re.compile(r'^\s*global\s+\$version\s*=\s*(\d+)', re.MULTILINE)
+
+def clock_constants(shared, suffix=""):
+    """[Constants] lines of a mod's private clock; none with the shared clock."""
+    if shared:
+        return ""
+    return f"global $fpsvar{suffix} = 0\nglobal $speedtoggle{suffix}\n"
+
+def clock_update(shared, indent="", suffix=""):
+    """[Present] lines advancing a mod's private clock; none with the shared clock."""
+    if shared:
+        return ""
+    lines = [f"if $active{suffix} == 1 && $fpsvar{suffix} < 60",
+             f"    $fpsvar{suffix} = $fpsvar{suffix} + 24",
+             f"    $speedtoggle{suffix} = 0",
+             "endif",
+             f"if $fpsvar{suffix} >= 60",
+             f"    $fpsvar{suffix} = $fpsvar{suffix} - 60",
+             f"    $speedtoggle{suffix} = 1",
+             "endif"]
+    return "".join(f"{indent}{line}\n" for line in lines)
+
+def tick_condition(shared, suffix=""):
+    """Condition true on the frames where the animation should advance."""
+    if shared:
+        # The shared clock runs whether or not this mod is drawn
+        return f"$active{suffix} == 1 && {SHARED_TICK} == 1"
+    return f"$speedtoggle{suffix} == 1"
+
+def installed_clock_version(path):
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            match = VERSION_PATTERN.search(f.read())
+    except OSError:
+        return None
+    return int(match.group(1)) if match else None
+
+def install_clock_ini(folder):
+    """
+    Write the shared clock INI into `folder` unless an equal or newer version is there.
+
+    Returns the INI's path.
+    """
+    path = os.path.join(folder, CLOCK_INI_NAME)
+    version = installed_clock_version(path)
+    if version is None or version < CLOCK_VERSION:
+        os.makedirs(folder, exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(CLOCK_INI)
+    return path
@@ -0,0 +1,216 @@
+import argparse
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+from PIL import Image
+
+try:
+    from General_UI_Tool.bcn_decoder import load_preview, image_size
+    from General_UI_Tool.find_hashes import find_dds_textures
+    from General_UI_Tool.frame_dump_index import get_index, HASH_PATTERN
+    from General_UI_Tool.ui_hash_registry import get_registry
+except ImportError:
+    from bcn_decoder import load_preview, image_size
+    from find_hashes import find_dds_textures
+    from frame_dump_index import get_index, HASH_PATTERN
+    from ui_hash_registry import get_registry
+
+# Fingerprint library, next to UI_Hashes.txt in the directory the tools are run from
+LIBRARY_PATH = 'template_fingerprints.json'
+TEMPLATES_DIR = 'templates'
+TEMPLATE_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.bmp', '.dds')
+HASH_BITS = 64
+DEFAULT_THRESHOLD = 0.85
+# Images are decoded at about this size before hashing; DDS files from a small mip or block means
+PREVIEW_SIZE = (64, 64)
+
+def _signal_image(image):
+    """Greyscale signal used for hashing: premultiplied luminance mixed with alpha, so silhouettes count."""
+    rgba = np.asarray(image.convert('RGBA'), dtype=np.float32)
+    alpha = rgba[:, :, 3] / 255.0
+    luminance = (rgba[:, :, 0] * 0.299 + rgba[:, :, 1] * 0.587 + rgba[:, :, 2] * 0.114) * alpha
+    return Image.fromarray(((luminance + rgba[:, :, 3]) * 0.5).astype(np.uint8), 'L')
+
+def difference_pixels(image):
+    """9x8 greyscale thumbnail the difference hash is computed from."""
+    return np.asarray(_signal_image(image).resize((9, 8), Image.BILINEAR), dtype=np.int16)
+
+def dhash_batch(pixel_stack):
+    """
+    Difference hashes for a stack of 9x8 thumbnails, shape (N, 8, 9), as uint64 (N,).
+
+    Each bit says whether a pixel is brighter than its right neighbour.
+    """
+    bits = (pixel_stack[:, :, 1:] > pixel_stack[:, :, :-1]).reshape(len(pixel_stack), HASH_BITS)
+    packed = np.packbits(bits.astype(np.uint8), axis=1)  # (N, 8) big-endian bytes
+    return packed.view('>u8').ravel().astype(np.uint64)
+
+def fingerprint_files(paths, max_workers=None):
+    """Fingerprints of image files, decoded on a thread pool. Unreadable files get None."""
+    def pixels(path):
+        try:
+            return difference_pixels(load_preview(path, PREVIEW_SIZE))
+        except Exception as e:
+            print(f"Could not fingerprint {path}: {e}")
+            return None
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        stacks = list(executor.map(pixels, paths))
+    valid = [i for i, stack in enumerate(stacks) if stack is not None]
+    result = [None] * len(paths)
+    if valid:
+        hashes = dhash_batch(np.stack([stacks[i] for i in valid]))
+        for i, value in zip(valid, hashes):
+            result[i] = int(value)
+    return result
+
+def hamming_matrix(a, b):
+    """Pairwise Hamming distances between two uint64 arrays, shape (len(a), len(b))."""
+    xor = np.bitwise_xor(np.asarray(a, dtype=np.uint64)[:, None], np.asarray(b, dtype=np.uint64)[None, :])
+    return np.unpackbits(xor.view(np.uint8).reshape(xor.shape + (8,)), axis=-1).sum(axis=-1)
+
+def dump_fingerprints(folder_path, max_workers=None):
+    """
+    (textures, fingerprints) for every valid DDS in a dump folder.
+
+    Fingerprints are cached in the frame-dump index, so only new or changed files are decoded.
+    """
+    textures = find_dds_textures(folder_path, max_workers)
+    index = get_index()
+    cached = index.fingerprints(folder_path)
+    missing = [t for t in textures if os.path.basename(t['path']) not in cached]
+    if missing:
+        print(f"Fingerprinting {len(missing)} textures...")
+        computed = fingerprint_files([t['path'] for t in missing], max_workers)
+        new = {os.path.basename(t['path']): fp for t, fp in zip(missing, computed) if fp is not None}
+        index.store_fingerprints(folder_path, new)
+        cached.update(new)
+    textures = [t for t in textures if os.path.basename(t['path']) in cached]
+    return textures, [cached[os.path.basename(t['path'])] for t in textures]
+
+def _template_entry(path, registry):
+    filename = os.path.basename(path)
+    if match := HASH_PATTERN.search(filename):
+        ui_hash = match.group(1)
+        return {'hash': ui_hash, 'names': registry.names_for(ui_hash)}
+    name = os.path.splitext(filename)[0]
+    return {'hash': registry.hash_for(name), 'names': [name]}
+
+def build_library(templates_dir=TEMPLATES_DIR, reference_dumps=(), max_workers=None):
+    """
+    Fingerprint library of known UI textures.
+
+    Sources are the saved templates (named after their dump file or after a UI_Hashes.txt
+    entry) and, optionally, older frame dumps, from which every texture whose hash is
+    listed in UI_Hashes.txt is taken.
+    """
+    registry = get_registry()
+    entries = []
+    if os.path.isdir(templates_dir):
+        paths = sorted(os.path.join(templates_dir, f) for f in os.listdir(templates_dir)
+                       if f.lower().endswith(TEMPLATE_EXTENSIONS))
+        for path, fingerprint in zip(paths, fingerprint_files(paths, max_workers)):
+            if fingerprint is None:
+                continue
+            width, height = image_size(path)
+            entry = _template_entry(path, registry)
+            entry.update({'source': path, 'width': width, 'height': height, 'fingerprint': f"{fingerprint:016x}"})
+            entries.append(entry)
+
+    for dump in reference_dumps:
+        textures, fingerprints = dump_fingerprints(dump, max_workers)
+        for texture, fingerprint in zip(textures, fingerprints):
+            names = registry.names_for(texture['hash'])
+            if names:
+                entries.append({'hash': texture['hash'], 'names': names, 'source': texture['path'],
+                                'width': texture['width'], 'height': texture['height'],
+                                'fingerprint': f"{fingerprint:016x}"})
+    return entries
+
+def save_library(entries, path=LIBRARY_PATH):
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump({'version': 1, 'entries': entries}, f, indent=2)
+
+def load_library(path=LIBRARY_PATH):
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f).get('entries', [])
+    except FileNotFoundError:
+        return []
+
+def match_dump(folder_path, library, threshold=DEFAULT_THRESHOLD, top=3, max_workers=None):
+    """
+    Compare every library entry against a dump and propose its current hash.
+
+    Returns one dict per library entry with 'status' ('unchanged' when the entry's hash is
+    still in the dump, 'renamed' when the best match has another hash, 'missing' when
+    nothing reaches `threshold`) and 'candidates': up to `top` dump textures with their
+    similarity (1 - Hamming distance / 64).
+    """
+    textures, fingerprints = dump_fingerprints(folder_path, max_workers)
+    if not library or not textures:
+        return []
+    library_fps = np.array([int(entry['fingerprint'], 16) for entry in library], dtype=np.uint64)
+    similarity = 1.0 - hamming_matrix(library_fps, np.array(fingerprints, dtype=np.uint64)) / HASH_BITS
+    dump_hashes = {t['hash'] for t in textures}
+
+    results = []
+    for row, entry in enumerate(library):
+        order = np.argsort(-similarity[row], kind='stable')[:top]
+        candidates = [{'hash': textures[i]['hash'], 'path': textures[i]['path'],
+                       'width': textures[i]['width'], 'height': textures[i]['height'],
+                       'similarity': round(float(similarity[row, i]), 4)}
+                      for i in order if similarity[row, i] >= threshold]
+        if entry.get('hash') in dump_hashes:
+            status = 'unchanged'
+        elif candidates:
+            status = 'renamed'
+        else:
+            status = 'missing'
+        results.append({'names': entry.get('names', []), 'hash': entry.get('hash'), 'source': entry.get('source'),
+                        'status': status, 'candidates': candidates})
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description='Find UI textures whose hashes changed, by perceptual hash.')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    build_parser = subparsers.add_parser('build', help='Build the fingerprint library from templates/ and reference dumps.')
+    build_parser.add_argument('reference_dumps', nargs='*', help='Older frame dumps containing hashes listed in UI_Hashes.txt.')
+    build_parser.add_argument('--templates', default=TEMPLATES_DIR, help=f'Templates folder (default: {TEMPLATES_DIR})')
+    build_parser.add_argument('--library', default=LIBRARY_PATH, help=f'Library file (default: {LIBRARY_PATH})')
+
+    match_parser = subparsers.add_parser('match', help='Propose current hashes for the library entries from a new dump.')
+    match_parser.add_argument('dump_folder', help='Frame-analysis folder to search.')
+    match_parser.add_argument('--library', default=LIBRARY_PATH, help=f'Library file (default: {LIBRARY_PATH})')
+    match_parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                              help=f'Minimum similarity 0-1 (default: {DEFAULT_THRESHOLD})')
+    match_parser.add_argument('--top', type=int, default=3, help='Candidates per entry (default: 3)')
+    match_parser.add_argument('--json', action='store_true', help='Print the results as JSON.')
+    args = parser.parse_args()
+
+    if args.command == 'build':
+        entries = build_library(args.templates, args.reference_dumps)
+        save_library(entries, args.library)
+        print(f"Saved {len(entries)} fingerprints to {args.library}")
+        return
+
+    library = load_library(args.library)
+    if not library:
+        print(f"No fingerprints in {args.library}; run 'build' first.")
+        return
+    results = match_dump(args.dump_folder, library, args.threshold, args.top)
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+    for result in results:
+        label = ', '.join(result['names']) or os.path.basename(result['source'] or '')
+        print(f"{label} [{result['hash'] or '-'}]: {result['status']}")
+        for candidate in result['candidates']:
+            print(f"    {candidate['hash']}  {candidate['similarity']:.3f}  "
+                  f"{candidate['width']}x{candidate['height']}  {os.path.basename(candidate['path'])}")
+
+if __name__ == '__main__':
+    main()
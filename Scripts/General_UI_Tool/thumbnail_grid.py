@@ -0,0 +1,150 @@
+import os
+
+from PyQt5.QtCore import (Qt, QAbstractListModel, QModelIndex, QObject, QRunnable, QSize,
+                          QThreadPool, pyqtSignal)
+from PyQt5.QtGui import QImage, QPixmap, QColor
+from PyQt5.QtWidgets import QListView, QAbstractItemView
+
+from General_UI_Tool.frame_dump_index import get_index
+
+THUMBNAIL_SIZE = QSize(128, 128)
+CELL_SIZE = QSize(148, 168)
+# Selection colours matching the dialogs' themes
+SELECTION_COLORS = {'dark': "#00cec9", 'light': "dodgerblue"}
+
+class _ThumbnailSignals(QObject):
+    # generation, row, image (None on failure)
+    loaded = pyqtSignal(int, int, object)
+
+class _ThumbnailJob(QRunnable):
+    """Builds one thumbnail off the GUI thread, through the index's disk cache."""
+
+    def __init__(self, signals, generation, row, path):
+        super().__init__()
+        self.signals = signals
+        self.generation = generation
+        self.row = row
+        self.path = path
+
+    def run(self):
+        image = None
+        try:
+            image = QImage.fromData(get_index().thumbnail(self.path), "PNG")
+            if image.isNull():
+                image = None
+        except Exception as e:
+            print(f"Could not load thumbnail for {self.path}: {e}")
+        # QPixmap may only be created on the GUI thread, so hand back a QImage
+        self.signals.loaded.emit(self.generation, self.row, image)
+
+class ThumbnailModel(QAbstractListModel):
+    """
+    List model of image paths whose thumbnails are loaded on demand.
+
+    A thumbnail is only requested when the view asks for a row's icon, i.e. when the cell
+    becomes visible, and is generated on a QThreadPool. Results of a previous set_paths()
+    call are discarded.
+    """
+    PathRole = Qt.UserRole
+
+    def __init__(self, parent=None, max_threads=4):
+        super().__init__(parent)
+        self._paths = []
+        self._tooltips = []
+        self._pixmaps = {}
+        self._pending = set()
+        self._failed = set()
+        self._generation = 0
+        self._pool = QThreadPool(self)
+        self._pool.setMaxThreadCount(max(1, min(max_threads, QThreadPool.globalInstance().maxThreadCount())))
+        self._signals = _ThumbnailSignals()
+        self._signals.loaded.connect(self._on_loaded)
+        self._placeholder = QPixmap(THUMBNAIL_SIZE)
+        self._placeholder.fill(QColor(128, 128, 128, 40))
+
+    def set_paths(self, paths, tooltips=None):
+        self.beginResetModel()
+        self._pool.clear()
+        self._generation += 1
+        self._paths = list(paths)
+        self._tooltips = list(tooltips) if tooltips else [os.path.basename(p) for p in self._paths]
+        self._pixmaps.clear(); self._pending.clear(); self._failed.clear()
+        self.endResetModel()
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._paths)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        row = index.row()
+        if role == Qt.DecorationRole:
+            if row in self._pixmaps:
+                return self._pixmaps[row]
+            if row not in self._pending and row not in self._failed:
+                self._pending.add(row)
+                self._pool.start(_ThumbnailJob(self._signals, self._generation, row, self._paths[row]))
+            return self._placeholder
+        if role == Qt.ToolTipRole:
+            return self._tooltips[row]
+        if role == self.PathRole:
+            return self._paths[row]
+        return None
+
+    def path(self, row):
+        return self._paths[row]
+
+    def _on_loaded(self, generation, row, image):
+        if generation != self._generation:
+            return
+        self._pending.discard(row)
+        if image is None:
+            self._failed.add(row)
+            return
+        self._pixmaps[row] = QPixmap.fromImage(image)
+        index = self.index(row)
+        self.dataChanged.emit(index, index, [Qt.DecorationRole])
+
+    def shutdown(self):
+        """Drop queued jobs; call when the owning dialog closes."""
+        self._generation += 1
+        self._pool.clear()
+
+class ThumbnailGrid(QListView):
+    """Virtualized icon grid of image files. Emits the file path on selection and double-click."""
+    path_selected = pyqtSignal(str)
+    path_activated = pyqtSignal(str)
+
+    def __init__(self, parent=None, theme=None):
+        super().__init__(parent)
+        self.setViewMode(QListView.IconMode)
+        self.setResizeMode(QListView.Adjust)
+        self.setMovement(QListView.Static)
+        self.setUniformItemSizes(True)
+        self.setLayoutMode(QListView.Batched)
+        self.setBatchSize(200)
+        self.setIconSize(THUMBNAIL_SIZE)
+        self.setGridSize(CELL_SIZE)
+        self.setSelectionMode(QAbstractItemView.SingleSelection)
+        self.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        if theme in SELECTION_COLORS:
+            self.setStyleSheet(f"QListView::item:selected {{ border: 2px solid {SELECTION_COLORS[theme]}; }}")
+
+        self.thumbnail_model = ThumbnailModel(self)
+        self.setModel(self.thumbnail_model)
+        self.selectionModel().currentChanged.connect(self._on_current_changed)
+        self.doubleClicked.connect(lambda index: self.path_activated.emit(self.thumbnail_model.path(index.row())))
+
+    def set_paths(self, paths, tooltips=None):
+        self.thumbnail_model.set_paths(paths, tooltips)
+
+    def _on_current_changed(self, current, _previous):
+        if current.isValid():
+            self.path_selected.emit(self.thumbnail_model.path(current.row()))
+
+    def shutdown(self):
+        self.thumbnail_model.shutdown()
+
+def texture_tooltip(texture):
+    """Tooltip for a find_dds_textures() entry."""
+    return f"{os.path.basename(texture['path'])}\n{texture['width']}x{texture['height']} {texture['format']}"
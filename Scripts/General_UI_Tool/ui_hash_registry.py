@@ -0,0 +1,177 @@
+import os
+import threading
+import time
+
+# UI_Hashes.txt lives in the directory the tools are run from
+HASHES_FILE = "UI_Hashes.txt"
+# How often (seconds) lookups check the file's mtime for changes
+RELOAD_CHECK_INTERVAL = 1.0
+
+class PrefixTrie:
+    """Case-insensitive prefix index. Every node keeps the sorted names below it, so a lookup is O(len(prefix))."""
+
+    def __init__(self, names=()):
+        self._root = {}
+        for name in names:
+            self.insert(name)
+        self._finalized = False
+
+    def insert(self, name):
+        node = self._root
+        for char in name.lower():
+            node = node.setdefault(char, {})
+            node.setdefault('', []).append(name)
+        self._finalized = False
+
+    def _finalize(self):
+        stack = [self._root]
+        while stack:
+            node = stack.pop()
+            for key, child in node.items():
+                if key == '':
+                    child.sort(key=str.lower)
+                else:
+                    stack.append(child)
+        self._finalized = True
+
+    def search(self, prefix, limit=None):
+        if not self._finalized:
+            self._finalize()
+        node = self._root
+        for char in prefix.lower():
+            node = node.get(char)
+            if node is None:
+                return []
+        names = node.get('', [])
+        return names[:limit] if limit else list(names)
+
+def parse_hashes_file(file_path):
+    """
+    Parse UI_Hashes.txt into a list of (section, name, hash) entries in file order.
+
+    '[Section]' lines start a section; entries are 'Name --> hash'. Malformed lines are
+    reported and skipped.
+    """
+    entries = []
+    section = None
+    with open(file_path, "r", encoding='utf-8') as file:
+        for i, line in enumerate(file, 1):
+            line = line.strip()
+            if not line:
+                continue
+            if line.startswith('[') and line.endswith(']'):
+                section = line[1:-1].strip()
+                continue
+            if " --> " not in line:
+                print(f"Warning: Skipping malformed line {i} in '{file_path}': '{line}'")
+                continue
+            name, hash_value = line.split(" --> ", 1)
+            entries.append((section, name.strip(), hash_value.strip()))
+    return entries
+
+class UIHashRegistry:
+    """
+    Name/hash lookups over UI_Hashes.txt.
+
+    The file is parsed on first use and re-parsed when its mtime changes, so edits show
+    up without restarting the tools. `version` increases on every reload, for callers
+    that cache derived data such as completer models.
+    """
+
+    def __init__(self, file_path=HASHES_FILE):
+        self.file_path = file_path
+        self.version = 0
+        self._lock = threading.Lock()
+        self._mtime = None
+        self._last_check = 0.0
+        self._entries = []
+        self._name_to_hash = {}
+        self._name_to_section = {}
+        self._hash_to_names = {}
+        self._sections = {}
+        self._trie = PrefixTrie()
+
+    def _ensure_loaded(self):
+        now = time.monotonic()
+        with self._lock:
+            if self._mtime is not None and now - self._last_check < RELOAD_CHECK_INTERVAL:
+                return
+            self._last_check = now
+            try:
+                mtime = os.stat(self.file_path).st_mtime_ns
+            except FileNotFoundError:
+                if self._mtime != -1:
+                    print(f"Warning: Character hashes file not found at '{self.file_path}'")
+                    self._load([])
+                    self._mtime = -1
+                return
+            if mtime == self._mtime:
+                return
+            try:
+                entries = parse_hashes_file(self.file_path)
+            except Exception as e:
+                print(f"An error occurred while loading character hashes: {e}")
+                return
+            self._load(entries)
+            self._mtime = mtime
+
+    def _load(self, entries):
+        self._entries = entries
+        self._name_to_hash = {}
+        self._name_to_section = {}
+        self._hash_to_names = {}
+        self._sections = {}
+        for section, name, hash_value in entries:
+            self._name_to_hash[name] = hash_value
+            self._name_to_section[name] = section
+            self._hash_to_names.setdefault(hash_value, []).append(name)
+            self._sections.setdefault(section, []).append(name)
+        self._trie = PrefixTrie(self._name_to_hash)
+        self.version += 1
+
+    def sections(self):
+        self._ensure_loaded()
+        return [section for section in self._sections if section is not None]
+
+    def names(self, section=None):
+        """Names in file order, optionally limited to one section."""
+        self._ensure_loaded()
+        if section is None:
+            return list(self._name_to_hash)
+        return list(self._sections.get(section, []))
+
+    def hash_for(self, name):
+        self._ensure_loaded()
+        return self._name_to_hash.get(name)
+
+    def names_for(self, hash_value):
+        """Every name registered for a hash (several names can share one)."""
+        self._ensure_loaded()
+        return list(self._hash_to_names.get(hash_value, []))
+
+    def section_of(self, name):
+        self._ensure_loaded()
+        return self._name_to_section.get(name)
+
+    def suggest(self, prefix, sections=None, limit=None):
+        """Names starting with `prefix` (case-insensitive), sorted, optionally limited to some sections."""
+        self._ensure_loaded()
+        matches = self._trie.search(prefix)
+        if sections is not None:
+            matches = [name for name in matches if self._name_to_section.get(name) in sections]
+        return matches[:limit] if limit else matches
+
+    def __contains__(self, name):
+        self._ensure_loaded()
+        return name in self._name_to_hash
+
+_registry = None
+_registry_lock = threading.Lock()
+
+def get_registry():
+    """The shared registry for UI_Hashes.txt."""
+    global _registry
+    with _registry_lock:
+        if _registry is None:
+            _registry = UIHashRegistry()
+        return _registry
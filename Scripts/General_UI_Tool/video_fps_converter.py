@@ -1,13 +1,28 @@
 import os
+import math
 import cv2
 import numpy as np
 import multiprocessing
 
-def convert_video_fps(input_path, output_path, target_fps):
-    """Convert video FPS while maintaining original speed"""
+def frame_range(original_fps, total_frames, start_time=0.0, end_time=None):
+    """Source frames [first, last) covering start_time..end_time seconds, clamped to the video"""
+    first = min(max(0, int(round(start_time * original_fps))), total_frames)
+    last = total_frames if end_time is None else min(total_frames, int(math.ceil(end_time * original_fps)))
+    return first, max(first, last)
+
+def convert_video_fps(input_path, output_path, target_fps, start_time=0.0, end_time=None):
+    """
+    Convert video FPS while maintaining original speed.
+
+    Only start_time..end_time seconds of the source are converted: the capture seeks once to
+    the in point and no frame past the out point is decoded.
+    """
     cap = cv2.VideoCapture(input_path)
     original_fps = cap.get(cv2.CAP_PROP_FPS)
-    total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+    first_frame, last_frame = frame_range(original_fps, int(cap.get(cv2.CAP_PROP_FRAME_COUNT)), start_time, end_time)
+    if first_frame:
+        cap.set(cv2.CAP_PROP_POS_FRAMES, first_frame)
+    total_frames = last_frame - first_frame
     duration = total_frames / original_fps
     
     target_total_frames = int(duration * target_fps)
@@ -32,7 +47,7 @@ def convert_video_fps(input_path, output_path, target_fps):
             ret, frame_buffer = cap.read()
             next_frame_idx += 1
             
-        if frame_buffer is None:
+        if frame_buffer is None and next_frame_idx < total_frames:
             ret, frame_buffer = cap.read()
             next_frame_idx += 1
             
@@ -43,7 +58,7 @@ def convert_video_fps(input_path, output_path, target_fps):
     out.release()
     return output_path
 
-def process_video_fps(file_path, target_fps, temp_folder):
+def process_video_fps(file_path, target_fps, temp_folder, start_time=0.0, end_time=None):
     os.makedirs(temp_folder, exist_ok=True)
     converted_video_path = os.path.join(temp_folder, "converted_fps.mp4")
-    return convert_video_fps(file_path, converted_video_path, target_fps)
\ No newline at end of file
+    return convert_video_fps(file_path, converted_video_path, target_fps, start_time, end_time)
\ No newline at end of file
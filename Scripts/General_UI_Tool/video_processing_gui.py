@@ -10,11 +10,15 @@ from PyQt5.QtCore import Qt, pyqtSignal, QThread, QSize, QTimer
 from PyQt5.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QLabel, QLineEdit, 
                              QPushButton, QProgressBar, QMessageBox, QFileDialog, 
                              QApplication, QSlider, QFrame, QDialog, 
-                             QDialogButtonBox, QScrollArea, QGridLayout, QTabWidget)
+                             QDialogButtonBox, QScrollArea, QGridLayout, QTabWidget, QCheckBox)
 from PyQt5.QtGui import QImage, QPixmap, QPainter
 
 # --- Assumed API Import ---
-from General_UI_Tool.find_hashes import find_dds_hashes
+from General_UI_Tool.bcn_decoder import load_image, image_size
+from General_UI_Tool.find_hashes import find_dds_textures
+from General_UI_Tool.thumbnail_grid import ThumbnailGrid, texture_tooltip
+from General_UI_Tool.loop_detection import SEAMLESS_COST, video_thumbnails, propose_loop, describe_proposal
+from General_UI_Tool.resampling import resize, pick_backend_for
 
 # --- Assumed Tool Imports ---
 from General_UI_Tool.video_fps_converter import process_video_fps
@@ -36,29 +40,6 @@ def apply_effects_numpy(np_image, corner_radius_percent, frame_opacity_percent):
     processed_image[:, :, 3] = (processed_image[:, :, 3] * opacity).astype(np.uint8)
     return processed_image
 
-class ThumbnailLabel(QLabel):
-    clicked = pyqtSignal()
-    # Define theme-specific selection colors
-    selection_color_light = "dodgerblue"
-    selection_color_dark = "#00cec9"  # Teal color from main.py dark theme
-
-    def __init__(self, parent=None, theme='dark'):
-        super().__init__(parent)
-        self.theme = theme
-        self.setCursor(Qt.PointingHandCursor)
-        self.setStyleSheet("border: 2px solid transparent; padding: 1px;")
-
-    def mousePressEvent(self, event):
-        self.clicked.emit()
-
-    def set_selected(self, is_selected):
-        # Use the appropriate color based on the current theme
-        if self.theme == 'dark':
-            color = self.selection_color_dark if is_selected else "transparent"
-        else:
-            color = self.selection_color_light if is_selected else "transparent"
-        self.setStyleSheet(f"border: 2px solid {color}; padding: 1px;")
-
 class TemplateSelectionDialog(QDialog):
     def __init__(self, parent=None, theme='dark'):
         super().__init__(parent)
@@ -66,7 +47,6 @@ class TemplateSelectionDialog(QDialog):
         self.setWindowTitle("Select Template")
         self.setMinimumSize(700, 600)
         self.selected_path = None
-        self.thumbnail_widgets = []
         
         main_layout = QVBoxLayout(self)
         
@@ -202,57 +182,34 @@ class TemplateSelectionDialog(QDialog):
         return self.selected_path
 
     def _create_thumbnail_grid_widget(self):
-        scroll_area = QScrollArea()
-        scroll_area.setWidgetResizable(True)
-        grid_container = QWidget()
-        grid_layout = QGridLayout(grid_container)
-        grid_layout.setSpacing(10)
-        scroll_area.setWidget(grid_container)
-        return scroll_area, grid_layout
+        grid = ThumbnailGrid(theme=self.theme)
+        grid.setSpacing(10)
+        grid.path_selected.connect(self._on_thumbnail_selected)
+        grid.path_activated.connect(self._on_thumbnail_activated)
+        return grid
 
-    def _populate_grid(self, grid_layout, paths):
-        while grid_layout.count():
-            child = grid_layout.takeAt(0)
-            if child.widget():
-                child.widget().deleteLater()
-        self.thumbnail_widgets.clear()
-        THUMBNAIL_SIZE = QSize(128, 128)
-        num_columns = 4
-        for i, path in enumerate(paths):
-            row, col = divmod(i, num_columns)
-            try:
-                img_data = imageio.imread(path)
-                h, w, ch = img_data.shape
-                fmt = QImage.Format_RGBA8888 if ch == 4 else QImage.Format_RGB888
-                q_img = QImage(img_data.data, w, h, ch * w, fmt)
-                pixmap = QPixmap.fromImage(q_img).scaled(THUMBNAIL_SIZE, Qt.KeepAspectRatio, Qt.SmoothTransformation)
-                thumb = ThumbnailLabel(theme=self.theme)  # Pass theme to thumbnail
-                thumb.setPixmap(pixmap)
-                thumb.setFixedSize(THUMBNAIL_SIZE)
-                thumb.setAlignment(Qt.AlignCenter)
-                thumb.setProperty("file_path", path)
-                thumb.clicked.connect(self._on_thumbnail_clicked)
-                self.thumbnail_widgets.append(thumb)
-                grid_layout.addWidget(thumb, row, col)
-            except Exception as e:
-                print(f"Could not create thumbnail for {path}: {e}")
+    def _on_thumbnail_selected(self, path):
+        self.selected_path = path
+
+    def _on_thumbnail_activated(self, path):
+        self.selected_path = path
+        self.accept()
 
-    def _on_thumbnail_clicked(self):
-        clicked_widget = self.sender()
-        self.selected_path = clicked_widget.property("file_path")
-        for widget in self.thumbnail_widgets:
-            widget.set_selected(widget == clicked_widget)
+    def done(self, result):
+        self.recent_grid.shutdown()
+        self.dds_grid.shutdown()
+        super().done(result)
 
     def _create_recent_tab(self):
         widget = QWidget()
         layout = QVBoxLayout(widget)
-        scroll_area, grid_layout = self._create_thumbnail_grid_widget()
-        layout.addWidget(scroll_area)
+        self.recent_grid = self._create_thumbnail_grid_widget()
+        layout.addWidget(self.recent_grid)
         templates_dir = os.path.join(os.getcwd(), "templates")
         if os.path.exists(templates_dir):
-            paths = [os.path.join(templates_dir, f) for f in os.listdir(templates_dir)]
+            paths = sorted(os.path.join(templates_dir, f) for f in os.listdir(templates_dir))
             if paths:
-                self._populate_grid(grid_layout, paths)
+                self.recent_grid.set_paths(paths)
             else:
                 layout.addWidget(QLabel("No recent templates found. Load a new template to save it here."))
         else:
@@ -263,20 +220,20 @@ class TemplateSelectionDialog(QDialog):
         widget = QWidget()
         layout = QVBoxLayout(widget)
         browse_button = QPushButton("Browse for Folder Containing DDS Files...")
-        scroll_area, self.dds_grid_layout = self._create_thumbnail_grid_widget()
+        self.dds_grid = self._create_thumbnail_grid_widget()
         layout.addWidget(browse_button)
-        layout.addWidget(scroll_area)
+        layout.addWidget(self.dds_grid)
         browse_button.clicked.connect(self._search_for_dds)
         return widget
 
     def _search_for_dds(self):
         folder_path = QFileDialog.getExistingDirectory(self, "Select Folder")
         if folder_path:
-            _, paths = find_dds_hashes(folder_path)
-            if not paths:
+            textures = find_dds_textures(folder_path)
+            if not textures:
                 QMessageBox.information(self, "Not Found", "No viewable DDS files found.")
             else:
-                self._populate_grid(self.dds_grid_layout, paths)
+                self.dds_grid.set_paths([t['path'] for t in textures], [texture_tooltip(t) for t in textures])
 
     def _create_browse_file_tab(self):
         widget = QWidget()
@@ -305,16 +262,16 @@ class TemplateSelectionDialog(QDialog):
 
 class ProcessingThread(QThread):
     update_progress = pyqtSignal(int); update_status = pyqtSignal(str); processing_complete = pyqtSignal(str)
-    def __init__(self, media_path, target_fps, segment_length, corner_roundness, transparency, is_static_image, template_path=None):
+    def __init__(self, media_path, target_fps, segment_length, corner_roundness, transparency, is_static_image, template_path=None, trim_loop=False, in_point=0.0, out_point=None):
         super().__init__()
         self.media_path = media_path; self.target_fps = target_fps; self.segment_length = segment_length
         self.corner_roundness = corner_roundness; self.transparency = transparency; self.is_static_image = is_static_image
-        self.template_path = template_path; self.template_dims = None
+        self.template_path = template_path; self.template_dims = None; self.trim_loop = trim_loop
+        self.in_point = in_point; self.out_point = out_point  # seconds of the source to process; None runs to the end
     def run(self):
         if self.template_path:
             try:
-                template_data = imageio.imread(self.template_path)
-                self.template_dims = (template_data.shape[1], template_data.shape[0])
+                self.template_dims = image_size(self.template_path)
             except Exception as e: print(f"Worker thread could not read template: {e}")
         if self.is_static_image: self.process_image()
         else: self.process_video()
@@ -329,7 +286,7 @@ class ProcessingThread(QThread):
             if self.template_dims:
                 h, w = image_data.shape[:2]; th, tw = self.template_dims[1], self.template_dims[0]
                 new_h = int(w * th / tw)
-                image_data = cv2.resize(image_data, (w, new_h), interpolation=cv2.INTER_LANCZOS4)
+                image_data = resize(image_data, (w, new_h), 'cv2-lanczos')
             processed_image = apply_effects_numpy(image_data, float(self.corner_roundness), float(self.transparency))
             out_path = os.path.join(out_folder, f"{filename}_frame_0001.png")
             cv2.imwrite(out_path, processed_image)
@@ -340,28 +297,45 @@ class ProcessingThread(QThread):
         try:
             self.update_status.emit("Converting FPS..."); self.update_progress.emit(0)
             if os.path.exists(temp_folder): shutil.rmtree(temp_folder)
-            converted_video = process_video_fps(self.media_path, int(self.target_fps), temp_folder)
+            converted_video = process_video_fps(self.media_path, int(self.target_fps), temp_folder, self.in_point, self.out_point)
             self.update_progress.emit(25)
             self.update_status.emit("Segmenting video...")
             segment_folder = os.path.join(temp_folder, "video_segments")
             segment_count = segment_video(converted_video, float(self.segment_length), segment_folder)
             self.update_progress.emit(50)
+            segments = sorted([os.path.join(segment_folder, f) for f in os.listdir(segment_folder)])
+            # Only frames first..last-1 are resized, processed and written
+            first, last, loop_note = 0, None, ""
+            if self.trim_loop:
+                self.update_status.emit("Finding loop point...")
+                proposal = propose_loop(np.concatenate([video_thumbnails(seg_path) for seg_path in segments]))
+                if proposal is None:
+                    loop_note = "\nLoop: clip too short to trim"
+                elif proposal['cost'] <= SEAMLESS_COST:
+                    first, last = proposal['start'], proposal['end']
+                    loop_note = f"\n{describe_proposal(proposal, float(self.target_fps))}"
+                else:
+                    loop_note = f"\nNo seamless loop found, kept every frame ({describe_proposal(proposal, float(self.target_fps))})"
             filename = os.path.splitext(os.path.basename(self.media_path))[0]
             out_folder = os.path.join(os.getcwd(), "extracted_frames", filename)
             if os.path.exists(out_folder): shutil.rmtree(out_folder)
             os.makedirs(out_folder, exist_ok=True)
             self.update_status.emit("Extracting & processing frames...")
-            total_frames = 0
-            segments = sorted([os.path.join(segment_folder, f) for f in os.listdir(segment_folder)])
+            total_frames = 0; source_frame = 0; resampler = None
             for i, seg_path in enumerate(segments):
+                if last is not None and source_frame >= last: break
                 cap = cv2.VideoCapture(seg_path)
                 while True:
                     ret, frame = cap.read()
                     if not ret: break
+                    source_frame += 1
+                    if source_frame <= first: continue
+                    if last is not None and source_frame > last: break
                     if self.template_dims:
                         h, w = frame.shape[:2]; th, tw = self.template_dims[1], self.template_dims[0]
                         new_h = int(w * th / tw)
-                        frame = cv2.resize(frame, (w, new_h), interpolation=cv2.INTER_LANCZOS4)
+                        resampler = resampler or pick_backend_for((w, h), (w, new_h))
+                        frame = resize(frame, (w, new_h), resampler)
                     processed = apply_effects_numpy(frame, float(self.corner_roundness), float(self.transparency))
                     out_path = os.path.join(out_folder, f"{filename}_frame_{total_frames + 1:04d}.png")
                     cv2.imwrite(out_path, processed)
@@ -370,7 +344,7 @@ class ProcessingThread(QThread):
                 self.update_progress.emit(50 + int(40 * (i + 1) / len(segments)))
             self.update_status.emit("Cleaning up..."); self.update_progress.emit(90); shutil.rmtree(temp_folder)
             self.update_progress.emit(100)
-            self.processing_complete.emit(f"Processing complete!\nSegments: {segment_count}\nFrames: {total_frames}\nOutput: {out_folder}")
+            self.processing_complete.emit(f"Processing complete!\nSegments: {segment_count}\nFrames: {total_frames}{loop_note}\nOutput: {out_folder}")
         except Exception as e:
             self.processing_complete.emit(f"An error occurred: {str(e)}")
             if os.path.exists(temp_folder): shutil.rmtree(temp_folder)
@@ -402,7 +376,13 @@ class VideoProcessingWidget(QWidget):
         settings_layout = QHBoxLayout()
         fps_layout = QVBoxLayout(); fps_layout.addWidget(QLabel("Target FPS (Live Preview):")); self.target_fps = QLineEdit("30"); fps_layout.addWidget(self.target_fps)
         segment_layout = QVBoxLayout(); segment_layout.addWidget(QLabel("Segment Length (s):")); self.segment_length = QLineEdit("10"); segment_layout.addWidget(self.segment_length)
-        settings_layout.addLayout(fps_layout); settings_layout.addLayout(segment_layout); main_layout.addLayout(settings_layout); main_layout.addWidget(self._create_separator())
+        settings_layout.addLayout(fps_layout); settings_layout.addLayout(segment_layout); main_layout.addLayout(settings_layout)
+        range_layout = QHBoxLayout()
+        in_layout = QVBoxLayout(); in_layout.addWidget(QLabel("In Point (s):")); self.in_point = QLineEdit("0"); in_layout.addWidget(self.in_point)
+        out_layout = QVBoxLayout(); out_layout.addWidget(QLabel("Out Point (s):")); self.out_point = QLineEdit(); self.out_point.setPlaceholderText("End of clip"); out_layout.addWidget(self.out_point)
+        self.set_in_button = QPushButton("Set In at Preview"); self.set_out_button = QPushButton("Set Out at Preview")
+        range_layout.addLayout(in_layout); range_layout.addLayout(out_layout); range_layout.addWidget(self.set_in_button, 0, Qt.AlignBottom); range_layout.addWidget(self.set_out_button, 0, Qt.AlignBottom); main_layout.addLayout(range_layout)
+        self.trim_loop = QCheckBox("Trim to seamless loop (keeps only the shortest span that loops without a visible jump)"); main_layout.addWidget(self.trim_loop); main_layout.addWidget(self._create_separator())
         main_layout.addWidget(QLabel("Step 4: Select Template for Comparison"))
         self.select_template_button = QPushButton("Select Template...")
         main_layout.addWidget(self.select_template_button)
@@ -421,6 +401,7 @@ class VideoProcessingWidget(QWidget):
         self.browse_media_button.clicked.connect(self.browse_media)
         self.select_template_button.clicked.connect(self.show_template_dialog)
         self.process_button.clicked.connect(self.start_processing)
+        self.set_in_button.clicked.connect(lambda: self.set_range_point(self.in_point)); self.set_out_button.clicked.connect(lambda: self.set_range_point(self.out_point))
         self.target_fps.textChanged.connect(self.update_playback_speed)
         self.transparency_slider.valueChanged.connect(self.on_visual_settings_changed)
         self.corner_roundness.textChanged.connect(self.on_visual_settings_changed)
@@ -431,7 +412,7 @@ class VideoProcessingWidget(QWidget):
         filter = "All Media (*.mp4 *.mkv *.gif *.png *.jpg *.jpeg *.bmp *.dds);;Videos (*.mp4 *.mkv);;GIFs (*.gif);;Images (*.png *.jpg *.jpeg *.bmp *.dds)"
         path, _ = QFileDialog.getOpenFileName(self, "Select Media", "", filter)
         if not path: return
-        self.media_path.setText(path); self.timer.stop()
+        self.media_path.setText(path); self.timer.stop(); self.in_point.setText("0"); self.out_point.clear()
         if self.video_capture: self.video_capture.release(); self.video_capture = None
         self.gif_frames.clear(); self.is_gif = self.input_is_static_image = False
         ext = os.path.splitext(path)[1].lower()
@@ -481,11 +462,9 @@ class VideoProcessingWidget(QWidget):
             dest_path = os.path.join(templates_dir, os.path.basename(image_path))
             if not os.path.abspath(image_path) == os.path.abspath(dest_path):
                 shutil.copy2(image_path, dest_path)
-            image_data = imageio.imread(image_path)
-            if image_data.ndim == 2: image_data = imageio.core.util.grayscale_to_rgb(image_data)
+            image_data = np.ascontiguousarray(load_image(image_path))
             h, w, ch = image_data.shape
-            fmt = QImage.Format_RGBA8888 if ch == 4 else QImage.Format_RGB888
-            q_image = QImage(image_data.data, w, h, ch * w, fmt)
+            q_image = QImage(image_data.data, w, h, ch * w, QImage.Format_RGBA8888)
             self.template_pixmap = QPixmap.fromImage(q_image)
             self.template_path = image_path
             self.transparency_slider.setEnabled(True)
@@ -493,7 +472,7 @@ class VideoProcessingWidget(QWidget):
             self.resize_preview_container(); self.update_preview_from_settings()
         except Exception as e:
             self.template_path = None
-            QMessageBox.critical(self, "Error", f"Could not load template image:\n{e}\n\nNote: For DDS support, run: pip install imageio[freeimage]")
+            QMessageBox.critical(self, "Error", f"Could not load template image:\n{e}")
 
     def on_visual_settings_changed(self): self.debounce_timer.start(100)
     def update_preview_from_settings(self):
@@ -556,7 +535,7 @@ class VideoProcessingWidget(QWidget):
     def start_processing(self):
         if not self.validate_inputs(): return
         self.set_controls_enabled(False)
-        self.thread = ProcessingThread(media_path=self.media_path.text(), target_fps=self.target_fps.text(), segment_length=self.segment_length.text(), corner_roundness=self.corner_roundness.text(), transparency=self.transparency.text(), is_static_image=(self.input_is_static_image), template_path=self.template_path)
+        self.thread = ProcessingThread(media_path=self.media_path.text(), target_fps=self.target_fps.text(), segment_length=self.segment_length.text(), corner_roundness=self.corner_roundness.text(), transparency=self.transparency.text(), is_static_image=(self.input_is_static_image), template_path=self.template_path, trim_loop=self.trim_loop.isChecked(), in_point=self.range_points[0], out_point=self.range_points[1])
         self.thread.update_progress.connect(self.progress.setValue); self.thread.update_status.connect(self.status_label.setText); self.thread.processing_complete.connect(self.on_processing_complete); self.thread.start()
     def on_processing_complete(self, message):
         (QMessageBox.critical if "error" in message.lower() else QMessageBox.information)(self, "Status", message)
@@ -565,12 +544,23 @@ class VideoProcessingWidget(QWidget):
         widgets = [self.browse_media_button, self.select_template_button, self.media_path, self.corner_roundness, self.transparency, self.process_button]
         for w in widgets: w.setEnabled(enabled)
         is_anim = enabled and (self.is_gif or (self.video_capture is not None and not self.input_is_static_image))
-        self.target_fps.setEnabled(is_anim); self.segment_length.setEnabled(is_anim)
+        self.target_fps.setEnabled(is_anim); self.segment_length.setEnabled(is_anim); self.trim_loop.setEnabled(is_anim)
+        for w in [self.in_point, self.out_point, self.set_in_button, self.set_out_button]: w.setEnabled(is_anim)
         self.transparency_slider.setEnabled(enabled and self.template_pixmap is not None)
     def validate_inputs(self):
         if not self.media_path.text() or not os.path.exists(self.media_path.text()):
             QMessageBox.warning(self, "Input Error", "Please select a valid input media file."); return False
+        try:
+            in_point = float(self.in_point.text() or 0); out_point = float(self.out_point.text()) if self.out_point.text().strip() else None
+        except ValueError:
+            QMessageBox.warning(self, "Input Error", "In and out points must be numbers of seconds."); return False
+        if in_point < 0 or (out_point is not None and out_point <= in_point):
+            QMessageBox.warning(self, "Input Error", "The out point must come after the in point, and the in point can't be negative."); return False
+        self.range_points = (in_point, out_point)
         return True
+    def set_range_point(self, field):
+        """Fill an in/out point field with the time of the frame the preview is showing."""
+        if self.total_frames > 1 and self.source_fps: field.setText(f"{self.frame_pos_counter / self.source_fps:.2f}")
     def closeEvent(self, event): self.timer.stop(); self.video_capture and self.video_capture.release(); super().closeEvent(event)
 
 if __name__ == '__main__':
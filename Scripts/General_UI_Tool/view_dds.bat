@@ -1 +1 @@
-python dds-viewer.py
\ No newline at end of file
+python dds-viewer.py %*
\ No newline at end of file
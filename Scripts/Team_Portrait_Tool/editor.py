@@ -9,6 +9,9 @@ from PyQt5.QtGui import QImage, QPixmap, QCursor
 from PyQt5.QtCore import Qt, QTimer, QEvent # Import QEvent
 from PIL import Image, ImageEnhance
 
+from General_UI_Tool.loop_detection import thumbnails, video_thumbnails, propose_loop, describe_proposal
+from General_UI_Tool.resampling import resize
+
 # --- Configuration ---
 TEMPLATE_FILENAME = "templates/team_portrait.png" # Use a constant for the template name
 
@@ -69,6 +72,8 @@ class VideoProcessor(QWidget):
         self.playing_forward = True
         self.video_frame_index = 0
         self.video_frame_count = 0
+        self.video_first_frame = 0 # Start of the video's kept span once trimmed to a loop
+        self.video_trimmed = False # Set once Find Loop trims the video to video_frame_count frames
 
         # --- Initialize UI ---
         self.initUI()
@@ -155,6 +160,11 @@ class VideoProcessor(QWidget):
         top_controls_layout = QHBoxLayout()
         top_controls_layout.addStretch(1) # Pushes remaining buttons to the right
 
+        # Loop Detection Button
+        find_loop_button = QPushButton("Find Loop")
+        find_loop_button.clicked.connect(self.find_loop_point)
+        top_controls_layout.addWidget(find_loop_button)
+
         # Loop Toggle Button
         self.loop_button = QPushButton("Loop Disabled")
         self.loop_button.setCheckable(True)
@@ -342,6 +352,8 @@ class VideoProcessor(QWidget):
                     # --- MODIFIED: Get video info for looping ---
                     self.video_frame_count = int(self.cap.get(cv2.CAP_PROP_FRAME_COUNT))
                     self.video_frame_index = 0
+                    self.video_first_frame = 0
+                    self.video_trimmed = False
                     self.playing_forward = True
 
                     fps = self.cap.get(cv2.CAP_PROP_FPS)
@@ -399,6 +411,8 @@ class VideoProcessor(QWidget):
         self.playing_forward = True
         self.video_frame_index = 0
         self.video_frame_count = 0
+        self.video_first_frame = 0
+        self.video_trimmed = False
         
         self.top_spinbox.setValue(0)
         self.bottom_spinbox.setValue(0)
@@ -508,7 +522,7 @@ class VideoProcessor(QWidget):
             elif self.cap and self.cap.isOpened():
                 if self.video_frame_count <= 0: return # Can't loop without frame count
 
-                self.cap.set(cv2.CAP_PROP_POS_FRAMES, self.video_frame_index)
+                self.cap.set(cv2.CAP_PROP_POS_FRAMES, self.video_first_frame + self.video_frame_index)
                 ret, frame = self.cap.read()
                 if not ret:
                     self.timer.stop()
@@ -567,7 +581,7 @@ class VideoProcessor(QWidget):
                      processed_core_frame = input_frame
                 if processed_core_frame.shape[:2] != self.template_cv.shape[:2]:
                      target_h, target_w = self.template_cv.shape[:2]
-                     processed_core_frame = cv2.resize(processed_core_frame, (target_w, target_h), interpolation=cv2.INTER_AREA)
+                     processed_core_frame = resize(processed_core_frame, (target_w, target_h), 'cv2-area')
 
             if len(processed_core_frame.shape) == 2:
                  processed_core_frame = cv2.cvtColor(processed_core_frame, cv2.COLOR_GRAY2BGR)
@@ -729,7 +743,7 @@ class VideoProcessor(QWidget):
                 fps = self.cap.get(cv2.CAP_PROP_FPS)
                 if fps <= 0: fps = 30
 
-                self.cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
+                self.cap.set(cv2.CAP_PROP_POS_FRAMES, self.video_first_frame)
                 ret, first_frame = self.cap.read()
                 if not ret: raise RuntimeError("Cannot read first frame of video.")
 
@@ -755,11 +769,14 @@ class VideoProcessor(QWidget):
 
                 # --- MODIFIED: Save logic for looped videos ---
                 all_processed_frames = []
-                self.cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
+                self.cap.set(cv2.CAP_PROP_POS_FRAMES, self.video_first_frame)
                 print("Processing all video frames for saving...")
-                while True:
+                # The reported frame count can be off, so untrimmed videos are read to the end
+                frames_read = 0
+                while not self.video_trimmed or frames_read < self.video_frame_count:
                     ret, frame = self.cap.read()
                     if not ret: break
+                    frames_read += 1
                     processed_frame = self.apply_core_processing(frame.copy())
                     if processed_frame is not None:
                         if processed_frame.shape[0] != height or processed_frame.shape[1] != width:
@@ -832,8 +849,7 @@ class VideoProcessor(QWidget):
 
             # 2. Resize to Template Dimensions
             target_h, target_w = self.template_cv.shape[:2]
-            interpolation = cv2.INTER_AREA
-            processed_frame = cv2.resize(processed_frame, (target_w, target_h), interpolation=interpolation)
+            processed_frame = resize(processed_frame, (target_w, target_h), 'cv2-area')
 
 
             # 3. Apply Adjustments (using PIL for better quality enhancers)
@@ -889,6 +905,48 @@ class VideoProcessor(QWidget):
 
 
     # --- Other Methods ---
+    def find_loop_point(self):
+        """Proposes the shortest seamless loop (or ping-pong span) of the clip and trims to it if accepted."""
+        if not ((self.is_gif and len(self.gif_frames) > 1) or (self.cap and self.cap.isOpened() and self.video_frame_count > 1)):
+            QMessageBox.warning(self, "No Animation", "Please load a GIF or video first by clicking the display area.")
+            return
+
+        try:
+            QApplication.setOverrideCursor(Qt.WaitCursor)
+            if self.is_gif:
+                vectors = thumbnails(self.gif_frames)
+            else:
+                # Read on a separate capture so playback keeps its position
+                vectors = video_thumbnails(self.media_path)
+                if self.video_trimmed:
+                    vectors = vectors[self.video_first_frame:self.video_first_frame + self.video_frame_count]
+            proposal = propose_loop(vectors, allow_ping_pong=True)
+        finally:
+            QApplication.restoreOverrideCursor()
+
+        if proposal is None:
+            QMessageBox.information(self, "Find Loop", "The clip is too short to trim to a loop.")
+            return
+        kept = proposal['end'] - proposal['start']
+        answer = QMessageBox.question(self, "Find Loop",
+                                      f"{describe_proposal(proposal)}.\n\n"
+                                      f"Trim the clip to these {kept} of {proposal['frames']} frames?",
+                                      QMessageBox.Yes | QMessageBox.No, QMessageBox.Yes)
+        if answer != QMessageBox.Yes:
+            return
+
+        # Trimming the source frames means the save only processes the loop
+        if self.is_gif:
+            self.gif_frames = self.gif_frames[proposal['start']:proposal['end']]
+            self.gif_display_index = 0
+        else:
+            self.video_first_frame += proposal['start']
+            self.video_frame_count = kept
+            self.video_trimmed = True
+            self.video_frame_index = 0
+        self.playing_forward = True
+        self.loop_button.setChecked(proposal['mode'] == 'ping-pong')
+
     def toggle_loop(self, checked):
         self.loop_enabled = checked
         self.loop_button.setText("Loop Enabled" if checked else "Loop Disabled")
@@ -6,8 +6,9 @@ import subprocess
 from pathlib import Path
 from concurrent.futures import ThreadPoolExecutor
 from functools import partial
+from itertools import chain
 
-from PyQt5.QtWidgets import (QApplication, QWidget, QVBoxLayout, QHBoxLayout, QLabel, QLineEdit, QPushButton, QListWidget, QListWidgetItem, QFileDialog, QSlider, QGridLayout, QSizePolicy, QFrame, QCompleter, QDialog, QDialogButtonBox, QCheckBox, QScrollArea)
+from PyQt5.QtWidgets import (QApplication, QWidget, QVBoxLayout, QHBoxLayout, QLabel, QLineEdit, QPushButton, QListWidget, QListWidgetItem, QFileDialog, QSlider, QGridLayout, QSizePolicy, QFrame, QCompleter, QDialog, QDialogButtonBox, QCheckBox, QScrollArea, QComboBox)
 from PyQt5.QtCore import Qt, QTimer, QEvent, QRect, QThread, pyqtSignal, QSize
 from PyQt5.QtGui import QPixmap, QImage, QPainter, QIcon
 
@@ -17,34 +18,20 @@ from PIL import Image, ImageSequence, ImageCms
 import cv2
 import numpy as np
 
+from General_UI_Tool.budget_planner import estimate_mod_cost, format_bytes
+from General_UI_Tool.ui_hash_registry import get_registry
+from General_UI_Tool.alpha_analysis import FORMAT_CHOICES, AUTO_FORMAT_HELP, classify_image, select_format, group_by_format
+from General_UI_Tool.frame_selection import frame_selection_lines, branch_lines
+from General_UI_Tool.frame_holds import analyze_holds, has_holds, hold_constants, hold_advance_lines
+from General_UI_Tool.ini_emitter import Section, write_ini
+from General_UI_Tool.resampling import resize, pick_backend_for
+from General_UI_Tool.shared_clock import clock_constants, clock_update, tick_condition, install_clock_ini
+
 CONFIG_FILE = "config.json"
 TEMPLATE_OPACITY = 255
 CUSTOM_STATIC_OPACITY = 255
 TEXCONV_PATH = 'General_UI_Tool/texconv.exe'
 
-# All helper functions (load_character_hashes, load_config, save_config, etc.) remain unchanged.
-def load_character_hashes(file_path):
-    hashes = {}
-    try:
-        with open(file_path, "r") as file:
-            for i, line in enumerate(file, 1):
-                line = line.strip()
-                if not line:
-                    continue
-                try:
-                    name, hash_value = line.split(" --> ")
-                    hashes[name.strip()] = hash_value.strip()
-                except ValueError:
-                    print(f"Warning: Skipping malformed line {i} in '{file_path}': '{line}'")
-                    continue
-    except FileNotFoundError:
-        print(f"Error: Character hashes file not found at '{file_path}'")
-    except Exception as e:
-        print(f"An unexpected error occurred while loading character hashes: {e}")
-    return hashes
-
-CHARACTER_HASHES = load_character_hashes("UI_Hashes.txt")
-
 def load_config():
     if os.path.exists(CONFIG_FILE):
         try:
@@ -86,6 +73,8 @@ def get_frame_count(filepath):
         return 1
 
 def save_frames_to_folder(filepath, folder_path, template_width, template_height):
+    target_size = (template_width, template_height)
+    resampler = None  # benchmarked on the first frame, see resampling.pick_backend_for
     try:
         if is_video_file(filepath):
             cap = cv2.VideoCapture(filepath)
@@ -96,7 +85,8 @@ def save_frames_to_folder(filepath, folder_path, template_width, template_height
                     break
                 frame_rgba = cv2.cvtColor(frame, cv2.COLOR_BGR2RGBA)
                 pil_frame = Image.fromarray(frame_rgba)
-                pil_frame = pil_frame.resize((template_width, template_height), Image.LANCZOS)
+                resampler = resampler or pick_backend_for(pil_frame.size, target_size)
+                pil_frame = resize(pil_frame, target_size, resampler)
                 pil_frame = pil_frame.convert("RGBA")
                 pil_frame.save(os.path.join(folder_path, f"{frame_index}.png"))
                 frame_index += 1
@@ -106,7 +96,8 @@ def save_frames_to_folder(filepath, folder_path, template_width, template_height
                 frames = ImageSequence.Iterator(img)
                 for i, frame in enumerate(frames):
                     frame_image = frame.convert('RGBA')
-                    frame_image = frame_image.resize((template_width, template_height), Image.LANCZOS)
+                    resampler = resampler or pick_backend_for(frame_image.size, target_size)
+                    frame_image = resize(frame_image, target_size, resampler)
                     if 'icc_profile' in frame_image.info:
                         icc_profile = frame_image.info['icc_profile']
                         srgb_profile = ImageCms.createProfile('sRGB')
@@ -116,174 +107,142 @@ def save_frames_to_folder(filepath, folder_path, template_width, template_height
     except Exception as e:
         print(f"Error saving frames to folder: {e}")
 
-def generate_frame_conditions(frame_count, item_index=0):
-    conditions = []
-    for i in range(1, frame_count):
-        conditions.append(f"else if $framevar_{item_index} == {i}")
-        conditions.append(f"    this = ResourceFrame_{item_index}_{i}")
-    return "\n".join(conditions)
+def merge_held_frames(folder_path):
+    """
+    Keep one PNG per run of near-identical frames saved by save_frames_to_folder(), renumbered
+    0..N-1, and return the runs as [(first frame index, hold count), ...] (see frame_holds).
+    """
+    frame_paths = sorted((os.path.join(folder_path, f) for f in os.listdir(folder_path) if f.endswith('.png')),
+                         key=lambda path: int(Path(path).stem))
+    spans = analyze_holds(frame_paths)
+    for kept, (first, hold) in enumerate(spans):
+        for repeat in frame_paths[first + 1:first + hold]:
+            os.remove(repeat)
+        # Runs are handled in order, so frame `kept` has already been moved or removed
+        if kept != first:
+            os.replace(frame_paths[first], os.path.join(folder_path, f"{kept}.png"))
+    return spans
+
+def merged_frame_index(spans, frame_index):
+    """Index of the merged frame that shows original frame `frame_index`."""
+    for kept, (first, hold) in enumerate(spans):
+        if frame_index < first + hold:
+            return kept
+    return len(spans) - 1
+
+def advance_lines(variable, frame_count, shared_clock=False, holds=None, frame_select='auto'):
+    """[Present] lines stepping `variable` through frames 0..frame_count-1, holding frames per `holds`."""
+    last = frame_count - 1
+    if has_holds(holds):
+        return list(hold_advance_lines(variable, last, tick_condition(shared_clock), holds, frame_select))
+    return [f"if {variable} < {last} && {tick_condition(shared_clock)}", f"    {variable} = {variable} + 1",
+            f"else if {variable} == {last}", f"    {variable} = 0", "endif"]
 
-def generate_resource_frames(char_name, hash_value, frame_count, item_index=0, is_multi=False):
-    frames = []
+def generate_frame_conditions(frame_count, item_index=0, frame_select='auto', indent=""):
+    return frame_selection_lines(f"$framevar_{item_index}", f"ResourceFrame_{item_index}_{{}}", frame_count, frame_select, indent=indent)
+
+def generate_resource_frames(char_name, hash_value, frame_count, item_index=0, is_multi=False, prefix=None):
+    if prefix is None:
+        prefix = f"ResourceFrame_{item_index}_"
     item_folder = f"/Item{item_index+1}" if is_multi else ""
-    for i in range(frame_count):
-        frames.append(f"[ResourceFrame_{item_index}_{i}]")
-        frames.append(f"filename = {hash_value} - {char_name}{item_folder}/{i}.dds")
-    return "\n".join(frames)
+    return (Section(f"{prefix}{i}", [f"filename = {hash_value} - {char_name}{item_folder}/{i}.dds"]) for i in range(frame_count))
 
-def generate_ini_file(items_data, is_multi_portrait=False):
-    if not items_data:
-        return None
-    if not is_multi_portrait:
-        item = items_data[0]
-        char_name, hash_value, frame_count = item['char_name'], item['hash_value'], item['frame_count']
-        static_toggle_enabled = item['static_toggle_enabled']
-        static_frame_index = item['static_frame_index']
-        custom_static_image_path = item['custom_static_image_path']
-        resource_frames_str = generate_resource_frames(char_name, hash_value, frame_count)
-        if not static_toggle_enabled or frame_count <= 1:
-            template = f"""[Constants]
-global $framevar = 0
-global $active
-global $fpsvar = 0
-global $speedtoggle
-[Present]
-post $active = 0
-if $active == 1 && $fpsvar < 60
-    $fpsvar = $fpsvar + 24
-    $speedtoggle = 0
-endif
-if $fpsvar >= 60
-    $fpsvar = $fpsvar - 60
-    $speedtoggle = 1
-endif
-if $framevar < {frame_count - 1} && $speedtoggle == 1
-    $framevar = $framevar + 1
-else if $framevar == {frame_count - 1}
-    $framevar = 0
-endif
-[TextureOverrideFrame]
-hash = {hash_value}
-run = CommandlistFrame
-$active = 1
-[CommandlistFrame]
-if $framevar == 0
-    this = ResourceFrame_0_0
-{generate_frame_conditions(frame_count).replace('$framevar_0', '$framevar').replace('ResourceFrame_0_', 'ResourceFrame')}
-endif
-{resource_frames_str.replace('ResourceFrame_0_', 'ResourceFrame')}
-"""
-        else:
-            static_resource_section = ""
-            command_list_static_line = ""
-            if custom_static_image_path:
-                command_list_static_line = "    this = ResourceStaticThumbnail"
-                static_resource_section = f"""
-[ResourceStaticThumbnail]
-filename = {hash_value} - {char_name}/static_thumbnail.dds"""
-            else:
-                command_list_static_line = f"    this = ResourceFrame_0_{static_frame_index}"
-            template = f"""[Constants]
-global $framevar = 0
-global $active
-global $fpsvar = 0
-global $speedtoggle
-global $is_paused = 0
-global $show_static = 0
-[KeyPause]
-key = p
-type = cycle
-$is_paused = 0, 1
-condition = $active == 1
-[KeyStatic]
-key = o
-type = cycle
-$show_static = 0, 1
-condition = $active == 1
-[Present]
-post $active = 0
-if $is_paused == 0 && $show_static == 0
-    if $active == 1 && $fpsvar < 60
-        $fpsvar = $fpsvar + 24
-        $speedtoggle = 0
-    endif
-    if $fpsvar >= 60
-        $fpsvar = $fpsvar - 60
-        $speedtoggle = 1
-    endif
-    if $framevar < {frame_count - 1} && $speedtoggle == 1
-        $framevar = $framevar + 1
-    else if $framevar == {frame_count - 1}
-        $framevar = 0
-    endif
-endif
-[TextureOverrideFrame]
-hash = {hash_value}
-run = CommandlistFrame
-$active = 1
-[CommandlistFrame]
-if $show_static == 1
-{command_list_static_line}
-else if $framevar == 0
-    this = ResourceFrame_0_0
-{generate_frame_conditions(frame_count).replace('$framevar_0', '$framevar')}
-endif
-{resource_frames_str}{static_resource_section}
-"""
-    else:
-        num_items = len(items_data)
-        valid_indices = list(range(num_items))
-        constants = ["[Constants]", f"global $portrait_idx = {valid_indices[0]}"]
-        constants.extend(["global $is_paused = 0", "global $show_static = 0"])
-        for i in range(num_items):
-            constants.extend([f"global $framevar_{i} = 0", f"global $active_{i}", f"global $fpsvar_{i} = 0", f"global $speedtoggle_{i}"])
-        key_bindings = ["[KeySwitchRight]", "key = right", "type = cycle", f"$portrait_idx = {','.join(map(str, valid_indices))}", "\n[KeySwitchLeft]", "key = left", "type = cycle", f"$portrait_idx = {','.join(map(str, reversed(valid_indices)))}", "\n[KeyPause]", "key = p", "type = cycle", "$is_paused = 0, 1", "\n[KeyStatic]", "key = o", "type = cycle", "$show_static = 0, 1"]
-        present_section = ["[Present]"]
-        for i, item in enumerate(items_data):
-            present_section.append(f"post $active_{i} = 0")
-            if item['frame_count'] > 1:
-                present_section.append(f"if $is_paused == 0 && $show_static == 0")
-                present_section.append(f"    if $active_{i} == 1 && $fpsvar_{i} < 60\n        $fpsvar_{i} = $fpsvar_{i} + 24\n        $speedtoggle_{i} = 0\n    endif")
-                present_section.append(f"    if $fpsvar_{i} >= 60\n        $fpsvar_{i} = $fpsvar_{i} - 60\n        $speedtoggle_{i} = 1\n    endif")
-                present_section.append(f"    if $framevar_{i} < {item['frame_count'] - 1} && $speedtoggle_{i} == 1\n        $framevar_{i} = $framevar_{i} + 1\n    else if $framevar_{i} == {item['frame_count'] - 1}\n        $framevar_{i} = 0\n    endif")
-                present_section.append("endif")
-        main_hash = items_data[0]['hash_value']
-        texture_override = ["[TextureOverrideFrame]", f"hash = {main_hash}", "run = CommandlistFrame"]
-        command_list = ["[CommandlistFrame]"]
+def write_single_portrait_ini(writer, item, frame_select='auto', shared_clock=False):
+    char_name, hash_value, frame_count = item['char_name'], item['hash_value'], item['frame_count']
+    holds = item.get('holds')
+    advance = advance_lines('$framevar', frame_count, shared_clock, holds, frame_select)
+    texture_override = Section("TextureOverrideFrame", [f"hash = {hash_value}", "run = CommandlistFrame", "$active = 1"])
+    writer.section(Section("Constants", ["global $framevar = 0", "global $active", *(hold_constants() if has_holds(holds) else [])]))
+    writer.text(clock_constants(shared_clock))
+    if not item['static_toggle_enabled'] or frame_count <= 1:
+        writer.section(Section("Present", ["post $active = 0", *clock_update(shared_clock).splitlines(), *advance]))
+        writer.section(texture_override)
+        writer.section(Section("CommandlistFrame", frame_selection_lines('$framevar', 'ResourceFrame{}', frame_count, frame_select)))
+        writer.sections(generate_resource_frames(char_name, hash_value, frame_count, prefix="ResourceFrame"))
+        return
+    custom_static_image_path = item['custom_static_image_path']
+    static_resource = "ResourceStaticThumbnail" if custom_static_image_path else f"ResourceFrame_0_{item['static_frame_index']}"
+    writer.lines(["global $is_paused = 0", "global $show_static = 0"])
+    writer.section(Section("KeyPause", ["key = p", "type = cycle", "$is_paused = 0, 1", "condition = $active == 1"]))
+    writer.section(Section("KeyStatic", ["key = o", "type = cycle", "$show_static = 0, 1", "condition = $active == 1"]))
+    writer.section(Section("Present", ["post $active = 0", "if $is_paused == 0 && $show_static == 0",
+                                       *clock_update(shared_clock, indent="    ").splitlines(),
+                                       *(f"    {line}" for line in advance), "endif"]))
+    writer.section(texture_override)
+    writer.section(Section("CommandlistFrame", chain(
+        ["if $show_static == 1", f"    this = {static_resource}"],
+        frame_selection_lines('$framevar', 'ResourceFrame_0_{}', frame_count, frame_select, chained=True),
+        ["endif"])))
+    writer.sections(generate_resource_frames(char_name, hash_value, frame_count))
+    if custom_static_image_path:
+        writer.section(Section("ResourceStaticThumbnail", [f"filename = {hash_value} - {char_name}/static_thumbnail.dds"]))
+
+def write_multi_portrait_ini(writer, items_data, frame_select='auto', shared_clock=False):
+    num_items = len(items_data)
+    valid_indices = list(range(num_items))
+    writer.section(Section("Constants", [f"global $portrait_idx = {valid_indices[0]}", "global $is_paused = 0", "global $show_static = 0",
+                                         "global $active", *clock_constants(shared_clock).splitlines(),
+                                         *(f"global $framevar_{i} = 0" for i in range(num_items)),
+                                         *(hold_constants() if any(has_holds(item.get('holds')) for item in items_data) else [])]))
+    writer.sections([
+        Section("KeySwitchRight", ["key = right", "type = cycle", f"$portrait_idx = {','.join(map(str, valid_indices))}"]),
+        Section("KeySwitchLeft", ["key = left", "type = cycle", f"$portrait_idx = {','.join(map(str, reversed(valid_indices)))}"]),
+        Section("KeyPause", ["key = p", "type = cycle", "$is_paused = 0, 1"]),
+        Section("KeyStatic", ["key = o", "type = cycle", "$show_static = 0, 1"])], separator=True)
+    writer.blank()
+    # One clock shared by all portraits; only the shown portrait's frame counter advances,
+    # so the per-frame cost doesn't grow with the number of portraits. Held portraits share
+    # the hold counter, which only the shown portrait advances.
+    def advance_frame(i):
+        item = items_data[i]
+        if item['frame_count'] < 2:
+            return []
+        return advance_lines(f"$framevar_{i}", item['frame_count'], shared_clock, item.get('holds'), frame_select)
+    present_section = ["post $active = 0"]
+    portrait_advance = branch_lines("$portrait_idx", num_items, advance_frame, frame_select)
+    if portrait_advance:
+        present_section.append("if $is_paused == 0 && $show_static == 0")
+        present_section.extend(clock_update(shared_clock, indent="    ").splitlines())
+        present_section.extend(f"    {line}" for line in portrait_advance)
+        present_section.append("endif")
+    writer.section(Section("Present", present_section))
+    writer.blank()
+    main_hash = items_data[0]['hash_value']
+    main_char_name = items_data[0]['char_name']
+    writer.section(Section("TextureOverrideFrame", [f"hash = {main_hash}", "run = CommandlistFrame", "$active = 1"]))
+    writer.blank()
+    def command_list():
         for i, item in enumerate(items_data):
             if_statement = "if" if i == 0 else "else if"
-            command_list.append(f"{if_statement} $portrait_idx == {i}")
-            command_list.append(f"    $active_{i} = 1")
-            command_list.append(f"    if $show_static == 1")
+            yield f"{if_statement} $portrait_idx == {i}"
+            yield "    if $show_static == 1"
             if item['custom_static_image_path']:
-                command_list.append(f"        this = ResourceStaticThumbnail_{i}")
+                yield f"        this = ResourceStaticThumbnail_{i}"
             else:
                 static_frame_index = item['static_frame_index'] if item['static_toggle_enabled'] else 0
-                command_list.append(f"        this = ResourceFrame_{i}_{static_frame_index}")
-            command_list.append(f"    else")
-            command_list.append(f"        if $framevar_{i} == 0")
-            command_list.append(f"            this = ResourceFrame_{i}_0")
-            if item['frame_count'] > 1:
-                conditions = generate_frame_conditions(item['frame_count'], item_index=i)
-                indented_conditions = "\n".join([f"        {line}" for line in conditions.splitlines()])
-                command_list.append(indented_conditions)
-            command_list.append(f"        endif")
-            command_list.append(f"    endif")
-        command_list.append("endif")
-        all_resource_frames = []
-        for i, item in enumerate(items_data):
-            main_char_name = items_data[0]['char_name']
-            resources_for_item = [generate_resource_frames(main_char_name, main_hash, item['frame_count'], item_index=i, is_multi=True)]
-            if item['custom_static_image_path']:
-                item_folder = f"/Item{i+1}"
-                resources_for_item.append(f"[ResourceStaticThumbnail_{i}]")
-                resources_for_item.append(f"filename = {main_hash} - {main_char_name}{item_folder}/static_thumbnail.dds")
-            all_resource_frames.append("\n".join(resources_for_item))
-        template = "\n".join(constants) + "\n" + "\n".join(key_bindings) + "\n\n" + "\n".join(present_section) + "\n\n" + "\n".join(texture_override) + "\n\n" + "\n".join(command_list) + "\n\n" + "\n\n".join(all_resource_frames)
+                yield f"        this = ResourceFrame_{i}_{static_frame_index}"
+            yield "    else"
+            yield from generate_frame_conditions(item['frame_count'], item_index=i, frame_select=frame_select, indent="        ")
+            yield "    endif"
+        yield "endif"
+    writer.section(Section("CommandlistFrame", command_list()))
+    writer.blank()
+    for i, item in enumerate(items_data):
+        if i:
+            writer.blank()
+        writer.sections(generate_resource_frames(main_char_name, main_hash, item['frame_count'], item_index=i, is_multi=True))
+        if item['custom_static_image_path']:
+            writer.section(Section(f"ResourceStaticThumbnail_{i}", [f"filename = {main_hash} - {main_char_name}/Item{i+1}/static_thumbnail.dds"]))
+
+def generate_ini_file(items_data, is_multi_portrait=False, frame_select='auto', shared_clock=False):
+    if not items_data:
+        return None
     try:
         filename = f"{items_data[0]['char_name']}.ini"
-        with open(filename, "w") as file:
-            file.write(template)
+        if is_multi_portrait:
+            write_ini(filename, lambda writer: write_multi_portrait_ini(writer, items_data, frame_select, shared_clock), final_newline=False)
+        else:
+            write_ini(filename, lambda writer: write_single_portrait_ini(writer, items_data[0], frame_select, shared_clock))
         return filename
     except Exception as e:
         print(f"Error generating INI file: {e}")
@@ -392,10 +351,13 @@ class ImagePickerDialog(QDialog):
 
 class ConversionThread(QThread):
     finished = pyqtSignal()
-    def __init__(self, items_data, is_multi_portrait):
+    def __init__(self, items_data, is_multi_portrait, dds_format='auto', shared_clock=False, merge_holds=False):
         super().__init__()
         self.items_data = items_data
         self.is_multi_portrait = is_multi_portrait
+        self.dds_format = dds_format
+        self.shared_clock = shared_clock
+        self.merge_holds = merge_holds
     def run(self):
         if not self.items_data:
             self.finished.emit()
@@ -404,12 +366,25 @@ class ConversionThread(QThread):
             first_item = self.items_data[0]
             main_char_name = first_item['char_name']
             main_hash_value = first_item['hash_value']
-            ini_file = generate_ini_file(self.items_data, self.is_multi_portrait)
-            if not ini_file:
-                raise Exception("INI file generation failed.")
             default_folder_name = main_char_name
             folder_path = QFileDialog.getExistingDirectory(None, "Save Folder", default_folder_name)
             if folder_path:
+                # Frames are extracted before the INI is written, since merging held frames changes the frame counts
+                temp_folder_paths = []
+                for i, item_data in enumerate(self.items_data):
+                    temp_folder_path = Path(f"temp_frames_{main_char_name or 'item'}_{i}")
+                    temp_folder_path.mkdir(exist_ok=True)
+                    save_frames_to_folder(item_data['filepath'], str(temp_folder_path), item_data['template_width'], item_data['template_height'])
+                    temp_folder_paths.append(temp_folder_path)
+                    spans = merge_held_frames(str(temp_folder_path)) if self.merge_holds else None
+                    if spans:
+                        print(f"Merged {sum(hold for _, hold in spans)} frames into {len(spans)} held frames")
+                        item_data['frame_count'] = len(spans)
+                        item_data['holds'] = [hold for _, hold in spans]
+                        item_data['static_frame_index'] = merged_frame_index(spans, item_data['static_frame_index'])
+                ini_file = generate_ini_file(self.items_data, self.is_multi_portrait, shared_clock=self.shared_clock)
+                if not ini_file:
+                    raise Exception("INI file generation failed.")
                 final_char_folder = Path(folder_path) / main_char_name
                 final_char_folder.mkdir(exist_ok=True)
                 dds_container_name = f"{main_hash_value} - {main_char_name}"
@@ -417,24 +392,24 @@ class ConversionThread(QThread):
                 if dds_container_path.exists():
                     shutil.rmtree(dds_container_path)
                 dds_container_path.mkdir()
-                for i, item_data in enumerate(self.items_data):
-                    temp_folder_path = Path(f"temp_frames_{main_char_name or 'item'}_{i}")
-                    temp_folder_path.mkdir(exist_ok=True)
-                    save_frames_to_folder(item_data['filepath'], str(temp_folder_path), item_data['template_width'], item_data['template_height'])
+                for i, (item_data, temp_folder_path) in enumerate(zip(self.items_data, temp_folder_paths)):
                     item_subfolder_name = f"Item{i+1}" if self.is_multi_portrait else ""
                     dds_output_folder = dds_container_path / item_subfolder_name
                     dds_output_folder.mkdir(exist_ok=True)
-                    convert_pngs_to_dds(str(temp_folder_path), str(dds_output_folder))
+                    convert_pngs_to_dds(str(temp_folder_path), str(dds_output_folder), dds_format=self.dds_format)
                     if item_data['custom_static_image_path']:
                         convert_single_image_to_dds(
                             item_data['custom_static_image_path'],
                             str(dds_output_folder),
                             'static_thumbnail.dds',
-                            (item_data['template_width'], item_data['template_height'])
+                            (item_data['template_width'], item_data['template_height']),
+                            self.dds_format
                         )
                     if temp_folder_path.exists():
                         shutil.rmtree(temp_folder_path)
                 shutil.move(ini_file, final_char_folder / ini_file)
+                if self.shared_clock:
+                    install_clock_ini(folder_path)
                 instructions_path = final_char_folder / "instructions.txt"
                 with open(instructions_path, "w") as f:
                     if self.is_multi_portrait:
@@ -455,19 +430,19 @@ class ConversionThread(QThread):
         finally:
             self.finished.emit()
 
-def convert_single_image_to_dds(image_path, output_folder, output_filename, resize_dim):
+def convert_single_image_to_dds(image_path, output_folder, output_filename, resize_dim, dds_format='auto'):
     try:
         output_folder = Path(output_folder)
         output_folder.mkdir(parents=True, exist_ok=True)
         with Image.open(image_path) as img:
-            resized_img = img.resize(resize_dim, Image.LANCZOS).convert("RGBA")
+            resized_img = resize(img, resize_dim).convert("RGBA")
         temp_dir = Path("./temp_single_conversion")
         temp_dir.mkdir(exist_ok=True)
         temp_png_path = temp_dir / "temp_image.png"
         resized_img.save(temp_png_path)
         command = [
             TEXCONV_PATH,
-            '-f', 'BC7_UNORM',
+            '-f', select_format(classify_image(resized_img), dds_format),
             '-srgbi',
             '-o', str(output_folder),
             str(temp_png_path)
@@ -485,30 +460,35 @@ def convert_single_image_to_dds(image_path, output_folder, output_filename, resi
     except Exception as e:
         print(f"An error occurred in convert_single_image_to_dds: {e}")
 
-def convert_pngs_to_dds(input_folder, output_folder, gpu_id=1):
+def convert_pngs_to_dds(input_folder, output_folder, gpu_id=1, dds_format='auto'):
     input_folder = Path(input_folder)
     output_folder = Path(output_folder)
     output_folder.mkdir(parents=True, exist_ok=True)
     input_files = [str(p) for p in input_folder.glob('*.png')]
     if not input_files:
         return
-    command = [
-        TEXCONV_PATH,
-        '-f', 'BC7_UNORM',
-        '-srgbi',
-        '-bc', 'x',
-        '-gpu', str(gpu_id),
-        '-o', str(output_folder),
-    ] + input_files
-    try:
-        subprocess.run(command, check=True, capture_output=True, text=True)
-    except FileNotFoundError:
-        print(f"Error: Texconv executable not found at '{TEXCONV_PATH}'")
-    except subprocess.CalledProcessError as e:
-        print(f"Error during DDS conversion of {input_folder}: {e.stderr}")
+    # One texconv call per format, so opaque and 1-bit alpha frames can be written as BC1.
+    # Unreadable frames still go to texconv as BC7, which reports them like any other failure.
+    for group_format, group_files in group_by_format(input_files, dds_format, fallback='BC7_UNORM').items():
+        command = [
+            TEXCONV_PATH,
+            '-f', group_format,
+            '-srgbi',
+            '-bc', 'x',
+            '-gpu', str(gpu_id),
+            '-o', str(output_folder),
+        ] + group_files
+        try:
+            subprocess.run(command, check=True, capture_output=True, text=True)
+        except FileNotFoundError:
+            print(f"Error: Texconv executable not found at '{TEXCONV_PATH}'")
+            return
+        except subprocess.CalledProcessError as e:
+            print(f"Error during DDS conversion of {input_folder}: {e.stderr}")
 
 class ItemWidget(QFrame):
     delete_requested = pyqtSignal(QWidget)
+    media_changed = pyqtSignal()
     def __init__(self, is_deletable=False, is_main_item=False, parent=None):
         super().__init__(parent)
         self.is_main_item = is_main_item
@@ -738,7 +718,7 @@ class ItemWidget(QFrame):
             self.custom_static_image_path = filepath
             self.custom_image_label.setText(f"Custom: {os.path.basename(filepath)}")
             with Image.open(filepath) as img:
-                self.custom_static_pil_image = img.resize((self.template_width, self.template_height), Image.LANCZOS).convert("RGBA")
+                self.custom_static_pil_image = resize(img, (self.template_width, self.template_height)).convert("RGBA")
             self.static_frame_slider.setEnabled(False)
             self.static_frame_label.setEnabled(False)
             self.custom_opacity_label.show()
@@ -833,6 +813,7 @@ class ItemWidget(QFrame):
                 self.toggle_options_frame.hide()
                 self.show_image(filepath)
             self.on_toggle_changed(self.static_toggle_button.isChecked())
+            self.media_changed.emit()
         except Exception as e:
             print(f"Error loading media file {filepath}: {e}")
     def open_file(self, event):
@@ -850,7 +831,7 @@ class ItemWidget(QFrame):
         try:
             self.timer.stop()
             with Image.open(filepath) as gif_image:
-                self.source_frames = [frame.copy().convert("RGBA").resize((self.template_width, self.template_height), Image.LANCZOS) for frame in ImageSequence.Iterator(gif_image)]
+                self.source_frames = [resize(frame.copy().convert("RGBA"), (self.template_width, self.template_height)) for frame in ImageSequence.Iterator(gif_image)]
             self.source_image = None
             if self.source_frames:
                 self.current_frame_index = 0
@@ -861,7 +842,7 @@ class ItemWidget(QFrame):
         try:
             self.timer.stop()
             with Image.open(filepath) as image:
-                self.source_image = image.resize((self.template_width, self.template_height), Image.LANCZOS).convert("RGBA")
+                self.source_image = resize(image, (self.template_width, self.template_height)).convert("RGBA")
             self.source_frames = []
             self._update_preview()
         except Exception as e:
@@ -877,7 +858,7 @@ class ItemWidget(QFrame):
                 ret, frame = cap.read()
                 if not ret: break
                 frame_rgba = cv2.cvtColor(frame, cv2.COLOR_BGR2RGBA)
-                self.source_frames.append(Image.fromarray(frame_rgba).resize((self.template_width, self.template_height), Image.LANCZOS))
+                self.source_frames.append(resize(Image.fromarray(frame_rgba), (self.template_width, self.template_height)))
             cap.release()
             self.source_image = None
             if self.source_frames:
@@ -920,7 +901,7 @@ class ItemWidget(QFrame):
             if not input_text:
                 self.suggestion_list.hide()
                 return
-            suggestions = sorted([name for name in CHARACTER_HASHES.keys() if name.lower().startswith(input_text.lower())])
+            suggestions = get_registry().suggest(input_text)
             if suggestions:
                 self.suggestion_list.addItems(suggestions)
                 self.update_suggestion_theme()
@@ -949,7 +930,7 @@ class ItemWidget(QFrame):
         try:
             selected_name = item.text()
             self.char_name_entry.setText(selected_name)
-            self.hash_entry.setText(CHARACTER_HASHES[selected_name])
+            self.hash_entry.setText(get_registry().hash_for(selected_name) or "")
             self.suggestion_list.hide()
             self.find_and_load_character_image(selected_name)
         except Exception as e:
@@ -1019,10 +1000,27 @@ class IniMakerWidget(QWidget):
         self.sub_items_layout.setContentsMargins(0, 0, 0, 0)
         self.sub_items_layout.setSpacing(0)
         self.other_items_layout.addWidget(self.sub_items_container)
+        format_layout = QHBoxLayout()
+        format_layout.addWidget(QLabel("DDS Format:"))
+        self.format_combo = QComboBox()
+        self.format_combo.addItems(FORMAT_CHOICES)
+        self.format_combo.setToolTip(AUTO_FORMAT_HELP)
+        format_layout.addWidget(self.format_combo, 1)
+        self.shared_clock_checkbox = QCheckBox("Use shared animation clock")
+        self.shared_clock_checkbox.setToolTip("Time the animation from one clock INI shared by all mods made with it,\n"
+                                              "written next to the mod folder, instead of a private clock per mod.")
+        self.merge_holds_checkbox = QCheckBox("Merge held frames")
+        self.merge_holds_checkbox.setToolTip("Store runs of near-identical frames once and show them for longer,\n"
+                                             "cutting the number of DDS files, encode time and VRAM.")
+        self.cost_label = QLabel("Estimated Cost: -")
         self.create_button = QPushButton("Create INI File")
         self.main_layout.addWidget(self.item1)
         self.main_layout.addWidget(self.switch_portrait_toggle)
         self.main_layout.addWidget(self.other_items_group)
+        self.main_layout.addLayout(format_layout)
+        self.main_layout.addWidget(self.shared_clock_checkbox)
+        self.main_layout.addWidget(self.merge_holds_checkbox)
+        self.main_layout.addWidget(self.cost_label)
         self.main_layout.addWidget(self.create_button)
         self.other_items_group.hide()
         self.is_sub_items_visible = True
@@ -1030,10 +1028,13 @@ class IniMakerWidget(QWidget):
         self.add_item_button.clicked.connect(self.add_new_item)
         self.show_hide_button.clicked.connect(self._toggle_sub_items_visibility)
         self.create_button.clicked.connect(self.create_ini_file)
+        self.item1.media_changed.connect(self.update_cost_label)
+        self.format_combo.currentTextChanged.connect(self.update_cost_label)
 
     def add_new_item(self):
         item = ItemWidget(is_deletable=True, is_main_item=False, parent=self.sub_items_container)
         item.delete_requested.connect(self._remove_item)
+        item.media_changed.connect(self.update_cost_label)
         self.sub_items_layout.addWidget(item)
         self.item_widgets.append(item)
         if not self.is_sub_items_visible:
@@ -1047,6 +1048,7 @@ class IniMakerWidget(QWidget):
             if len(self.item_widgets) == 1:
                 self.other_items_group.hide()
                 self.switch_portrait_toggle.setChecked(False)
+            self.update_cost_label()
 
     def _toggle_multi_portrait_mode(self, checked):
         self.other_items_group.setVisible(checked)
@@ -1055,6 +1057,21 @@ class IniMakerWidget(QWidget):
                 self._remove_item(self.item_widgets[-1])
             self.item1.toggle_options_frame.setVisible(self.item1.frame_count > 1)
 
+    def update_cost_label(self):
+        # Every portrait's frames are separate [ResourceFrame] sections loaded at startup, so costs add up.
+        # 'auto' is shown at its BC7 upper bound.
+        dds_format = self.format_combo.currentText()
+        dds_format = 'BC7_UNORM' if dds_format == 'auto' else dds_format
+        costs = [estimate_mod_cost(item.frame_count, item.template_width, item.template_height, dds_format)
+                 for item in self.item_widgets if item.filepath and item.frame_count]
+        if not costs:
+            self.cost_label.setText("Estimated Cost: -")
+            return
+        frames = sum(cost['frame_count'] for cost in costs)
+        vram = sum(cost['vram_bytes'] for cost in costs)
+        load_ms = sum(cost['load_seconds'] for cost in costs) * 1000
+        self.cost_label.setText(f"Estimated Cost: {frames} frames, {format_bytes(vram)} VRAM, ~{load_ms:.0f} ms load")
+
     def _toggle_sub_items_visibility(self):
         self.is_sub_items_visible = not self.is_sub_items_visible
         self.sub_items_container.setVisible(self.is_sub_items_visible)
@@ -1083,7 +1100,8 @@ class IniMakerWidget(QWidget):
                     items_data.append(data)
             self.create_button.setEnabled(False)
             self.create_button.setText("Creating Mod...")
-            self.conversion_thread = ConversionThread(items_data, is_multi_portrait)
+            self.conversion_thread = ConversionThread(items_data, is_multi_portrait, self.format_combo.currentText(),
+                                                      self.shared_clock_checkbox.isChecked(), self.merge_holds_checkbox.isChecked())
             self.conversion_thread.finished.connect(self.conversion_finished)
             self.conversion_thread.start()
         except Exception as e:
@@ -0,0 +1,109 @@
+import math
+import os
+import struct
+import tempfile
+import unittest
+from pathlib import Path
+
+import numpy as np
+from PIL import Image
+
+from General_UI_Tool.encode_quality import EFFORT_LEVELS, psnr, ssim, tune_effort
+
+# R8G8B8A8_UNORM_SRGB, so decode_dds returns the stored bytes unchanged
+DXGI_R8G8B8A8_UNORM_SRGB = 29
+# Levels the stub encoder rounds colour to at each effort; coarser is cheaper
+STUB_STEPS = {'quick': 64, 'default': 8, 'max': 2}
+
+def _write_dds(path, pixels):
+    height, width = pixels.shape[:2]
+    header = struct.pack('<4s7I44x', b'DDS ', 124, 0x100F, height, width, width * 4, 0, 1)
+    header += struct.pack('<2I4s5I', 32, 0x4, b'DX10', 0, 0, 0, 0, 0)
+    header += struct.pack('<5I', 0x1000, 0, 0, 0, 0)
+    header += struct.pack('<5I', DXGI_R8G8B8A8_UNORM_SRGB, 3, 0, 1, 0)
+    with open(path, 'wb') as f:
+        f.write(header + np.ascontiguousarray(pixels, dtype=np.uint8).tobytes())
+
+def _gradient(size=32):
+    y, x = np.mgrid[0:size, 0:size]
+    pixels = np.empty((size, size, 4), dtype=np.uint8)
+    pixels[:, :, 0] = x * 255 // (size - 1)
+    pixels[:, :, 1] = y * 255 // (size - 1)
+    pixels[:, :, 2] = (x + y) * 255 // (2 * size - 2)
+    pixels[:, :, 3] = 255
+    return pixels
+
+class MetricsTest(unittest.TestCase):
+
+    def test_identical_images(self):
+        image = _gradient()
+        self.assertEqual(psnr(image, image), float('inf'))
+        self.assertAlmostEqual(ssim(image, image), 1.0)
+
+    def test_psnr_of_known_noise(self):
+        image = np.full((16, 16, 4), (128, 128, 128, 255), dtype=np.uint8)
+        # Opaque colour off by 16 either way in a checkerboard: MSE 16^2 over 3 of the 4 channels
+        checker = np.where(np.indices(image.shape[:2]).sum(axis=0) % 2, 16, -16)
+        noisy = image.astype(np.int16)
+        noisy[:, :, :3] += checker[:, :, None]
+        self.assertAlmostEqual(psnr(image, noisy.astype(np.uint8)), 10 * math.log10(255 ** 2 / 192), places=9)
+
+    def test_transparent_colour_is_ignored(self):
+        image = np.zeros((16, 16, 4), dtype=np.uint8)
+        hidden = image.copy()
+        hidden[:, :, :3] = 200
+        self.assertEqual(psnr(image, hidden), float('inf'))
+
+    def test_noise_lowers_ssim(self):
+        image = _gradient()
+        noisy = np.clip(image + np.random.default_rng(0).integers(-40, 41, image.shape) * [1, 1, 1, 0], 0, 255)
+        self.assertLess(ssim(image, noisy), 0.95)
+
+class TuneEffortTest(unittest.TestCase):
+
+    def setUp(self):
+        folder = tempfile.TemporaryDirectory()
+        self.addCleanup(folder.cleanup)
+        self.samples = []
+        for i in range(2):
+            path = os.path.join(folder.name, f"{i}.png")
+            Image.fromarray(np.roll(_gradient(), i * 5, axis=1)).save(path)
+            self.samples.append(path)
+        self.levels = dict((tuple(args), level) for level, args in EFFORT_LEVELS)
+        self.encoded = []
+
+    def encode(self, input_file, output_folder, effort_args):
+        """Stub for texconv: rounds colour more coarsely at cheaper effort levels."""
+        level = self.levels[tuple(effort_args)]
+        self.encoded.append(level)
+        step = STUB_STEPS[level]
+        with Image.open(input_file) as img:
+            pixels = np.asarray(img.convert('RGBA')).copy()
+        pixels[:, :, :3] = pixels[:, :, :3] // step * step
+        _write_dds(Path(output_folder) / f"{Path(input_file).stem}.dds", pixels)
+        return True
+
+    def test_stops_at_cheapest_level_meeting_target(self):
+        target = 30.0
+        level, results = tune_effort(self.samples, self.encode, target, metric='psnr')
+        self.assertEqual(level, 'default')
+        self.assertEqual(list(results), ['quick', 'default'])
+        self.assertTrue(any(scores['psnr'] < target for _, scores in results['quick']))
+        self.assertTrue(all(scores['psnr'] >= target for _, scores in results['default']))
+        self.assertNotIn('max', self.encoded)
+
+    def test_falls_back_to_max(self):
+        level, results = tune_effort(self.samples, self.encode, 0.9999, metric='ssim')
+        self.assertEqual(level, 'max')
+        self.assertEqual(list(results), [level for level, _ in EFFORT_LEVELS])
+
+    def test_failed_encode_raises(self):
+        with self.assertRaises(RuntimeError):
+            tune_effort(self.samples, lambda *args: False, 30.0)
+
+    def test_unknown_metric(self):
+        with self.assertRaises(ValueError):
+            tune_effort(self.samples, self.encode, 30.0, metric='mse')
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,44 @@
+import os
+import tempfile
+import unittest
+
+import numpy as np
+from PIL import Image
+
+from General_UI_Tool.frame_holds import merge_holds
+from Team_Portrait_Tool.ini_maker import merge_held_frames, merged_frame_index
+
+# Frame brightness; equal neighbours form one held frame
+LEVELS = [0, 0, 0, 50, 100, 100, 150, 150, 150, 150, 200]
+SPANS = [(0, 3), (3, 1), (4, 2), (6, 4), (10, 1)]
+
+def _frame(level):
+    return np.full((8, 8, 4), (level, level, level, 255), dtype=np.uint8)
+
+class MergeHoldsTest(unittest.TestCase):
+
+    def test_runs_of_equal_frames_become_spans(self):
+        self.assertEqual(merge_holds(np.stack([_frame(level) for level in LEVELS])), SPANS)
+
+    def test_max_hold_splits_long_runs(self):
+        stack = np.stack([_frame(0)] * 5)
+        self.assertEqual(merge_holds(stack, max_hold=2), [(0, 2), (2, 2), (4, 1)])
+
+class MergeHeldFramesTest(unittest.TestCase):
+
+    def test_keeps_first_frame_of_each_run_renumbered(self):
+        with tempfile.TemporaryDirectory() as folder:
+            for i, level in enumerate(LEVELS):
+                Image.fromarray(_frame(level)).save(os.path.join(folder, f"{i}.png"))
+            self.assertEqual(merge_held_frames(folder), SPANS)
+            self.assertEqual(sorted(os.listdir(folder)), [f"{i}.png" for i in range(len(SPANS))])
+            for kept, (first, _) in enumerate(SPANS):
+                with Image.open(os.path.join(folder, f"{kept}.png")) as image:
+                    self.assertEqual(image.getpixel((0, 0))[0], LEVELS[first])
+
+    def test_frame_index_maps_to_its_run(self):
+        self.assertEqual([merged_frame_index(SPANS, i) for i in range(len(LEVELS))], [0, 0, 0, 1, 2, 2, 3, 3, 3, 3, 4])
+        self.assertEqual(merged_frame_index(SPANS, 99), len(SPANS) - 1)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,89 @@
+import os
+import tempfile
+import unittest
+
+from General_UI_Tool import ini_maker_v2, ini_maker_v2_gui
+from General_UI_Tool.frame_selection import resolve_mode
+from General_UI_Tool.ini_emitter import write_ini
+from General_UI_Tool.ini_simulator import Simulator, resource_runs
+from Team_Portrait_Tool import ini_maker as team_portrait
+
+# Every count up to a few tree levels, then the edges of larger power-of-two ranges
+FRAME_COUNTS = list(range(1, 34)) + [63, 64, 65, 128, 129, 255, 256, 257, 600]
+# The private clock advances the animation on 24 of every 60 presented frames
+FRAMES_PER_TICK = 2.5
+
+def _holds(count):
+    return [1 + (i * 7) % 4 for i in range(count)]
+
+def _write_v2(path, count, mode, holds):
+    write_ini(path, lambda writer: ini_maker_v2.write_ini_content(writer, 'folder', 'abcd1234', count - 1, 'dds', mode,
+                                                                  holds=holds))
+
+def _write_gui(path, count, mode, holds):
+    write_ini(path, lambda writer: ini_maker_v2_gui.write_ini_content(writer, 'name', 'abcd1234', count, mode, holds=holds))
+
+def _write_team_portrait(path, count, mode, holds):
+    item = {'char_name': 'name', 'hash_value': 'abcd1234', 'frame_count': count, 'static_toggle_enabled': False,
+            'static_frame_index': 0, 'custom_static_image_path': None, 'holds': holds}
+    write_ini(path, lambda writer: team_portrait.write_single_portrait_ini(writer, item, mode))
+
+class FrameSelectionEquivalenceTest(unittest.TestCase):
+    """The tree frame selection shows the same resource on every frame as the linear chain."""
+
+    def setUp(self):
+        self.folder = tempfile.TemporaryDirectory()
+        self.addCleanup(self.folder.cleanup)
+
+    def resources(self, write, count, mode, holds):
+        path = os.path.join(self.folder.name, f"{mode}.ini")
+        write(path, count, mode, holds)
+        ticks = sum(holds) if holds else count
+        return Simulator([path]).run(int(ticks * FRAMES_PER_TICK) + 10)
+
+    def check(self, write, held):
+        for count in FRAME_COUNTS:
+            holds = _holds(count) if held and count > 1 else None
+            with self.subTest(frames=count):
+                linear = resource_runs(self.resources(write, count, 'linear', holds), 'TextureOverrideFrame')
+                tree = resource_runs(self.resources(write, count, 'tree', holds), 'TextureOverrideFrame')
+                self.assertEqual(tree, linear)
+                # Over a full cycle every frame is shown, in order, and then the animation wraps
+                shown = [resource for resource, _ in linear]
+                expected = [f"ResourceFrame{i}" for i in range(count)]
+                self.assertEqual(shown[:count], expected)
+                if count > 1:
+                    self.assertEqual(shown[count], "ResourceFrame0")
+                if holds:
+                    self.check_durations(linear, holds)
+
+    def check_durations(self, runs, holds):
+        # Each frame lasts its hold in ticks; a tick takes 2 or 3 frames, so allow one frame either way.
+        # The first run starts mid-tick and the last is cut off by the end of the simulation.
+        for index, (resource, frames) in enumerate(runs[1:-1], 1):
+            self.assertAlmostEqual(frames, holds[index % len(holds)] * FRAMES_PER_TICK, delta=1, msg=resource)
+
+    def test_cli_generator(self):
+        self.check(_write_v2, held=False)
+
+    def test_cli_generator_with_holds(self):
+        self.check(_write_v2, held=True)
+
+    def test_gui_generator(self):
+        self.check(_write_gui, held=False)
+
+    def test_gui_generator_with_holds(self):
+        self.check(_write_gui, held=True)
+
+    def test_team_portrait_generator(self):
+        self.check(_write_team_portrait, held=False)
+
+    def test_team_portrait_generator_with_holds(self):
+        self.check(_write_team_portrait, held=True)
+
+    def test_auto_switches_to_tree_above_threshold(self):
+        self.assertEqual(resolve_mode(8), 'linear')
+        self.assertEqual(resolve_mode(9), 'tree')
+
+if __name__ == '__main__':
+    unittest.main()
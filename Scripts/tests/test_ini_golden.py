@@ -0,0 +1,89 @@
+import os
+import sys
+import tempfile
+import unittest
+
+from General_UI_Tool import ini_maker_v2, ini_maker_v2_gui
+from General_UI_Tool.ini_emitter import write_ini
+from Team_Portrait_Tool import ini_maker as team_portrait
+
+GOLDEN_FOLDER = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'golden')
+FRAMES = 12
+HOLDS = [1, 3, 1, 1, 2, 1, 1, 1, 4, 1, 1, 2]
+
+def _v2(frame_select, shared_clock, holds=None, frames=FRAMES):
+    def generate(folder):
+        path = os.path.join(folder, 'folder.ini')
+        # Written like ini_maker_v2.generate_ini_package() writes it
+        write_ini(path, lambda writer: ini_maker_v2.write_ini_content(writer, 'folder', 'abcd1234', frames - 1, 'dds', frame_select,
+                                                                      shared_clock, holds), final_newline=False)
+        return path
+    return generate
+
+def _gui(frame_select, shared_clock, holds=None, frames=FRAMES):
+    return lambda folder: ini_maker_v2_gui.generate_ini_file('Portrait', 'abcd1234', frames, frame_select, shared_clock, holds)
+
+def _portrait(frames=FRAMES, static=False, custom=None, index=0, holds=None):
+    return {'char_name': 'Portrait', 'hash_value': 'ffee0011', 'frame_count': frames, 'static_toggle_enabled': static,
+            'static_frame_index': index, 'custom_static_image_path': custom, 'holds': holds}
+
+def _team_portrait(items, multi, frame_select='auto', shared_clock=False):
+    return lambda folder: team_portrait.generate_ini_file(items, multi, frame_select, shared_clock)
+
+TEAM = [_portrait(), _portrait(1), _portrait(5, static=True, index=2), _portrait(9, static=True, custom='thumbnail.png')]
+
+# Golden file name: generator writing it into the folder it's given (or the working directory) and returning its path
+CASES = {}
+for frame_select in ('linear', 'tree'):
+    for shared_clock in (False, True):
+        variant = f"{frame_select}_{'shared' if shared_clock else 'own'}_clock"
+        CASES[f"v2_{variant}.ini"] = _v2(frame_select, shared_clock)
+        CASES[f"gui_{variant}.ini"] = _gui(frame_select, shared_clock)
+        CASES[f"team_portrait_{variant}.ini"] = _team_portrait([_portrait()], False, frame_select, shared_clock)
+        CASES[f"team_portrait_multi_{variant}.ini"] = _team_portrait(TEAM, True, frame_select, shared_clock)
+    CASES[f"v2_{frame_select}_holds.ini"] = _v2(frame_select, False, HOLDS)
+    CASES[f"gui_{frame_select}_holds.ini"] = _gui(frame_select, False, HOLDS)
+    CASES[f"team_portrait_{frame_select}_holds.ini"] = _team_portrait([_portrait(holds=HOLDS)], False, frame_select)
+    CASES[f"team_portrait_static_{frame_select}_holds.ini"] = _team_portrait([_portrait(static=True, index=3, holds=HOLDS)], False,
+                                                                              frame_select)
+    CASES[f"team_portrait_multi_{frame_select}_holds.ini"] = _team_portrait(
+        [_portrait(holds=HOLDS), _portrait(1), _portrait(5, static=True, index=2, holds=[2, 1, 1, 3, 1])], True, frame_select)
+CASES["v2_single_frame.ini"] = _v2('auto', False, frames=1)
+CASES["gui_single_frame.ini"] = _gui('auto', False, frames=1)
+CASES["team_portrait_static.ini"] = _team_portrait([_portrait(static=True, index=3)], False)
+CASES["team_portrait_thumbnail.ini"] = _team_portrait([_portrait(static=True, custom='thumbnail.png')], False)
+
+def generate(name, folder):
+    """Text of the CASES entry `name`, generated in `folder`."""
+    cwd = os.getcwd()
+    os.chdir(folder)
+    try:
+        path = CASES[name](folder)
+    finally:
+        os.chdir(cwd)
+    with open(os.path.join(folder, path), encoding='utf-8') as file:
+        return file.read()
+
+class IniGoldenTest(unittest.TestCase):
+    """Every generator writes exactly the INIs in tests/golden; run this module with --update after intended changes."""
+
+    def test_matches_golden(self):
+        for name in CASES:
+            with self.subTest(name), tempfile.TemporaryDirectory() as folder:
+                with open(os.path.join(GOLDEN_FOLDER, name), encoding='utf-8') as file:
+                    self.assertEqual(generate(name, folder), file.read())
+
+def update_golden():
+    os.makedirs(GOLDEN_FOLDER, exist_ok=True)
+    for name in CASES:
+        with tempfile.TemporaryDirectory() as folder:
+            text = generate(name, folder)
+        with open(os.path.join(GOLDEN_FOLDER, name), 'w', encoding='utf-8') as file:
+            file.write(text)
+    print(f"Wrote {len(CASES)} golden INIs to {GOLDEN_FOLDER}")
+
+if __name__ == '__main__':
+    if '--update' in sys.argv:
+        update_golden()
+    else:
+        unittest.main()
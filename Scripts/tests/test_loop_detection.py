@@ -0,0 +1,51 @@
+import unittest
+
+import numpy as np
+
+from General_UI_Tool.loop_detection import propose_loop, thumbnails
+
+PERIOD = 24
+
+def sine_clip(frames, phase=0, period=PERIOD):
+    """Flat grayscale frames whose brightness follows a sine wave; frames half a period apart match."""
+    clip = []
+    for i in range(frames):
+        level = 128 + 100 * np.sin(2 * np.pi * (i + phase) / period)
+        clip.append(np.full((16, 16), level, dtype=np.uint8))
+    return clip
+
+def moving_bar_clip(frames, period=PERIOD):
+    """A bar sweeping across the frame and wrapping around every `period` frames."""
+    clip = []
+    for i in range(frames):
+        frame = np.zeros((32, 96, 3), dtype=np.uint8)
+        x = (i % period) * 4
+        frame[:, x:x + 8] = 255
+        clip.append(frame)
+    return clip
+
+class ProposeLoopTest(unittest.TestCase):
+
+    def assertLoops(self, clip, length):
+        proposal = propose_loop(thumbnails(clip))
+        self.assertEqual(proposal['mode'], 'loop')
+        self.assertEqual(proposal['end'] - proposal['start'], length)
+        self.assertLess(proposal['cost'], 0.01)
+
+    def test_symmetric_clip_loops_over_full_period(self):
+        # Frame 12 looks like frame 0, but the picture moves the other way there
+        self.assertLoops(sine_clip(PERIOD * 3), PERIOD)
+
+    def test_symmetric_clip_loops_over_full_period_from_any_phase(self):
+        for phase in (1, 5, 13):
+            with self.subTest(phase=phase):
+                self.assertLoops(sine_clip(PERIOD * 3, phase), PERIOD)
+
+    def test_moving_clip(self):
+        self.assertLoops(moving_bar_clip(PERIOD * 2 + 7), PERIOD)
+
+    def test_clip_shorter_than_minimum_has_no_loop(self):
+        self.assertIsNone(propose_loop(thumbnails(sine_clip(5))))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,37 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from General_UI_Tool import mods_scanner
+from General_UI_Tool.mods_scanner import parse_all
+
+INI = "[TextureOverrideFrame]\nhash = abcd1234\n"
+
+class ParseAllCacheTest(unittest.TestCase):
+
+    def setUp(self):
+        folder = tempfile.TemporaryDirectory()
+        self.addCleanup(folder.cleanup)
+        self.ini = os.path.join(folder.name, 'mod.ini')
+        self.cache = os.path.join(folder.name, 'cache.json')
+        with open(self.ini, 'w', encoding='utf-8') as f:
+            f.write(INI)
+
+    def test_unchanged_ini_comes_from_cache(self):
+        parsed, fresh = parse_all([self.ini], self.cache)
+        self.assertEqual(fresh, 1)
+        self.assertEqual(parsed[self.ini]['overrides'][0]['hash'], 'abcd1234')
+        self.assertEqual(parse_all([self.ini], self.cache), (parsed, 0))
+
+    def test_unreadable_ini_is_retried(self):
+        # e.g. the game holding the file open
+        with mock.patch.object(mods_scanner, 'parse_ini', side_effect=PermissionError("locked")):
+            parsed, _ = parse_all([self.ini], self.cache)
+        self.assertIn('error', parsed[self.ini])
+        parsed, fresh = parse_all([self.ini], self.cache)
+        self.assertEqual(fresh, 1)
+        self.assertNotIn('error', parsed[self.ini])
+
+if __name__ == '__main__':
+    unittest.main()
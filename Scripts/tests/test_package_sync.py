@@ -0,0 +1,53 @@
+import os
+import tempfile
+import unittest
+
+from General_UI_Tool.package_sync import sync_files
+
+class SyncFilesTest(unittest.TestCase):
+
+    def setUp(self):
+        folder = tempfile.TemporaryDirectory()
+        self.addCleanup(folder.cleanup)
+        self.source = os.path.join(folder.name, 'src')
+        self.destination = os.path.join(folder.name, 'mod')
+        os.makedirs(self.source)
+
+    def write_source(self, name, data, mtime_ns=1_700_000_000_000_000_000):
+        path = os.path.join(self.source, name)
+        with open(path, 'wb') as f:
+            f.write(data)
+        os.utime(path, ns=(mtime_ns, mtime_ns))
+        return path
+
+    def read_destination(self, relative):
+        with open(os.path.join(self.destination, relative), 'rb') as f:
+            return f.read()
+
+    def test_unchanged_source_is_skipped(self):
+        files = {'m/1.dds': self.write_source('1.dds', b'one')}
+        self.assertEqual(sync_files(files, self.destination, 'mod'), {'placed': 1, 'unchanged': 0, 'removed': 0})
+        self.assertEqual(sync_files(files, self.destination, 'mod'), {'placed': 0, 'unchanged': 1, 'removed': 0})
+
+    def test_new_source_with_same_size_and_mtime_is_placed(self):
+        first = self.write_source('1.dds', b'one')
+        second = self.write_source('2.dds', b'two')
+        sync_files({'m/1.dds': first}, self.destination, 'mod')
+        stats = sync_files({'m/1.dds': second}, self.destination, 'mod')
+        self.assertEqual(stats, {'placed': 1, 'unchanged': 0, 'removed': 0})
+        self.assertEqual(self.read_destination('m/1.dds'), b'two')
+
+    def test_new_source_with_same_content_is_kept(self):
+        sync_files({'m/1.dds': self.write_source('1.dds', b'one')}, self.destination, 'mod')
+        stats = sync_files({'m/1.dds': self.write_source('copy.dds', b'one')}, self.destination, 'mod')
+        self.assertEqual(stats, {'placed': 0, 'unchanged': 1, 'removed': 0})
+
+    def test_dropped_files_are_removed(self):
+        files = {'m/1.dds': self.write_source('1.dds', b'one'), 'm/2.dds': self.write_source('2.dds', b'two')}
+        sync_files(files, self.destination, 'mod')
+        del files['m/2.dds']
+        self.assertEqual(sync_files(files, self.destination, 'mod'), {'placed': 0, 'unchanged': 1, 'removed': 1})
+        self.assertFalse(os.path.exists(os.path.join(self.destination, 'm/2.dds')))
+
+if __name__ == '__main__':
+    unittest.main()